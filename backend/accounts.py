@@ -0,0 +1,133 @@
+"""
+Account creation as single upserts
+
+register and social_login used to look the user up, insert it, commit, then
+insert its notification preferences and commit again (social_login also
+committed provider id / name updates one by one): up to five queries and
+four commits per sign-in, and two concurrent first logins could both miss
+the lookup and race on the insert.
+
+Both flows now write the user with one INSERT ... ON CONFLICT (email)
+returning the row, add the default notification preferences only when the
+row was created, and leave the commit to issue_session (refresh_tokens.py),
+so the whole sign-in is a single transaction. A concurrent duplicate sign-up
+gets the existing row (social) or a clean 400 (register) instead of a
+unique violation.
+"""
+
+from typing import Optional, Tuple
+
+from sqlalchemy import case, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_supabase import NotificationPreference, User, generate_uuid
+from user_cache import invalidate_on_commit
+
+# Name of social accounts whose provider gave neither a name nor a usable email
+DEFAULT_SOCIAL_NAME = "Nuevo Miembro"
+
+PROVIDER_COLUMNS = {"apple": "apple_id", "google": "google_id"}
+
+
+def is_placeholder_name(name: Optional[str]) -> bool:
+    return not name or name.lower() == "user"
+
+
+def name_from_email(email: str) -> str:
+    """john.doe@gmail.com -> John Doe (not for Apple private relay addresses)"""
+    if "@" in email and "privaterelay" not in email:
+        email_name = email.split("@")[0]
+        return " ".join(part.capitalize() for part in email_name.replace(".", " ").replace("_", " ").split())
+    return DEFAULT_SOCIAL_NAME
+
+
+def _new_user_values(**values) -> dict:
+    return {
+        "id": generate_uuid(),
+        "role": "user",
+        "loyalty_points": 0,
+        "badges": [],
+        "friends": [],
+        **values
+    }
+
+
+async def _add_default_preferences(db: AsyncSession, user_id: str):
+    await db.execute(
+        pg_insert(NotificationPreference)
+        .values(id=generate_uuid(), user_id=user_id, events=True, promotions=True, song_requests=True, friends=True)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+
+
+async def create_user(db: AsyncSession, **values) -> Optional[User]:
+    """Insert a new user with default preferences (not committed), or None if the email is taken"""
+    result = await db.execute(
+        pg_insert(User)
+        .values(**_new_user_values(**values))
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User)
+    )
+    user = result.scalar_one_or_none()
+    if user is not None:
+        await _add_default_preferences(db, user.id)
+    return user
+
+
+async def upsert_social_user(
+    db: AsyncSession,
+    provider: str,
+    provider_id: Optional[str],
+    email: str,
+    name: Optional[str]
+) -> Tuple[User, bool]:
+    """
+    (user, created) for a social sign-in (not committed)
+
+    The existing account of that email gets the provider id if it has none
+    yet, and the provider's name if its own is still a placeholder.
+    """
+    provider_column = PROVIDER_COLUMNS[provider]
+    statement = pg_insert(User).values(**_new_user_values(
+        email=email,
+        name=name if not is_placeholder_name(name) else name_from_email(email),
+        auth_provider=provider,
+        language="fr",
+        **{provider_column: provider_id}
+    ))
+    current = User.__table__.c
+    updates = {
+        provider_column: func.coalesce(current[provider_column], statement.excluded[provider_column]),
+        "updated_at": func.now()
+    }
+    if not is_placeholder_name(name):
+        placeholder = or_(current.name.is_(None), func.lower(current.name) == "user", current.name == DEFAULT_SOCIAL_NAME)
+        updates["name"] = case((placeholder, statement.excluded.name), else_=current.name)
+    statement = statement.on_conflict_do_update(index_elements=["email"], set_=updates).returning(
+        # xmax is 0 on a freshly inserted row version
+        User, literal_column("(xmax = 0)").label("created")
+    )
+
+    try:
+        row = (await db.execute(statement, execution_options={"populate_existing": True})).one()
+    except IntegrityError:
+        # The provider id already belongs to an account under another email
+        # (e.g. a new Apple relay address): sign in to that account.
+        # The upsert is the transaction's first write, nothing else is lost.
+        await db.rollback()
+        result = await db.execute(select(User).where(getattr(User, provider_column) == provider_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise
+        if not is_placeholder_name(name) and (is_placeholder_name(user.name) or user.name == DEFAULT_SOCIAL_NAME):
+            user.name = name
+        return user, False
+
+    user, created = row
+    if created:
+        await _add_default_preferences(db, user.id)
+    else:
+        invalidate_on_commit(db, user.id)
+    return user, created
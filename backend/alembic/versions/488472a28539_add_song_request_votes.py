@@ -0,0 +1,65 @@
+"""Add song request votes
+
+Revision ID: 488472a28539
+Revises: 7fb832ddf810
+Create Date: 2026-10-17 10:03:27.551940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '488472a28539'
+down_revision: Union[str, Sequence[str], None] = '7fb832ddf810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('song_request_votes',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('request_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('is_requester', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['request_id'], ['song_requests.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('request_id', 'user_id', name='unique_vote_per_request')
+    )
+    op.create_index(op.f('ix_song_request_votes_user_id'), 'song_request_votes', ['user_id'], unique=False)
+
+    # Backfill from the JSON voters/requesters lists (the original requester is
+    # always counted as a requester, even if missing from the list)
+    op.execute("""
+        INSERT INTO song_request_votes (id, request_id, user_id, is_requester, created_at)
+        SELECT gen_random_uuid()::text, m.request_id, m.user_id, bool_or(m.is_requester), now()
+        FROM (
+            SELECT sr.id AS request_id, sr.user_id, true AS is_requester
+            FROM song_requests sr
+            UNION ALL
+            SELECT sr.id, r.user_id, true
+            FROM song_requests sr
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(sr.requesters) = 'array' THEN sr.requesters ELSE '[]'::json END
+            ) AS r(user_id)
+            UNION ALL
+            SELECT sr.id, v.user_id, false
+            FROM song_requests sr
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(sr.voters) = 'array' THEN sr.voters ELSE '[]'::json END
+            ) AS v(user_id)
+        ) m
+        JOIN users u ON u.id = m.user_id
+        GROUP BY m.request_id, m.user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_song_request_votes_user_id'), table_name='song_request_votes')
+    op.drop_table('song_request_votes')
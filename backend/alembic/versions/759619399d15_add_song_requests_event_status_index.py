@@ -0,0 +1,28 @@
+"""Add song requests event/status index
+
+Revision ID: 759619399d15
+Revises: 488472a28539
+Create Date: 2026-10-17 11:24:09.316452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '759619399d15'
+down_revision: Union[str, Sequence[str], None] = '488472a28539'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_song_requests_event_status', 'song_requests', ['event_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_song_requests_event_status', table_name='song_requests')
@@ -0,0 +1,58 @@
+"""Add song request quotas
+
+Revision ID: 7fb832ddf810
+Revises: 0578f58cb790
+Create Date: 2026-10-17 09:12:44.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fb832ddf810'
+down_revision: Union[str, Sequence[str], None] = '0578f58cb790'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('song_request_quotas',
+    sa.Column('event_id', sa.String(length=100), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('request_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'user_id')
+    )
+    op.create_index(op.f('ix_song_request_quotas_user_id'), 'song_request_quotas', ['user_id'], unique=False)
+
+    # Backfill from existing requests: a user holds one slot per pending/played
+    # request they created or joined (requesters JSON list)
+    op.execute("""
+        INSERT INTO song_request_quotas (event_id, user_id, request_count, updated_at)
+        SELECT m.event_id, m.user_id, count(DISTINCT m.request_id), now()
+        FROM (
+            SELECT sr.id AS request_id, sr.event_id, sr.user_id
+            FROM song_requests sr
+            WHERE sr.status IN ('pending', 'played') AND sr.event_id IS NOT NULL
+            UNION
+            SELECT sr.id, sr.event_id, r.user_id
+            FROM song_requests sr
+            CROSS JOIN LATERAL json_array_elements_text(
+                CASE WHEN json_typeof(sr.requesters) = 'array' THEN sr.requesters ELSE '[]'::json END
+            ) AS r(user_id)
+            WHERE sr.status IN ('pending', 'played') AND sr.event_id IS NOT NULL
+        ) m
+        JOIN users u ON u.id = m.user_id
+        GROUP BY m.event_id, m.user_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_song_request_quotas_user_id'), table_name='song_request_quotas')
+    op.drop_table('song_request_quotas')
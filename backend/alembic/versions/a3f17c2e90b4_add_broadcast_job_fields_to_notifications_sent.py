@@ -0,0 +1,48 @@
+"""Add broadcast job fields to notifications_sent
+
+Revision ID: a3f17c2e90b4
+Revises: d8c41f91ca14
+Create Date: 2026-10-17 12:48:13.270518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f17c2e90b4'
+down_revision: Union[str, Sequence[str], None] = 'd8c41f91ca14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications_sent', sa.Column('notification_type', sa.String(length=50), nullable=True))
+    op.add_column('notifications_sent', sa.Column('data', sa.JSON(), nullable=True))
+    op.add_column('notifications_sent', sa.Column('status', sa.String(length=20), server_default='completed', nullable=True))
+    op.add_column('notifications_sent', sa.Column('total_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('notifications_sent', sa.Column('sent_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('notifications_sent', sa.Column('failed_count', sa.Integer(), server_default='0', nullable=True))
+    op.add_column('notifications_sent', sa.Column('checkpoint_user_id', sa.String(length=36), nullable=True))
+    op.add_column('notifications_sent', sa.Column('error', sa.Text(), nullable=True))
+    op.add_column('notifications_sent', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notifications_sent', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index(op.f('ix_notifications_sent_status'), 'notifications_sent', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_notifications_sent_status'), table_name='notifications_sent')
+    op.drop_column('notifications_sent', 'updated_at')
+    op.drop_column('notifications_sent', 'completed_at')
+    op.drop_column('notifications_sent', 'error')
+    op.drop_column('notifications_sent', 'checkpoint_user_id')
+    op.drop_column('notifications_sent', 'failed_count')
+    op.drop_column('notifications_sent', 'sent_count')
+    op.drop_column('notifications_sent', 'total_count')
+    op.drop_column('notifications_sent', 'status')
+    op.drop_column('notifications_sent', 'data')
+    op.drop_column('notifications_sent', 'notification_type')
@@ -0,0 +1,37 @@
+"""Add users trigram search and created_at keyset indexes
+
+Revision ID: a9e5c2d71f43
+Revises: f3c71a9d2e64
+Create Date: 2026-10-17 17:05:12.630417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e5c2d71f43'
+down_revision: Union[str, Sequence[str], None] = 'f3c71a9d2e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Available on Supabase, only needs enabling
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_email_trgm', 'users', ['email'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    op.create_index('ix_users_name_trgm', 'users', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_name_trgm', table_name='users')
+    op.drop_index('ix_users_email_trgm', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    # pg_trgm is left enabled: other objects may depend on it
@@ -0,0 +1,31 @@
+"""Add photos event/uploaded_at index for gallery listings
+
+Revision ID: b61e4d2a9c07
+Revises: a3f17c2e90b4
+Create Date: 2026-10-17 13:52:40.118236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61e4d2a9c07'
+down_revision: Union[str, Sequence[str], None] = 'a3f17c2e90b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_photos_event_uploaded', 'photos', ['event_id', 'uploaded_at', 'id'], unique=False)
+    # Prefix of the new index
+    op.drop_index(op.f('ix_photos_event_id'), table_name='photos')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_photos_event_id'), 'photos', ['event_id'], unique=False)
+    op.drop_index('ix_photos_event_uploaded', table_name='photos')
@@ -0,0 +1,28 @@
+"""Add photos variants column
+
+Revision ID: c2d94f7e1b38
+Revises: b61e4d2a9c07
+Create Date: 2026-10-17 14:31:05.642190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d94f7e1b38'
+down_revision: Union[str, Sequence[str], None] = 'b61e4d2a9c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('photos', 'variants')
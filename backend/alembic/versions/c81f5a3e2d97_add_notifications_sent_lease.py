@@ -0,0 +1,28 @@
+"""Add lease_expires_at to notifications_sent
+
+Revision ID: c81f5a3e2d97
+Revises: b4d17e83a5c0
+Create Date: 2026-10-17 21:14:36.502817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f5a3e2d97'
+down_revision: Union[str, Sequence[str], None] = 'b4d17e83a5c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications_sent', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notifications_sent', 'lease_expires_at')
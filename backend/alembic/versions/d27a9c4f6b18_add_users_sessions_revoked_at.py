@@ -0,0 +1,30 @@
+"""Add users sessions_revoked_at
+
+Revision ID: d27a9c4f6b18
+Revises: c81f5a3e2d97
+Create Date: 2026-10-17 21:52:09.481306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd27a9c4f6b18'
+down_revision: Union[str, Sequence[str], None] = 'c81f5a3e2d97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('sessions_revoked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_users_sessions_revoked_at'), 'users', ['sessions_revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_sessions_revoked_at'), table_name='users')
+    op.drop_column('users', 'sessions_revoked_at')
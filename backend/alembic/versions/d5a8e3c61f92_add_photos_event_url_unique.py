@@ -0,0 +1,41 @@
+"""Add unique constraint on photos (event_id, url)
+
+Revision ID: d5a8e3c61f92
+Revises: c2d94f7e1b38
+Create Date: 2026-10-17 15:08:47.903315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e3c61f92'
+down_revision: Union[str, Sequence[str], None] = 'c2d94f7e1b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the first upload of each duplicated URL
+    op.execute("""
+        DELETE FROM photos
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY event_id, url ORDER BY uploaded_at, id
+                ) AS position
+                FROM photos
+            ) ranked
+            WHERE position > 1
+        )
+    """)
+    op.create_unique_constraint('uq_photos_event_url', 'photos', ['event_id', 'url'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_photos_event_url', 'photos', type_='unique')
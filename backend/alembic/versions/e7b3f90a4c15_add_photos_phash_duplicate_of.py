@@ -0,0 +1,36 @@
+"""Add photos phash and duplicate_of
+
+Revision ID: e7b3f90a4c15
+Revises: d5a8e3c61f92
+Create Date: 2026-10-17 15:46:22.580914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f90a4c15'
+down_revision: Union[str, Sequence[str], None] = 'd5a8e3c61f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('phash', sa.BigInteger(), nullable=True))
+    op.add_column('photos', sa.Column('duplicate_of', sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        'photos_duplicate_of_fkey', 'photos', 'photos', ['duplicate_of'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index('ix_photos_event_phash', 'photos', ['event_id', 'phash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_photos_event_phash', table_name='photos')
+    op.drop_constraint('photos_duplicate_of_fkey', 'photos', type_='foreignkey')
+    op.drop_column('photos', 'duplicate_of')
+    op.drop_column('photos', 'phash')
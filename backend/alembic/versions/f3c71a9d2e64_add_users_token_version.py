@@ -0,0 +1,28 @@
+"""Add users token_version
+
+Revision ID: f3c71a9d2e64
+Revises: e7b3f90a4c15
+Create Date: 2026-10-17 16:20:37.214859
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c71a9d2e64'
+down_revision: Union[str, Sequence[str], None] = 'e7b3f90a4c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
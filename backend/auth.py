@@ -1,4 +1,5 @@
 import jwt
+import uuid
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from fastapi import HTTPException, Security, Depends
@@ -25,19 +26,24 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
-    """Create JWT access token"""
+    """Create JWT access token (short-lived, renewed with a refresh token - see refresh_tokens.py)"""
     to_encode = data.copy()
     
     # 1.5 - datetime.now(timezone.utc) au lieu de datetime.utcnow() (déprécié)
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(days=30)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
     
-    to_encode.update({"exp": expire})
+    # jti: lets this one token be revoked (token_revocation.py)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
     return encoded_jwt
 
+def user_claims(user) -> dict:
+    """Claims of a user's access token: id, role and token version (see get_current_user_supabase)"""
+    return {"sub": user.id, "role": user.role, "ver": user.token_version or 0}
+
 def decode_token(token: str) -> dict:
     """Decode JWT token"""
     try:
@@ -100,9 +106,18 @@ async def verify_firebase_token(token: str) -> dict:
 # ============ SUPABASE AUTH FUNCTIONS ============
 
 async def get_current_user_supabase(credentials: HTTPAuthorizationCredentials = Security(security)):
-    """Get current authenticated user for Supabase backend"""
-    from database_supabase import AsyncSessionLocal
-    from models_supabase import User
+    """
+    Get current authenticated user for Supabase backend
+
+    The user comes from the in-process user cache (user_cache.py), so a
+    steady-state request costs no query. The token's claims must still match
+    the user: a different token version (revoked tokens) or role (role
+    changed since login) means the client has to log in again. Tokens issued
+    before the claims existed only carry "sub" and are accepted as version 0.
+    A token revoked on logout is refused from its jti, checked in memory.
+    """
+    from user_cache import user_cache
+    from token_revocation import revocation_filter
     
     # Step 1: Decode token (this is a pure auth check - 401 if it fails)
     try:
@@ -118,23 +133,28 @@ async def get_current_user_supabase(credentials: HTTPAuthorizationCredentials =
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    # Step 2: Database lookup (this is a SERVER operation - 503 if it fails, NOT 401)
+    jti = payload.get("jti")
+    if jti and revocation_filter.is_revoked(jti):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    
+    # Step 2: User lookup (this is a SERVER operation - 503 if it fails, NOT 401)
     try:
-        async with AsyncSessionLocal() as db:
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            
-            if user is None:
-                raise HTTPException(status_code=401, detail="User not found")
-            
-            # Detach from session to use outside
-            db.expunge(user)
-            return user
-    except HTTPException:
-        raise
+        user = await user_cache.get_user(user_id)
     except Exception as e:
         logger.error(f"Database error during authentication: {e}")
         raise HTTPException(status_code=503, detail="Service temporarily unavailable")
+    
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    # Step 3: Claims must match the current user
+    if payload.get("ver", 0) != (user.token_version or 0):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    role = payload.get("role")
+    if role is not None and role != user.role:
+        raise HTTPException(status_code=401, detail="Token is outdated, please log in again")
+    
+    return user
 
 
 async def get_current_admin_supabase(current_user = Depends(get_current_user_supabase)):
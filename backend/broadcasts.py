@@ -0,0 +1,267 @@
+"""
+Broadcast push notifications as resumable jobs
+
+POST /api/admin/notifications/broadcast records a job in notifications_sent
+and returns; the fan-out runs in the background:
+
+- the audience (users with a token who accept this notification type) is
+  streamed in users.id order, so users.id is a stable resume point
+- each round of batches is sent through the shared Expo client, then the
+  job's counters and checkpoint_user_id are committed
+- a worker claims a job by taking its lease (lease_expires_at, renewed at
+  every checkpoint) in one conditional UPDATE, so each job runs in a single
+  worker even though every worker looks for jobs to resume
+- jobs still queued/running whose lease ran out (crash, redeploy) resume
+  after their checkpoint; at most the last uncommitted round is sent twice
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import or_, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database_supabase import AsyncSessionLocal
+from models_supabase import NotificationPreference, NotificationSent, User
+from push_delivery import EXPO_BATCH_SIZE, expo_push
+
+logger = logging.getLogger(__name__)
+
+
+def push_audience_query(notification_type: str = None, after_user_id: str = None):
+    """Users (id, push token) who accept this type of broadcast (no preferences row = opted in)"""
+    query = (
+        select(User.id, User.push_token)
+        .outerjoin(NotificationPreference, NotificationPreference.user_id == User.id)
+        .where(User.push_token.like("ExponentPushToken%"))
+    )
+    if notification_type == "new_events":
+        query = query.where(NotificationPreference.events.is_not(False))
+    elif notification_type == "promotions":
+        query = query.where(NotificationPreference.promotions.is_not(False))
+    if after_user_id:
+        query = query.where(User.id > after_user_id)
+    return query.order_by(User.id)
+
+
+async def stream_push_audience(
+    db: AsyncSession,
+    notification_type: str = None,
+    after_user_id: str = None,
+    batch_size: int = EXPO_BATCH_SIZE
+) -> AsyncIterator[list]:
+    """Yield the audience in batches of (id, push_token) rows from a server-side cursor"""
+    result = await db.stream(
+        push_audience_query(notification_type, after_user_id).execution_options(yield_per=batch_size)
+    )
+    async for batch in result.partitions(batch_size):
+        yield batch
+
+
+def serialize_broadcast(job: NotificationSent) -> dict:
+    processed = job.recipients_count or 0
+    total = job.total_count or 0
+    return {
+        "job_id": job.id,
+        "title": job.title,
+        "body": job.body,
+        "notification_type": job.notification_type,
+        "status": job.status,
+        "total_count": total,
+        "processed_count": processed,
+        "sent_count": job.sent_count or 0,
+        "failed_count": job.failed_count or 0,
+        "progress": round(processed / total * 100, 1) if total else (100.0 if job.status == "completed" else 0.0),
+        "error": job.error,
+        "created_at": job.sent_at.isoformat() if job.sent_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None
+    }
+
+
+class BroadcastRunner:
+    """Runs broadcast jobs in the background and resumes interrupted ones"""
+
+    def __init__(self, batches_per_round: int = 6, lease_seconds: int = 120, resume_interval: float = 60.0):
+        # Batches of 100 sent concurrently before each checkpoint
+        self.batches_per_round = batches_per_round
+        self.lease_seconds = lease_seconds
+        self.resume_interval = resume_interval
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._resumer: Optional[asyncio.Task] = None
+
+    async def create_job(
+        self,
+        db: AsyncSession,
+        title: str,
+        body: str,
+        notification_type: Optional[str],
+        data: dict,
+        sent_by: Optional[str]
+    ) -> NotificationSent:
+        total = (await db.execute(
+            select(func.count()).select_from(push_audience_query(notification_type).order_by(None).subquery())
+        )).scalar() or 0
+        job = NotificationSent(
+            title=title,
+            body=body,
+            target="all",
+            notification_type=notification_type,
+            data=data,
+            sent_by=sent_by,
+            status="queued",
+            total_count=total,
+            recipients_count=0,
+            sent_count=0,
+            failed_count=0
+        )
+        db.add(job)
+        await db.commit()
+        return job
+
+    def start(self, job_id: str):
+        if job_id in self._tasks:
+            return
+        task = asyncio.create_task(self.run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    def _claimable(self):
+        return (
+            NotificationSent.status.in_(["queued", "running"]),
+            or_(NotificationSent.lease_expires_at.is_(None), NotificationSent.lease_expires_at <= func.now())
+        )
+
+    def start_resumer(self):
+        """Resume interrupted jobs now, then whenever a lease runs out (worker gone)"""
+        if self._resumer is None:
+            self._resumer = asyncio.create_task(self._resume_loop())
+
+    async def _resume_loop(self):
+        while True:
+            await self.resume_pending()
+            await asyncio.sleep(self.resume_interval)
+
+    async def resume_pending(self):
+        """Restart jobs left queued/running by a process that is gone"""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(NotificationSent.id).where(*self._claimable()))
+                job_ids = result.scalars().all()
+            for job_id in job_ids:
+                self.start(job_id)
+        except Exception as e:
+            logger.error(f"❌ Failed to resume broadcasts: {e}")
+
+    async def claim(self, job_id: str):
+        """Take the job's lease, or None if it is finished or another worker holds it"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(NotificationSent)
+                .where(NotificationSent.id == job_id)
+                .where(*self._claimable())
+                .values(status="running", lease_expires_at=func.now() + timedelta(seconds=self.lease_seconds))
+                .returning(
+                    NotificationSent.title, NotificationSent.body, NotificationSent.data,
+                    NotificationSent.notification_type, NotificationSent.checkpoint_user_id
+                )
+            )
+            job = result.one_or_none()
+            await db.commit()
+        return job
+
+    async def stop(self):
+        """Cancel running jobs; they stay 'running' and their lease is released for the next start"""
+        if self._resumer is not None:
+            self._resumer.cancel()
+            try:
+                await self._resumer
+            except asyncio.CancelledError:
+                pass
+            self._resumer = None
+
+        job_ids = list(self._tasks)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        if job_ids:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(NotificationSent)
+                        .where(NotificationSent.id.in_(job_ids))
+                        .where(NotificationSent.status == "running")
+                        .values(lease_expires_at=None)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"❌ Failed to release broadcast leases: {e}")
+
+    async def run(self, job_id: str):
+        job = await self.claim(job_id)
+        if job is None:
+            return
+
+        title, body, data = job.title, job.body, job.data or {}
+        checkpoint = job.checkpoint_user_id
+        logger.info(f"📣 Broadcast {job_id} running (from {checkpoint or 'start'})")
+
+        try:
+            # The audience cursor and the checkpoint writes use separate sessions
+            async with AsyncSessionLocal() as stream_db:
+                round_rows: List = []
+                async for batch in stream_push_audience(stream_db, job.notification_type, checkpoint):
+                    round_rows.extend(batch)
+                    if len(round_rows) >= self.batches_per_round * EXPO_BATCH_SIZE:
+                        await self._send_round(job_id, round_rows, title, body, data)
+                        round_rows = []
+                if round_rows:
+                    await self._send_round(job_id, round_rows, title, body, data)
+
+            await self._finish(job_id, "completed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Broadcast {job_id} failed: {e}")
+            await self._finish(job_id, "failed", error=str(e))
+
+    async def _send_round(self, job_id: str, rows: list, title: str, body: str, data: dict):
+        messages = [
+            {"to": row.push_token, "sound": "default", "title": title, "body": body, "data": data}
+            for row in rows
+        ]
+        report = await expo_push.send(messages)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(NotificationSent)
+                .where(NotificationSent.id == job_id)
+                .values(
+                    recipients_count=NotificationSent.recipients_count + len(rows),
+                    sent_count=NotificationSent.sent_count + report.sent,
+                    failed_count=NotificationSent.failed_count + report.failed,
+                    checkpoint_user_id=rows[-1].id,
+                    lease_expires_at=func.now() + timedelta(seconds=self.lease_seconds)
+                )
+            )
+            await db.commit()
+
+    async def _finish(self, job_id: str, status: str, error: str = None):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(NotificationSent)
+                .where(NotificationSent.id == job_id)
+                .values(status=status, error=error, completed_at=datetime.now(timezone.utc), lease_expires_at=None)
+            )
+            await db.commit()
+        logger.info(f"📣 Broadcast {job_id} {status}")
+
+
+broadcast_runner = BroadcastRunner()
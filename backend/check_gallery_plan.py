@@ -0,0 +1,97 @@
+"""
+Check that the gallery queries (galleries.py) are index-backed
+
+Runs EXPLAIN on the /api/gallery/events and /api/media/galleries listings
+and on the per-event photo feed (first page and a keyset page) against the
+database in DATABASE_URL and fails if photos is read with anything but
+ix_photos_event_uploaded, or if events is sequentially scanned.
+
+On a small or empty database the planner prefers sequential scans anyway,
+so by default the check runs with enable_seqscan off: it verifies the
+indexes can serve the query. Use --planner-default to see the plan the
+planner actually picks for the current data.
+
+Usage:
+    cd backend
+    python check_gallery_plan.py [--planner-default] [--verbose]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from database_supabase import AsyncSessionLocal, close_db
+from galleries import gallery_listing_query, photo_page_query
+from pagination import encode_cursor
+
+PHOTOS_INDEX = "ix_photos_event_uploaded"
+
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def plan_problems(plan: dict) -> List[str]:
+    problems = []
+    for node in plan_nodes(plan):
+        relation = node.get("Relation Name")
+        if relation == "photos" and node.get("Index Name") != PHOTOS_INDEX:
+            problems.append(f"photos read by {node['Node Type']} ({node.get('Index Name', 'no index')})")
+        if relation == "events" and node["Node Type"] == "Seq Scan":
+            problems.append("events read by Seq Scan")
+    return problems
+
+
+async def explain(db, query) -> dict:
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--planner-default", action="store_true", help="keep enable_seqscan on")
+    parser.add_argument("--verbose", action="store_true", help="print the plans")
+    args = parser.parse_args()
+
+    cursor = datetime.now(timezone.utc)
+    cases = [
+        ("/api/gallery/events", gallery_listing_query(True)),
+        ("/api/gallery/events?before=...", gallery_listing_query(True, cursor, "ffffffff", 20)),
+        ("/api/media/galleries", gallery_listing_query(False)),
+        ("/api/media/galleries?before=...", gallery_listing_query(False, cursor, "ffffffff", 20)),
+        ("/api/media/gallery/{id}", photo_page_query("ffffffff", None, 60)),
+        ("/api/media/gallery/{id}?cursor=...", photo_page_query("ffffffff", encode_cursor(cursor, "ffffffff"), 60)),
+    ]
+
+    failed = False
+    async with AsyncSessionLocal() as db:
+        if not args.planner_default:
+            await db.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, query in cases:
+            plan = await explain(db, query)
+            problems = plan_problems(plan)
+            print(f"{'✅' if not problems else '❌'} {name}")
+            for problem in problems:
+                print(f"   - {problem}")
+            if args.verbose or problems:
+                print(json.dumps(plan, indent=2))
+            failed = failed or bool(problems)
+        await db.rollback()
+    await close_db()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
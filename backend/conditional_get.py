@@ -0,0 +1,201 @@
+"""
+Conditional GET for the public catalog endpoints
+
+ETags are derived from in-memory content versions, not from the response
+body: every write path bumps the version of the domain it changes (events,
+djs, aftermovies, galleries, welcome), so a matching If-None-Match is
+answered with 304 before the endpoint runs - no database access.
+
+ETag = hash(boot nonce, path + query, versions of the route's domains), so a
+restart or a write anywhere in the domain changes it. Event listings also
+depend on the clock (event_date >= now); their ETag includes a 5-minute
+time bucket, the same bound as the event response cache.
+
+Writes happen in any worker: bump() also pg_notifies the domains, and the
+other workers bump their own counters when the notification arrives
+(pg_listener.py). Every route has a time bucket as well, which bounds how
+long a missed notification - or a deployment without DATABASE_DIRECT_URL,
+where nothing is listened to - can keep a stale 304 going.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from database_supabase import AsyncSessionLocal, DATABASE_DIRECT_URL
+from pg_listener import PgListener
+
+logger = logging.getLogger(__name__)
+
+BOOT_NONCE = uuid.uuid4().hex[:8]
+
+CHANNEL = "catalog_changed"
+
+# path prefix -> (domains, time bucket in seconds, Cache-Control)
+CATALOG_ROUTES: Tuple[Tuple[str, Tuple[str, ...], Optional[int], str], ...] = (
+    ("/api/events", ("events",), 300, "public, max-age=60"),
+    ("/api/djs", ("djs",), 300, "public, max-age=300"),
+    ("/api/aftermovies", ("aftermovies",), 300, "public, max-age=300"),
+    ("/api/media/aftermovies", ("aftermovies",), 300, "public, max-age=300"),
+    ("/api/media/galleries", ("galleries",), 300, "public, max-age=300"),
+    ("/api/media/gallery", ("galleries",), 300, "public, max-age=300"),
+    ("/api/gallery", ("galleries",), 300, "public, max-age=300"),
+    ("/api/welcome-content", ("welcome",), 300, "public, max-age=300"),
+)
+
+DOMAINS = sorted({domain for _, domains, _, _ in CATALOG_ROUTES for domain in domains})
+
+
+class ContentVersions(PgListener):
+    """Per-domain version counters and last-modified times, bumped by every worker's writes"""
+
+    channel = CHANNEL
+    label = "catalog versions"
+
+    def __init__(self, poll_interval: float = 5.0, reconnect_delay: float = 5.0):
+        super().__init__(poll_interval, reconnect_delay)
+        boot = time.time()
+        self._versions: Dict[str, int] = {}
+        self._modified: Dict[str, float] = {}
+        self._boot = boot
+        # Tells this worker's own notifications apart
+        self._origin = uuid.uuid4().hex
+        self._publishing: Set[asyncio.Task] = set()
+
+    def bump(self, *domains: str):
+        """Call after committing a write to these domains"""
+        self._bump(domains)
+        try:
+            task = asyncio.get_running_loop().create_task(self._publish(domains))
+        except RuntimeError:
+            # No event loop (scripts): nobody else to tell
+            return
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    def _bump(self, domains):
+        now = time.time()
+        for domain in domains:
+            self._versions[domain] = self._versions.get(domain, 0) + 1
+            self._modified[domain] = now
+
+    async def _publish(self, domains):
+        payload = json.dumps({"origin": self._origin, "domains": list(domains)})
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Catalog change notification failed: {e}")
+
+    async def refresh(self):
+        # Whatever was missed while not listening: every ETag changes
+        self._bump(DOMAINS)
+
+    def on_notification(self, payload: str):
+        try:
+            message = json.loads(payload)
+            if message.get("origin") != self._origin:
+                self._bump([domain for domain in message["domains"] if domain in DOMAINS])
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error(f"Invalid catalog change notification: {e}")
+
+    async def start(self):
+        if DATABASE_DIRECT_URL:
+            await super().start()
+        else:
+            logger.warning("⚠️  DATABASE_DIRECT_URL not set: catalog ETags follow other workers' writes only through their time bucket")
+
+    async def stop(self):
+        await super().stop()
+        if self._publishing:
+            await asyncio.gather(*self._publishing, return_exceptions=True)
+
+    def version(self, domain: str) -> int:
+        return self._versions.get(domain, 0)
+
+    def modified(self, domain: str) -> float:
+        return self._modified.get(domain, self._boot)
+
+
+content_versions = ContentVersions()
+
+
+def match_route(path: str):
+    for prefix, domains, bucket, cache_control in CATALOG_ROUTES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return domains, bucket, cache_control
+    return None
+
+
+def validators(path: str, query: str, domains, bucket: Optional[int]) -> Tuple[str, float]:
+    """(strong ETag, last-modified timestamp) of the current content"""
+    now = time.time()
+    parts = [BOOT_NONCE, path, query]
+    last_modified = max(content_versions.modified(domain) for domain in domains)
+    for domain in domains:
+        parts.append(f"{domain}={content_versions.version(domain)}")
+    if bucket:
+        bucket_start = now - now % bucket
+        parts.append(f"t={int(bucket_start)}")
+        last_modified = max(last_modified, bucket_start)
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"', last_modified
+
+
+def not_modified(headers: Dict[str, str], etag: str, last_modified: float) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ConditionalGetMiddleware:
+    """Adds ETag / Last-Modified / Cache-Control to catalog GETs and answers 304s"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        route = match_route(scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        domains, bucket, cache_control = route
+        etag, last_modified = validators(scope["path"], scope.get("query_string", b"").decode(), domains, bucket)
+        extra_headers = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode()),
+            (b"cache-control", cache_control.encode()),
+        ]
+
+        request_headers = {key.decode().lower(): value.decode() for key, value in scope["headers"]}
+        if not_modified(request_headers, etag, last_modified):
+            await send({"type": "http.response.start", "status": 304, "headers": extra_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message = {**message, "headers": list(message.get("headers", [])) + extra_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -30,6 +30,9 @@ class Settings(BaseSettings):
     # 1.2 - Clé secrète JWT - DOIT être configurée en production
     secret_key: str = os.environ.get("SECRET_KEY", "dev-only-secret-key-not-for-production")
     allowed_origins: str = "http://localhost:3000,exp://localhost:8081"
+    access_token_expire_minutes: int = 15   # then renewed with the refresh token (refresh_tokens.py)
+    refresh_token_expire_days: int = 60
+    legacy_access_token_expire_days: int = 30   # logins without X-Session-Refresh (app builds before /refresh)
     
     # Venue Geofencing
     venue_latitude: float = 50.8486
@@ -40,6 +43,27 @@ class Settings(BaseSettings):
     event_start_hour: int = 23  # 11 PM
     event_end_hour: int = 6     # 6 AM
     
+    # Expo push notifications (base URL can point at a local stub, see expo_push_stub.py)
+    expo_push_base_url: str = "https://exp.host/--/api/v2"
+    expo_push_concurrency: int = 6          # batches of 100 posted in parallel
+    expo_push_rate_per_second: int = 600    # Expo's per-project limit
+    expo_receipt_delay_seconds: int = 900   # receipts are ready ~15 min after sending
+    
+    # Gallery photo variants (photo_pipeline.py / photo_storage.py)
+    photo_storage_backend: str = "local"
+    media_root: str = "media"                   # local storage directory (persistent volume)
+    media_base_url: Optional[str] = None        # public URL of the /media files, unset = served by this API
+    photo_variant_format: str = "webp"      # webp or jpeg
+    photo_pipeline_workers: int = 2         # Pillow processes
+    photo_pipeline_concurrency: int = 4     # photos fetched / resized at once
+    photo_max_bytes: int = 30 * 1024 * 1024
+    photo_duplicate_distance: int = 6       # max differing bits of the 64-bit dHash
+    photo_duplicate_policy: str = "flag"    # flag (hidden from the feed) or skip (deleted)
+    
+    # bcrypt pool (password_hashing.py)
+    password_hash_workers: int = 0          # threads, 0 = min(4, CPU count)
+    password_hash_max_waiting: int = 64     # queued calls before answering 503
+    
     # Email (Optional)
     smtp_host: Optional[str] = None
     smtp_port: int = 587
@@ -22,6 +22,10 @@ DATABASE_URL = os.environ.get('DATABASE_URL')
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required for Supabase connection")
 
+# Optional direct (session-mode) connection, used only for LISTEN/NOTIFY:
+# the transaction pooler does not keep LISTEN registrations between transactions
+DATABASE_DIRECT_URL = os.environ.get('DATABASE_DIRECT_URL')
+
 # Convert to async URL (postgresql:// -> postgresql+asyncpg://)
 ASYNC_DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://')
 
@@ -0,0 +1,79 @@
+"""
+Local stand-in for the Expo push API, for testing push delivery without
+sending real notifications.
+
+    uvicorn expo_push_stub:app --port 8099
+    EXPO_PUSH_BASE_URL=http://localhost:8099/--/api/v2 uvicorn server:app
+
+Tokens containing "dead" get DeviceNotRegistered (half in the ticket, half
+in the receipt). STUB_LATENCY_MS, STUB_ERROR_RATE (share of 503s) and
+STUB_RATE_LIMIT_RATE (share of 429s) simulate a slow or struggling Expo.
+GET /stats reports what was received.
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from typing import Dict
+
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse
+
+LATENCY_MS = float(os.environ.get("STUB_LATENCY_MS", "50"))
+ERROR_RATE = float(os.environ.get("STUB_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.environ.get("STUB_RATE_LIMIT_RATE", "0"))
+
+app = FastAPI(title="Expo push stub")
+
+receipts: Dict[str, dict] = {}
+stats = {"requests": 0, "messages": 0, "rejected_503": 0, "rejected_429": 0, "receipt_requests": 0}
+
+
+@app.post("/--/api/v2/push/send")
+async def send(messages=Body(...)):
+    await asyncio.sleep(LATENCY_MS / 1000)
+    stats["requests"] += 1
+
+    if random.random() < RATE_LIMIT_RATE:
+        stats["rejected_429"] += 1
+        return JSONResponse(status_code=429, content={"errors": [{"code": "TOO_MANY_REQUESTS"}]}, headers={"Retry-After": "1"})
+    if random.random() < ERROR_RATE:
+        stats["rejected_503"] += 1
+        return JSONResponse(status_code=503, content={"errors": [{"code": "UNAVAILABLE"}]})
+
+    if isinstance(messages, dict):
+        messages = [messages]
+    if len(messages) > 100:
+        return JSONResponse(status_code=400, content={"errors": [{"code": "PUSH_TOO_MANY_NOTIFICATIONS"}]})
+
+    tickets = []
+    for message in messages:
+        stats["messages"] += 1
+        token = message.get("to", "")
+        ticket_id = str(uuid.uuid4())
+        if "dead" in token and random.random() < 0.5:
+            tickets.append({
+                "status": "error",
+                "message": f"{token} is not a registered push notification recipient",
+                "details": {"error": "DeviceNotRegistered"}
+            })
+            continue
+        if "dead" in token:
+            receipts[ticket_id] = {"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}}
+        else:
+            receipts[ticket_id] = {"status": "ok"}
+        tickets.append({"status": "ok", "id": ticket_id})
+    return {"data": tickets}
+
+
+@app.post("/--/api/v2/push/getReceipts")
+async def get_receipts(payload: dict = Body(...)):
+    stats["receipt_requests"] += 1
+    ids = payload.get("ids", [])
+    return {"data": {ticket_id: receipts.pop(ticket_id) for ticket_id in ids if ticket_id in receipts}}
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "receipts_waiting": len(receipts)}
@@ -0,0 +1,223 @@
+"""
+Gallery listings, photo feeds and bulk photo inserts
+
+/api/gallery/events and /api/media/galleries used to run a count and a cover
+lookup per event (2N+1 queries). gallery_listing_query() returns one page of
+events with both values from two LATERAL subqueries:
+
+    events (ix_events_event_date, newest first, keyset on (event_date, id))
+      -> count(*) of photos         index scan of ix_photos_event_uploaded
+      -> first photo (cover)        same index, LIMIT 1
+
+The laterals are evaluated per returned event only, so a page costs
+O(page size) index probes whatever the size of the history.
+The cover is the earliest uploaded photo (ties broken by id), so it no
+longer changes between requests. Photos flagged as near-duplicates
+(duplicate_of, see photo_dedup.py) are left out of counts, covers and feeds.
+
+check_gallery_plan.py runs EXPLAIN on these queries against a database.
+
+The photos of one event are served in pages (photo_page_query), newest
+first, with keyset pagination on (uploaded_at, id) - the same index. Each
+photo carries thumb / medium / full URLs so the grid only loads small
+images: Cloudinary delivery transformations of the original when it is on
+Cloudinary, otherwise the variants generated by photo_pipeline.py.
+
+Albums are added with insert_photos(): one INSERT ... SELECT FROM
+unnest(:urls) whatever the album size (two parameters, so no bind
+parameter limit), with ON CONFLICT (event_id, url) DO NOTHING against
+uq_photos_event_url - re-submitting an album only adds the new photos.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, String, and_, cast, func, literal, or_, select, true, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models_supabase import Event, Photo
+from pagination import decode_cursor, encode_cursor
+from serializers import iso
+
+
+def gallery_listing_query(
+    visible_only: bool,
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    limit: int = 100,
+) -> Select:
+    """
+    visible_only: only events with gallery_visible (/api/gallery/events);
+    otherwise events that are visible or have photos (/api/media/galleries).
+    before / before_id: event_date (and id) of the last item of the previous page.
+    """
+    photo_stats = (
+        select(func.count().label("photo_count"))
+        .where(Photo.event_id == Event.id, Photo.duplicate_of.is_(None))
+        .correlate(Event)
+        .lateral("photo_stats")
+    )
+    cover = (
+        select(Photo.url.label("cover_url"))
+        .where(Photo.event_id == Event.id, Photo.duplicate_of.is_(None))
+        .order_by(Photo.uploaded_at.asc(), Photo.id.asc())
+        .limit(1)
+        .correlate(Event)
+        .lateral("cover")
+    )
+
+    query = (
+        select(
+            Event.id,
+            Event.name,
+            Event.event_date,
+            Event.banner_image,
+            photo_stats.c.photo_count,
+            cover.c.cover_url,
+        )
+        .select_from(Event)
+        .join(photo_stats, true())
+        .outerjoin(cover, true())
+    )
+
+    if visible_only:
+        query = query.where(Event.gallery_visible == True)
+    else:
+        query = query.where(or_(Event.gallery_visible == True, photo_stats.c.photo_count > 0))
+
+    if before is not None:
+        if before_id:
+            query = query.where(or_(
+                Event.event_date < before,
+                and_(Event.event_date == before, Event.id < before_id)
+            ))
+        else:
+            query = query.where(Event.event_date < before)
+
+    return query.order_by(Event.event_date.desc(), Event.id.desc()).limit(limit)
+
+
+def serialize_gallery_rows(rows, prefer_banner: bool) -> List[dict]:
+    """prefer_banner: /api/media/galleries shows the event banner when there is one"""
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "event_date": iso(row.event_date),
+            "photo_count": row.photo_count,
+            "cover_image": (row.banner_image or row.cover_url) if prefer_banner else row.cover_url
+        }
+        for row in rows
+    ]
+
+
+# ============ PHOTO FEED ============
+
+CLOUDINARY_UPLOAD_SEGMENT = "/image/upload/"
+CLOUDINARY_VARIANTS = {
+    "thumb": "c_fill,g_auto,w_400,h_400,q_auto,f_auto",
+    "medium": "c_limit,w_1080,q_auto,f_auto",
+}
+
+
+def is_cloudinary_url(url: str) -> bool:
+    return "res.cloudinary.com" in url and CLOUDINARY_UPLOAD_SEGMENT in url
+
+
+def media_url(url: Optional[str], base_url: str) -> Optional[str]:
+    """Absolute URL of a file stored as a path on the API's own /media mount (see photo_storage.py)"""
+    if url and url.startswith("/") and base_url:
+        return base_url.rstrip("/") + url
+    return url
+
+
+def photo_variants(
+    url: str,
+    thumbnail_url: Optional[str] = None,
+    variants: Optional[dict] = None,
+    base_url: str = ""
+) -> dict:
+    """thumb / medium / full URLs of a photo (Cloudinary transformations first)"""
+    if is_cloudinary_url(url):
+        head, tail = url.split(CLOUDINARY_UPLOAD_SEGMENT, 1)
+        return {
+            name: f"{head}{CLOUDINARY_UPLOAD_SEGMENT}{transformation}/{tail}"
+            for name, transformation in CLOUDINARY_VARIANTS.items()
+        } | {"full": url}
+    thumbnail_url = media_url(thumbnail_url, base_url)
+    if variants:
+        return {
+            "thumb": media_url(variants.get("thumb"), base_url) or thumbnail_url or url,
+            "medium": media_url(variants.get("medium"), base_url) or url,
+            "full": url
+        }
+    # Not a Cloudinary upload: only the stored thumbnail (if any) is smaller
+    return {"thumb": thumbnail_url or url, "medium": url, "full": url}
+
+
+def photo_page_query(event_id: str, cursor: Optional[str], limit: int) -> Select:
+    """One page of an event's photos, newest first; fetches limit + 1 rows to detect a next page"""
+    query = (
+        select(Photo.id, Photo.url, Photo.thumbnail_url, Photo.variants, Photo.likes, Photo.uploaded_at)
+        .where(Photo.event_id == event_id, Photo.duplicate_of.is_(None))
+    )
+    if cursor:
+        uploaded_at, photo_id = decode_cursor(cursor)
+        query = query.where(tuple_(Photo.uploaded_at, Photo.id) < tuple_(uploaded_at, photo_id))
+    return query.order_by(Photo.uploaded_at.desc(), Photo.id.desc()).limit(limit + 1)
+
+
+def serialize_photo_page(rows, limit: int, base_url: str = "") -> Tuple[List[dict], Optional[str]]:
+    """(photos, next_cursor) from the rows of photo_page_query; base_url: the API's, for /media paths"""
+    page = rows[:limit]
+    photos = []
+    for row in page:
+        variants = photo_variants(row.url, row.thumbnail_url, row.variants, base_url)
+        photos.append({
+            "id": row.id,
+            "url": row.url,
+            "thumbnail_url": variants["thumb"],
+            "variants": variants,
+            "likes": row.likes or 0,
+            "uploaded_at": iso(row.uploaded_at)
+        })
+    next_cursor = None
+    if len(rows) > limit and page:
+        next_cursor = encode_cursor(page[-1].uploaded_at, page[-1].id)
+    return photos, next_cursor
+
+
+# ============ BULK INSERT ============
+
+async def insert_photos(
+    db: AsyncSession,
+    event_id: str,
+    urls: Sequence[str],
+    uploaded_by: Optional[str],
+    thumbnail_url: Optional[str] = None
+) -> List[str]:
+    """
+    Add the photos of an album in one statement, skipping URLs the event
+    already has. Returns the ids of the inserted photos; the caller commits.
+    thumbnail_url (single adds): stored thumbnail instead of the photo itself.
+    """
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    if not unique_urls:
+        return []
+
+    incoming = func.unnest(literal(unique_urls, ARRAY(String))).table_valued("url").render_derived(name="incoming")
+    source = select(
+        cast(func.gen_random_uuid(), String),
+        literal(event_id),
+        incoming.c.url,
+        func.coalesce(literal(thumbnail_url, String), incoming.c.url),
+        literal(uploaded_by, String)
+    )
+    result = await db.execute(
+        pg_insert(Photo)
+        .from_select(["id", "event_id", "url", "thumbnail_url", "uploaded_by"], source)
+        .on_conflict_do_nothing(index_elements=["event_id", "url"])
+        .returning(Photo.id)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,67 @@
+"""
+Resized variants and perceptual hash of a gallery photo (Pillow)
+
+Runs in the worker processes of the thumbnail pipeline (photo_pipeline.py),
+so this module only imports Pillow: spawned workers do not load the app,
+its settings or the database engine.
+"""
+
+from io import BytesIO
+from typing import Dict, Tuple
+
+from PIL import Image, ImageOps
+
+# name -> (width, height, crop to exactly that size)
+VARIANT_SPECS: Dict[str, Tuple[int, int, bool]] = {
+    "thumb": (400, 400, True),
+    "medium": (1080, 1080, False),
+}
+
+FORMATS = {
+    # format -> (file extension, content type, Pillow save options)
+    "webp": ("webp", "image/webp", {"format": "WEBP", "quality": 80, "method": 4}),
+    "jpeg": ("jpg", "image/jpeg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def render_variants(data: bytes, output_format: str = "webp") -> Dict[str, bytes]:
+    """Encoded bytes of every variant in VARIANT_SPECS"""
+    _, _, save_options = FORMATS[output_format]
+    largest = max(max(width, height) for width, height, _ in VARIANT_SPECS.values())
+
+    with Image.open(BytesIO(data)) as source:
+        # JPEG: decode at a reduced scale directly (much cheaper for camera-size photos)
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+
+    variants = {}
+    # Largest first: each variant is resized from the previous, smaller image
+    for name, (width, height, crop) in sorted(VARIANT_SPECS.items(), key=lambda item: -max(item[1][:2])):
+        if crop:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image = image.copy()
+            image.thumbnail((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        buffer = BytesIO()
+        image.save(buffer, **save_options)
+        variants[name] = buffer.getvalue()
+    return variants
+
+
+def compute_dhash(data: bytes, hash_size: int = 8) -> int:
+    """
+    64-bit difference hash: grayscale, shrink to 9x8, one bit per pixel
+    brighter than its right neighbour. Re-exports of the same shot (other
+    file name, size, compression or EXIF orientation) land within a few bits.
+    """
+    with Image.open(BytesIO(data)) as source:
+        source.draft("L", (hash_size * 8, hash_size * 8))
+        image = ImageOps.exif_transpose(source).convert("L")
+    pixels = image.resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
@@ -0,0 +1,98 @@
+"""
+Live song request feed (Server-Sent Events)
+
+Write paths publish small deltas (new request, vote change, status change)
+and every connected DJ dashboard / attendee screen receives them instead of
+polling GET /api/dj/requests.
+
+Subscribers are held in-process: the API runs as a single uvicorn worker
+(see Procfile), so every write and every stream go through this instance.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class SongRequestFeed:
+    """In-process pub/sub of song request queue deltas"""
+
+    def __init__(self, queue_size: int = 100, heartbeat_seconds: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        # event_id -> subscriber queues (None = subscribed to every event)
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+        self._sequence = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, event_id: Optional[str] = None) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(event_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, event_id: Optional[str] = None):
+        queues = self._subscribers.get(event_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[event_id]
+
+    def publish(self, event_id: Optional[str], delta_type: str, payload: dict):
+        """Push a delta to subscribers of this event and to global subscribers"""
+        targets = set(self._subscribers.get(None, ()))
+        if event_id is not None:
+            targets |= self._subscribers.get(event_id, set())
+        if not targets:
+            return
+
+        message = {
+            "id": next(self._sequence),
+            "type": delta_type,
+            "event_id": event_id,
+            "data": payload
+        }
+        for queue in targets:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and ask it to refetch the full list
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": message["id"], "type": "resync", "event_id": event_id, "data": {}})
+
+    @staticmethod
+    def format_sse(message: dict) -> str:
+        data = json.dumps(message["data"], default=_json_default, ensure_ascii=False)
+        return f"id: {message['id']}\nevent: {message['type']}\ndata: {data}\n\n"
+
+    async def stream(self, event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield SSE frames until the client disconnects (heartbeat comments keep proxies open)"""
+        queue = self.subscribe(event_id)
+        try:
+            yield f"retry: 3000\nevent: ready\ndata: {json.dumps({'event_id': event_id})}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield self.format_sse(message)
+        finally:
+            self.unsubscribe(queue, event_id)
+
+
+song_request_feed = SongRequestFeed()
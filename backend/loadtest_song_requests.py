@@ -0,0 +1,360 @@
+"""
+Event-night load simulation for the song request and voting paths
+
+Simulates attendees hitting POST /api/dj/request-song, POST /api/dj/vote/{id}
+and GET /api/dj/requests during a live event, then reports per endpoint:
+throughput, p50/p95/p99 latency, refused (4xx) / failed (5xx) calls and the
+number of SQL statements issued per call.
+
+By default the FastAPI app is driven in-process (httpx ASGITransport, app
+lifespan included) against the database in DATABASE_URL - point it at a
+local Postgres with the Alembic migrations applied. With --base-url the same
+workload is sent over HTTP to a running server instead (query counts are
+then not available, and the server's own 22h-5h window applies).
+
+The harness creates its own users (loadtest+N@invasion-latina.test), a live
+event and points AppSettings at it; everything is removed and the previous
+settings restored at the end (unless --keep).
+
+Usage:
+    cd backend
+    python loadtest_song_requests.py --users 2000 --duration 600
+    python loadtest_song_requests.py --users 200 --duration 30 --no-live-queue
+    python loadtest_song_requests.py --base-url http://localhost:8000 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+LOADTEST_EMAIL_DOMAIN = "invasion-latina.test"
+# Mirano Continental - request_song only accepts requests within 50m
+MIRANO_COORDS = {"latitude": "50.8494", "longitude": "4.3714"}
+
+ENDPOINTS = ("request_song", "vote", "list_requests")
+ACTIONS = ("list_requests", "vote", "request_song")  # same order as the weights
+
+# Statements issued while serving a call (auth lookup included) are added to the
+# counter of that call; anything else (startup, queue flusher) is "background"
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar("loadtest_query_counter", default=None)
+
+
+class EndpointStats:
+    """Latencies and outcomes of one endpoint"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.queries: List[int] = []
+        self.ok = 0
+        self.refused = 0
+        self.failed = 0
+
+    def record(self, latency: float, status_code: int, queries: Optional[int]):
+        self.latencies.append(latency)
+        if queries is not None:
+            self.queries.append(queries)
+        if status_code < 400:
+            self.ok += 1
+        elif status_code < 500:
+            self.refused += 1
+        else:
+            self.failed += 1
+
+    @staticmethod
+    def percentile(sorted_values: List[float], pct: float) -> float:
+        if not sorted_values:
+            return 0.0
+        index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+        return sorted_values[index]
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "calls": len(latencies),
+            "ok": self.ok,
+            "refused_4xx": self.refused,
+            "failed_5xx": self.failed,
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(self.percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(self.percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(self.percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "queries_per_call": round(sum(self.queries) / len(self.queries), 2) if self.queries else None,
+            "queries_max": max(self.queries) if self.queries else None,
+        }
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in ENDPOINTS}
+        self.background_queries = [0]
+        self.event_id: Optional[str] = None
+        self.tokens: List[str] = []
+        self.previous_settings: Optional[dict] = None
+        # Synthetic catalogue with a skewed popularity, so duplicate requests happen
+        self.songs = [(f"Song {i:03d}", f"Artist {i % 60:02d}") for i in range(args.catalogue)]
+        self.song_weights = [1 / (rank + 1) for rank in range(args.catalogue)]
+        self.mix = [args.list_weight, args.vote_weight, args.request_weight]
+
+    # ---- setup / teardown (direct database access) ----
+
+    async def setup(self):
+        from sqlalchemy import insert, select
+        from auth import create_access_token
+        from database_supabase import AsyncSessionLocal
+        from models_supabase import AppSettings, Event, User
+
+        run_id = uuid.uuid4().hex[:8]
+        users = [
+            {
+                "id": str(uuid.uuid4()),
+                "email": f"loadtest+{run_id}-{n}@{LOADTEST_EMAIL_DOMAIN}",
+                "name": f"Load Test {n}",
+                "role": "user",
+                "loyalty_points": 0,
+            }
+            for n in range(self.args.users)
+        ]
+
+        async with AsyncSessionLocal() as db:
+            event = Event(
+                name=f"Load test night {run_id}",
+                event_date=datetime.now(timezone.utc),
+                status="live",
+                visible_in_tickets=False,
+            )
+            db.add(event)
+            await db.execute(insert(User), users)
+
+            result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
+            settings = result.scalar_one_or_none()
+            if settings is None:
+                settings = AppSettings(id="global")
+                db.add(settings)
+            else:
+                self.previous_settings = {
+                    "requests_enabled": settings.requests_enabled,
+                    "current_event_id": settings.current_event_id,
+                }
+            await db.flush()
+            settings.requests_enabled = True
+            settings.current_event_id = event.id
+            await db.commit()
+            self.event_id = event.id
+
+        self.tokens = [create_access_token({"sub": user["id"]}) for user in users]
+        print(f"🧪 Created {len(users)} users and event {self.event_id}")
+
+    async def teardown(self):
+        from sqlalchemy import delete, select
+        from database_supabase import AsyncSessionLocal
+        from models_supabase import AppSettings, Event, SongRequest, User
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SongRequest).where(SongRequest.event_id == self.event_id))
+            await db.execute(delete(User).where(User.email.like(f"loadtest+%@{LOADTEST_EMAIL_DOMAIN}")))
+            await db.execute(delete(Event).where(Event.id == self.event_id))
+
+            result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
+            settings = result.scalar_one_or_none()
+            if settings is not None:
+                previous = self.previous_settings or {"requests_enabled": False, "current_event_id": None}
+                settings.requests_enabled = previous["requests_enabled"]
+                settings.current_event_id = previous["current_event_id"]
+            await db.commit()
+        print("🧹 Load test data removed, app settings restored")
+
+    # ---- workload ----
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, token: str, **kwargs):
+        counter = [0]
+        reset = _query_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+            status_code = response.status_code
+        except Exception:
+            response, status_code = None, 599
+        finally:
+            _query_counter.reset(reset)
+        latency = time.perf_counter() - started
+        self.stats[endpoint].record(latency, status_code, None if self.args.base_url else counter[0])
+        return response
+
+    async def attendee(self, client: httpx.AsyncClient, token: str, seed: float, arrival: float, gap: float):
+        await asyncio.sleep(arrival)
+        rng = random.Random(seed)
+        listing: List[dict] = []
+
+        for _ in range(self.args.actions_per_user):
+            action = rng.choices(ACTIONS, weights=self.mix)[0]
+
+            if action == "vote":
+                candidates = [item for item in listing if item.get("can_vote") and item.get("status") == "pending"]
+                if not candidates:
+                    action = "list_requests"
+                else:
+                    target = rng.choice(candidates)
+                    response = await self.call(client, "vote", "POST", f"/api/dj/vote/{target['id']}", token)
+                    if response is not None and response.status_code < 500:
+                        target["can_vote"] = False
+
+            if action == "request_song":
+                title, artist = rng.choices(self.songs, weights=self.song_weights)[0]
+                await self.call(
+                    client, "request_song", "POST", "/api/dj/request-song", token,
+                    json={"song_title": title, "artist_name": artist, **MIRANO_COORDS}
+                )
+
+            if action == "list_requests":
+                response = await self.call(
+                    client, "list_requests", "GET", "/api/dj/requests", token,
+                    params={"event_id": self.event_id, "status": "pending"}
+                )
+                if response is not None and response.status_code == 200:
+                    listing = response.json()
+
+            await asyncio.sleep(rng.expovariate(1 / gap) if gap > 0 else 0)
+
+    async def run_workload(self, client: httpx.AsyncClient) -> float:
+        # Arrivals spread over the first half of the window, actions over the rest
+        duration = self.args.duration
+        gap = duration / 2 / max(1, self.args.actions_per_user)
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            self.attendee(client, token, self.rng.random(), self.rng.uniform(0, duration / 2), gap)
+            for token in self.tokens
+        ])
+        return time.perf_counter() - started
+
+    # ---- report ----
+
+    def report(self, elapsed: float) -> dict:
+        summary = {
+            "users": self.args.users,
+            "elapsed_s": round(elapsed, 2),
+            "live_queue": not self.args.no_live_queue,
+            "endpoints": {name: self.stats[name].summary(elapsed) for name in ENDPOINTS},
+            "background_queries": None if self.args.base_url else self.background_queries[0],
+        }
+
+        header = f"{'endpoint':<15}{'calls':>8}{'ok':>8}{'4xx':>7}{'5xx':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'q/call':>8}"
+        print()
+        print(header)
+        print("-" * len(header))
+        for name, row in summary["endpoints"].items():
+            queries = "-" if row["queries_per_call"] is None else f"{row['queries_per_call']:.1f}"
+            print(
+                f"{name:<15}{row['calls']:>8}{row['ok']:>8}{row['refused_4xx']:>7}{row['failed_5xx']:>6}"
+                f"{row['throughput_rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{queries:>8}"
+            )
+        print(f"\n⏱️  {elapsed:.1f}s for {self.args.users} users (latencies in ms)")
+        if summary["background_queries"] is not None:
+            print(f"🗄️  Background queries (startup, queue flusher): {summary['background_queries']}")
+        return summary
+
+
+def install_query_counter(background: List[int]):
+    from sqlalchemy import event
+    from database_supabase import engine
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        (counter if counter is not None else background)[0] += 1
+
+
+def install_event_night_clock(server_module):
+    """request_song only accepts requests between 22h and 5h (Brussels): pin the hour to 23h"""
+    real_datetime = server_module.datetime
+
+    class EventNightDatetime(real_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            current = real_datetime.now(tz)
+            if getattr(tz, "key", None) == "Europe/Brussels":
+                return current.replace(hour=23)
+            return current
+
+    server_module.datetime = EventNightDatetime
+
+
+async def main(args):
+    database_url = os.environ.get("DATABASE_URL", "")
+    host = urlparse(database_url.replace("+asyncpg", "")).hostname
+    if host not in ("localhost", "127.0.0.1", "::1", "db", "postgres") and not args.allow_remote_db:
+        sys.exit(f"Refusing to run against {host!r}: point DATABASE_URL at a local Postgres or pass --allow-remote-db")
+
+    load_test = LoadTest(args)
+
+    if args.base_url:
+        await load_test.setup()
+        try:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+                elapsed = await load_test.run_workload(client)
+        finally:
+            if not args.keep:
+                await load_test.teardown()
+        return load_test.report(elapsed)
+
+    import server
+    from song_queue import song_queue
+
+    install_query_counter(load_test.background_queries)
+    install_event_night_clock(server)
+
+    await load_test.setup()
+    try:
+        async with server.app.router.lifespan_context(server.app):
+            # The lifespan loads the live queue from AppSettings.current_event_id
+            if args.no_live_queue:
+                await song_queue.unload()
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+                elapsed = await load_test.run_workload(client)
+            await song_queue.flush()
+    finally:
+        if not args.keep:
+            await load_test.teardown()
+    return load_test.report(elapsed)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Event-night load simulation for song requests and votes")
+    parser.add_argument("--users", type=int, default=2000, help="synthetic attendees (default: 2000)")
+    parser.add_argument("--duration", type=float, default=600, help="seconds the attendees are spread over (default: 600)")
+    parser.add_argument("--actions-per-user", type=int, default=10, help="calls per attendee (default: 10)")
+    parser.add_argument("--list-weight", type=float, default=6, help="relative share of GET /api/dj/requests")
+    parser.add_argument("--vote-weight", type=float, default=3, help="relative share of votes")
+    parser.add_argument("--request-weight", type=float, default=1, help="relative share of song requests")
+    parser.add_argument("--catalogue", type=int, default=300, help="distinct songs attendees pick from")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-call HTTP timeout in seconds")
+    parser.add_argument("--no-live-queue", action="store_true", help="serve reads and votes from Postgres, not the in-memory queue")
+    parser.add_argument("--base-url", help="drive a running server over HTTP instead of the in-process app")
+    parser.add_argument("--allow-remote-db", action="store_true", help="allow a DATABASE_URL that is not local")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic users, event and requests")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    result = asyncio.run(main(arguments))
+    if arguments.json_path:
+        with open(arguments.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"📄 Report written to {arguments.json_path}")
@@ -5,7 +5,7 @@ Mirrors the MongoDB collections structure
 
 from sqlalchemy import (
     Column, String, Integer, Float, Boolean, DateTime, Text, JSON,
-    ForeignKey, Index, UniqueConstraint
+    ForeignKey, Index, UniqueConstraint, BigInteger
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -31,6 +31,11 @@ class User(Base):
     friends = Column(JSON, default=list)
     language = Column(String(10), default='fr')
     
+    # Bumped to revoke every access token of the user ("ver" claim, see auth.py)
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')
+    # When it last was (polled by the other workers, see token_revocation.py)
+    sessions_revoked_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    
     # Social login fields
     firebase_uid = Column(String(255), unique=True, nullable=True)
     apple_id = Column(String(255), unique=True, nullable=True)
@@ -54,6 +59,14 @@ class User(Base):
     orders = relationship('Order', back_populates='user', cascade='all, delete-orphan')
     vip_bookings = relationship('VIPBooking', back_populates='user', cascade='all, delete-orphan')
     song_requests = relationship('SongRequest', back_populates='user', cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        # Keyset pagination of the admin user list (newest first)
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+        # ILIKE '%term%' search of the admin user list (pg_trgm)
+        Index('ix_users_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+        Index('ix_users_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
 
 
 # ============ EVENTS ============
@@ -209,8 +222,8 @@ class SongRequest(Base):
     artist_name_normalized = Column(String(255), nullable=True, index=True)
     
     votes = Column(Integer, default=1)
-    voters = Column(JSON, default=list)
-    requesters = Column(JSON, default=list)
+    voters = Column(JSON, default=list)  # Legacy - superseded by song_request_votes
+    requesters = Column(JSON, default=list)  # Legacy - superseded by song_request_votes
     times_requested = Column(Integer, default=1)
     
     status = Column(String(50), default='pending', index=True)
@@ -222,6 +235,40 @@ class SongRequest(Base):
     
     # Relationships
     user = relationship('User', back_populates='song_requests')
+    
+    __table_args__ = (
+        Index('ix_song_requests_event_status', 'event_id', 'status'),
+    )
+
+
+# ============ SONG REQUEST VOTES ============
+class SongRequestVote(Base):
+    """One row per (request, user): the user voted for the song, and requested it if is_requester"""
+    __tablename__ = 'song_request_votes'
+    
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    request_id = Column(String(36), ForeignKey('song_requests.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    
+    is_requester = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('request_id', 'user_id', name='unique_vote_per_request'),
+    )
+
+
+# ============ SONG REQUEST QUOTAS ============
+class SongRequestQuota(Base):
+    """Number of active (pending/played) requests a user holds for an event"""
+    __tablename__ = 'song_request_quotas'
+
+    event_id = Column(String(100), primary_key=True)
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+    request_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 # ============ FREE ENTRY VOUCHERS ============
@@ -281,11 +328,14 @@ class Photo(Base):
     __tablename__ = 'photos'
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
-    event_id = Column(String(36), ForeignKey('events.id', ondelete='CASCADE'), nullable=False, index=True)
+    event_id = Column(String(36), ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
     
     url = Column(String(500), nullable=False)
     thumbnail_url = Column(String(500), nullable=True)
-    public_id = Column(String(255), nullable=True)  # Cloudinary public_id
+    public_id = Column(String(255), nullable=True)  # Cloudinary public_id, or hash of the URL
+    variants = Column(JSON, nullable=True)  # {thumb, medium} URLs written by photo_pipeline.py
+    phash = Column(BigInteger, nullable=True)  # 64-bit dHash (photo_dedup.py)
+    duplicate_of = Column(String(36), ForeignKey('photos.id', ondelete='SET NULL'), nullable=True)
     
     tags = Column(JSON, default=list)  # User IDs tagged in photo
     likes = Column(Integer, default=0)
@@ -295,6 +345,15 @@ class Photo(Base):
     
     # Relationships
     event = relationship('Event', back_populates='photos')
+    
+    __table_args__ = (
+        # Per-event counts and cover lookups of the gallery listings (galleries.py)
+        Index('ix_photos_event_uploaded', 'event_id', 'uploaded_at', 'id'),
+        # Re-submitted albums are de-duplicated on insert (galleries.insert_photos)
+        UniqueConstraint('event_id', 'url', name='uq_photos_event_url'),
+        # Near-duplicate lookups load the hashes of one event
+        Index('ix_photos_event_phash', 'event_id', 'phash'),
+    )
 
 
 # ============ AFTERMOVIES ============
@@ -446,8 +505,72 @@ class NotificationSent(Base):
     title = Column(String(255), nullable=False)
     body = Column(Text, nullable=False)
     target = Column(String(100), nullable=False)  # 'all', 'admins', specific user_id
+    notification_type = Column(String(50), nullable=True)  # 'new_events', 'promotions' or None
+    data = Column(JSON, nullable=True)
     
     sent_by = Column(String(36), nullable=True)
-    recipients_count = Column(Integer, default=0)
+    recipients_count = Column(Integer, default=0)  # Recipients processed so far
+    
+    # Broadcast job progress
+    status = Column(String(20), default='completed', index=True)  # queued, running, completed, failed
+    total_count = Column(Integer, default=0)
+    sent_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    checkpoint_user_id = Column(String(36), nullable=True)  # Last users.id processed (resume point)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # Held by the worker running the job until then
+    error = Column(Text, nullable=True)
     
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# ============ PUSH OUTBOX ============
+class PushOutbox(Base):
+    __tablename__ = 'push_outbox'
+    
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
+    push_token = Column(String(500), nullable=False)
+    
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    data = Column(JSON, default=dict)
+    
+    status = Column(String(20), nullable=False, default='pending')  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index('ix_push_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+
+# ============ REFRESH TOKENS ============
+class RefreshToken(Base):
+    __tablename__ = 'refresh_tokens'
+    
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    # One login = one family; each refresh replaces the family's current token
+    family_id = Column(String(36), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)  # sha256, the token itself is never stored
+    
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by = Column(String(36), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# ============ REVOKED ACCESS TOKENS ============
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+    
+    jti = Column(String(36), primary_key=True)
+    # Rows are useless once the token expired anyway (purged on startup)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
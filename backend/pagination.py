@@ -0,0 +1,52 @@
+"""
+Keyset pagination helpers
+
+Listings ordered by (timestamp, id) return an opaque next_cursor encoding
+the last row's sort key; the next page selects rows strictly after it,
+which an index on the same columns serves without OFFSET's cost of reading
+and discarding every previous row.
+
+Totals shown next to such listings do not need to be exact either:
+estimated_row_count reads the planner's row estimate of a table instead of
+counting it.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def escape_like(term: str) -> str:
+    """Literal text for a LIKE / ILIKE pattern (% and _ are not wildcards)"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def estimated_row_count(db: AsyncSession, table: str) -> Optional[int]:
+    """
+    Row count of a table as of its last VACUUM / ANALYZE (pg_class.reltuples,
+    kept up to date by autovacuum), or None if it was never analyzed
+    """
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    )
+    estimate = result.scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
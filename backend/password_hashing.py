@@ -0,0 +1,107 @@
+"""
+bcrypt off the event loop
+
+A bcrypt verify at 12 rounds is ~250 ms of CPU. Run inline in register /
+login, every other request of the worker waited behind it, and a burst of
+logins at doors opening stalled the whole API.
+
+password_hasher runs hash / verify in a small dedicated thread pool (the
+bcrypt C extension releases the GIL, so the event loop keeps serving
+requests and the pool uses up to `workers` cores). At most `workers` calls
+run at once; further calls wait their turn, and once `max_waiting` are
+already waiting new ones are refused with a 503 instead of piling up
+(clients retry after Retry-After).
+
+Queue depth and timings are exposed on GET /api/admin/auth/hashing-stats.
+benchmark_password_hashing.py measures login throughput and event loop
+stalls per worker, inline vs through the pool.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from auth import hash_password, verify_password
+from config import settings
+
+
+class PasswordHasher:
+    def __init__(self, workers: Optional[int] = None, max_waiting: int = 64):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_waiting = max_waiting
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func: Callable, *args):
+        """Run a bcrypt call in the pool (waits for a free thread, 503 if too many wait)"""
+        if self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Trop de connexions en cours, réessaie dans quelques secondes",
+                headers={"Retry-After": "2"}
+            )
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            self.completed += 1
+            self.total_wait += started_at - queued_at
+            self.total_run += time.perf_counter() - started_at
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 1) if self.completed else 0.0,
+            "avg_run_ms": round(self.total_run / self.completed * 1000, 1) if self.completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers or None, settings.password_hash_max_waiting)
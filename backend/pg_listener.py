@@ -0,0 +1,104 @@
+"""
+In-process state kept in sync across workers with LISTEN/NOTIFY
+
+Base class of the state that every worker holds in memory and keeps in
+sync (settings_cache.py, token_revocation.py, song_queue.py,
+conditional_get.py). Writers pg_notify on the cache's channel in their
+transaction, so notifications go out exactly when the change becomes
+visible.
+
+Each worker LISTENs on a dedicated asyncpg connection to
+DATABASE_DIRECT_URL (session mode / direct host - LISTEN does not survive
+Supabase's transaction pooler) and reloads after every (re)connect, in case
+a notification was missed. Without it, workers reload every poll_interval
+seconds instead.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import asyncpg
+
+from database_supabase import DATABASE_DIRECT_URL
+
+logger = logging.getLogger(__name__)
+
+
+class PgListener(ABC):
+    channel: str = ""
+    # What is kept in sync, for the logs ("app settings", "token revocations")
+    label: str = ""
+
+    def __init__(self, poll_interval: float = 5.0, reconnect_delay: float = 5.0):
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+        self.notifications_received = 0
+
+    @abstractmethod
+    async def refresh(self):
+        """Reload the whole state from the database"""
+
+    @abstractmethod
+    def on_notification(self, payload: str):
+        """Apply one notification payload"""
+
+    def _on_notification(self, connection, pid, channel, payload):
+        self.on_notification(payload)
+        self.notifications_received += 1
+
+    # ---- lifecycle ----
+
+    async def start(self):
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_loop() if DATABASE_DIRECT_URL else self._poll_loop())
+        if not DATABASE_DIRECT_URL:
+            logger.warning(f"⚠️  DATABASE_DIRECT_URL not set: {self.label} re-read every {self.poll_interval:.0f}s instead of LISTEN/NOTIFY")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"{self.label.capitalize()} refresh failed: {e}")
+
+    async def _listen_loop(self):
+        dsn = DATABASE_DIRECT_URL.replace("postgresql+asyncpg://", "postgresql://")
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn, statement_cache_size=0)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notification)
+                # Anything changed while we were not listening
+                await self.refresh()
+                logger.info(f"📡 Listening for {self.label}")
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=60)
+                    except asyncio.TimeoutError:
+                        # Detect half-open connections the termination listener misses
+                        await connection.execute("SELECT 1")
+                logger.warning(f"{self.label.capitalize()} listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.label.capitalize()} listener error: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
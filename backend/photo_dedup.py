@@ -0,0 +1,77 @@
+"""
+Near-duplicate detection for gallery photos
+
+Every photo gets a 64-bit dHash (image_variants.compute_dhash) when the
+thumbnail pipeline processes it, stored in photos.phash (signed BIGINT,
+indexed with event_id). Two photos whose hashes differ by at most
+photo_duplicate_distance bits are considered the same shot.
+
+Lookups are per event: the pipeline loads the event's hashes once (while
+jobs use the event) into a BK-tree, which only visits subtrees whose distance to the query can
+be within the threshold (a few dozen comparisons for a 2,000-photo album
+instead of one per photo).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+HASH_BITS = 64
+_SIGN_BIT = 1 << (HASH_BITS - 1)
+_MODULUS = 1 << HASH_BITS
+
+
+def to_signed(value: int) -> int:
+    """Unsigned 64-bit hash -> BIGINT"""
+    return value - _MODULUS if value & _SIGN_BIT else value
+
+
+def to_unsigned(value: int) -> int:
+    return value % _MODULUS
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree of (hash, photo_id) under the Hamming distance"""
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        # node: [hash, photo_id, {distance: child node}]
+        self._root: Optional[list] = None
+        self.size = 0
+        for value, photo_id in items:
+            self.add(value, photo_id)
+
+    def add(self, value: int, photo_id: str):
+        value = to_unsigned(value)
+        self.size += 1
+        if self._root is None:
+            self._root = [value, photo_id, {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, photo_id, {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """(distance, photo_id) of every hash within max_distance, closest first"""
+        value = to_unsigned(value)
+        matches = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                matches.append((distance, node[1]))
+            # Triangle inequality: only children at |d - distance| <= max_distance can match
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(matches)
+
+
+EventTrees = Dict[str, BKTree]
@@ -0,0 +1,381 @@
+"""
+Thumbnail pipeline for gallery photos
+
+add_photo / bulk_upload_photos used to store thumbnail_url = url, so the
+grid downloaded full-size images. After they commit, the new photo ids are
+submitted here as a job that runs in the background:
+
+- the original is fetched over HTTP (or read from the photo storage when it
+  is one of its own URLs); at most photo_pipeline_concurrency photos are in
+  flight (DB session included), whatever the number of jobs and their size
+- Pillow renders the variants (image_variants.py) in a process pool, so
+  resizing never blocks the event loop
+- variants are written to the photo storage (photo_storage.py) under
+  photos/<public_id>/<variant>.<ext>, and the photo row gets public_id,
+  thumbnail_url (thumb variant) and variants {thumb, medium}
+
+Photos hosted on Cloudinary get no stored variants (the feeds use
+Cloudinary transformations).
+
+The pipeline also stores the photo's perceptual hash (photos.phash) and
+compares it with the other photos of the event (photo_dedup.py): a
+near-duplicate is either flagged (duplicate_of, hidden from the public
+feed - PHOTO_DUPLICATE_POLICY=flag, the default) or deleted (skip).
+Photos are downloaded and hashed concurrently, but the duplicate decisions
+are taken one at a time per event and in the job's order, which submitters
+give as (uploaded_at, id): of two copies, the earlier upload is the one
+kept, whichever finished downloading first.
+
+Idempotent on public_id (the Cloudinary public_id, or a hash of the URL):
+a photo whose variants are already recorded and still in storage is
+skipped, variants already in storage are not rendered again, and the same
+image submitted twice at once is processed once. Jobs are kept in memory with their progress (GET
+/api/admin/media/thumbnails); photos missed by a restart are picked up by
+POST /api/admin/media/thumbnails/backfill.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+import httpx
+from sqlalchemy import delete, select, update
+
+from config import settings
+from conditional_get import content_versions
+from database_supabase import AsyncSessionLocal
+from galleries import is_cloudinary_url
+from image_variants import FORMATS, VARIANT_SPECS, compute_dhash, render_variants
+from models_supabase import Photo
+from photo_dedup import BKTree, EventTrees, to_signed
+from photo_storage import PhotoStorage, get_photo_storage
+
+logger = logging.getLogger(__name__)
+
+MAX_JOBS_KEPT = 50
+
+
+def public_id_for(url: str) -> str:
+    return hashlib.sha1(url.encode()).hexdigest()[:24]
+
+
+class ThumbnailJob:
+    """photo_ids in (uploaded_at, id) order: duplicate decisions follow it"""
+
+    def __init__(self, photo_ids: List[str], event_id: Optional[str]):
+        self.id = uuid.uuid4().hex[:12]
+        self.event_id = event_id
+        self.photo_ids = photo_ids
+        self.total = len(photo_ids)
+        self.generated = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[str] = []
+        self.status = "queued"
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        # Events whose hashes this job uses (see ThumbnailPipeline.event_tree)
+        self.events: Set[str] = set()
+        # Index of the next photo allowed to take its duplicate decision
+        self._turn = 0
+        self._turns_done: Set[int] = set()
+        self._turn_changed = asyncio.Condition()
+
+    async def wait_turn(self, index: int):
+        async with self._turn_changed:
+            await self._turn_changed.wait_for(lambda: self._turn >= index)
+
+    async def end_turn(self, index: int):
+        """The photo at index has decided (or needs no decision): let the next ones go"""
+        async with self._turn_changed:
+            if index < self._turn:
+                return
+            self._turns_done.add(index)
+            while self._turn in self._turns_done:
+                self._turns_done.remove(self._turn)
+                self._turn += 1
+            self._turn_changed.notify_all()
+
+    @property
+    def processed(self) -> int:
+        return self.generated + self.skipped + self.duplicates + self.failed
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "event_id": self.event_id,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "generated": self.generated,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "progress": round(self.processed / self.total * 100, 1) if self.total else 100.0,
+            "errors": self.errors[-10:],
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ThumbnailPipeline:
+    def __init__(self):
+        self.output_format = settings.photo_variant_format
+        self.concurrency = settings.photo_pipeline_concurrency
+        self.workers = settings.photo_pipeline_workers
+        self.max_bytes = settings.photo_max_bytes
+        self.duplicate_distance = settings.photo_duplicate_distance
+        self.duplicate_policy = settings.photo_duplicate_policy
+        self.storage: Optional[PhotoStorage] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._in_flight: Dict[str, asyncio.Lock] = {}
+        self._jobs: "OrderedDict[str, ThumbnailJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Hashes of the photos kept per event, shared by the jobs using the event
+        self._trees: EventTrees = {}
+        self._tree_locks: Dict[str, asyncio.Lock] = {}
+        self._tree_jobs: Dict[str, Set[str]] = {}
+
+    def start(self):
+        if self.output_format not in FORMATS:
+            raise ValueError(f"Unknown PHOTO_VARIANT_FORMAT: {self.output_format}")
+        if self.duplicate_policy not in ("flag", "skip"):
+            raise ValueError(f"Unknown PHOTO_DUPLICATE_POLICY: {self.duplicate_policy}")
+        self.storage = get_photo_storage()
+        # spawn: workers import image_variants only, not the running app
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=self.concurrency),
+            follow_redirects=True
+        )
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---- jobs ----
+
+    def submit(self, photo_ids: List[str], event_id: Optional[str] = None) -> ThumbnailJob:
+        job = ThumbnailJob(photo_ids, event_id)
+        self._jobs[job.id] = job
+        while len(self._jobs) > MAX_JOBS_KEPT:
+            oldest_id = next(iter(self._jobs))
+            if oldest_id in self._tasks:
+                break
+            self._jobs.pop(oldest_id)
+        task = asyncio.create_task(self.run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ThumbnailJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[ThumbnailJob]:
+        return list(reversed(self._jobs.values()))
+
+    async def run(self, job: ThumbnailJob):
+        job.status = "running"
+        logger.info(f"🖼️  Thumbnail job {job.id}: {job.total} photos")
+        step = max(1, job.total // 10)
+
+        async def process(index: int, photo_id: str):
+            try:
+                outcome = await self.process_photo(job, index, photo_id)
+                if outcome == "generated":
+                    job.generated += 1
+                elif outcome == "duplicate":
+                    job.duplicates += 1
+                else:
+                    job.skipped += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failed += 1
+                job.errors.append(f"{photo_id}: {e}")
+                logger.error(f"❌ Thumbnail failed for photo {photo_id}: {e}")
+            finally:
+                await job.end_turn(index)
+            if job.processed % step == 0 and job.processed < job.total:
+                logger.info(f"🖼️  Thumbnail job {job.id}: {job.processed}/{job.total}")
+
+        pending = iter(enumerate(job.photo_ids))
+
+        async def worker():
+            # A few photos of the job in flight, not one task (and session) per id.
+            # Taken in order, so every earlier photo is already in progress when one waits its turn
+            for index, photo_id in pending:
+                await process(index, photo_id)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, job.total))))
+            job.status = "completed" if not job.failed else "completed_with_errors"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        finally:
+            self.release_trees(job)
+            job.finished_at = datetime.now(timezone.utc)
+            if job.generated or job.duplicates:
+                content_versions.bump("galleries")
+            logger.info(
+                f"✅ Thumbnail job {job.id} {job.status}: {job.generated} generated, "
+                f"{job.duplicates} duplicates, {job.skipped} skipped, {job.failed} failed"
+            )
+
+    # ---- one photo ----
+
+    async def process_photo(self, job: ThumbnailJob, index: int, photo_id: str) -> str:
+        """Hash, de-duplicate and generate the variants of a photo: "generated", "duplicate" or "skipped" """
+        # The semaphore bounds DB sessions, downloads and renders across all jobs. It is not
+        # held while waiting for the duplicate decision turn: earlier photos may still need it
+        async with self._semaphore:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Photo.url, Photo.public_id, Photo.variants, Photo.event_id, Photo.phash)
+                    .where(Photo.id == photo_id)
+                )
+                photo = result.one_or_none()
+            if photo is None:
+                return "skipped"
+
+            public_id = photo.public_id or public_id_for(photo.url)
+            extension, content_type, _ = FORMATS[self.output_format]
+            # Cloudinary renders its own variants (galleries.photo_variants): only hash those
+            keys = {}
+            if not is_cloudinary_url(photo.url):
+                keys = {name: f"photos/{public_id}/{name}.{extension}" for name in VARIANT_SPECS}
+            urls = {name: self.storage.url(key) for name, key in keys.items()}
+            if photo.phash is not None and (not keys or (photo.variants == urls and await self.stored(keys))):
+                return "skipped"
+
+            loop = asyncio.get_running_loop()
+            phash = photo.phash
+            data = None
+            if phash is None:
+                data = await self.fetch(photo.url)
+                phash = to_signed(await loop.run_in_executor(self._pool, compute_dhash, data))
+
+        duplicate_of = None
+        if photo.phash is None:
+            await job.wait_turn(index)
+            duplicate_of = await self.find_duplicate(job, photo.event_id, photo_id, phash)
+            await job.end_turn(index)
+
+        async with self._semaphore:
+            if duplicate_of and self.duplicate_policy == "skip":
+                async with AsyncSessionLocal() as db:
+                    await db.execute(delete(Photo).where(Photo.id == photo_id))
+                    await db.commit()
+                return "duplicate"
+
+            if keys:
+                lock = self._in_flight.setdefault(public_id, asyncio.Lock())
+                try:
+                    async with lock:
+                        if not await self.stored(keys):
+                            if data is None:
+                                data = await self.fetch(photo.url)
+                            rendered = await loop.run_in_executor(self._pool, render_variants, data, self.output_format)
+                            for name, key in keys.items():
+                                await self.storage.save(key, rendered[name], content_type)
+                finally:
+                    if not lock.locked():
+                        self._in_flight.pop(public_id, None)
+
+            values = {"phash": phash}
+            if keys:
+                values.update(public_id=public_id, thumbnail_url=urls["thumb"], variants=urls)
+            if duplicate_of:
+                values["duplicate_of"] = duplicate_of
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Photo).where(Photo.id == photo_id).values(**values))
+                await db.commit()
+        return "duplicate" if duplicate_of else "generated"
+
+    async def stored(self, keys: Dict[str, str]) -> bool:
+        """Whether every variant file is still in storage (e.g. not lost with an ephemeral disk)"""
+        return all(await asyncio.gather(*(self.storage.exists(key) for key in keys.values())))
+
+    async def find_duplicate(self, job: ThumbnailJob, event_id: str, photo_id: str, phash: int) -> Optional[str]:
+        """Id of a kept photo of the event within duplicate_distance bits, or None (then this one is kept)"""
+        if event_id not in job.events:
+            job.events.add(event_id)
+            self._tree_jobs.setdefault(event_id, set()).add(job.id)
+        # One decision at a time per event, across jobs
+        async with self._tree_locks.setdefault(event_id, asyncio.Lock()):
+            tree = await self.event_tree(event_id)
+            for _, other_id in tree.search(phash, self.duplicate_distance):
+                if other_id != photo_id:
+                    return other_id
+            tree.add(phash, photo_id)
+            return None
+
+    async def event_tree(self, event_id: str) -> BKTree:
+        """Hashes of the event's kept photos, loaded once while jobs use the event"""
+        tree = self._trees.get(event_id)
+        if tree is None:
+            async with self._semaphore:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(Photo.phash, Photo.id)
+                        .where(Photo.event_id == event_id)
+                        .where(Photo.phash.is_not(None))
+                        .where(Photo.duplicate_of.is_(None))
+                    )
+                    tree = BKTree(result.all())
+            self._trees[event_id] = tree
+        return tree
+
+    def release_trees(self, job: ThumbnailJob):
+        """Drop the trees no running job uses any more (the next job reloads them)"""
+        for event_id in job.events:
+            jobs = self._tree_jobs.get(event_id, set())
+            jobs.discard(job.id)
+            if not jobs:
+                self._tree_jobs.pop(event_id, None)
+                self._trees.pop(event_id, None)
+                self._tree_locks.pop(event_id, None)
+
+    async def fetch(self, url: str) -> bytes:
+        key = self.storage.key_for_url(url)
+        if key is not None:
+            return await self.storage.read(key)
+        if not url.startswith(("http://", "https://")):
+            raise ValueError("unsupported photo URL")
+
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ValueError(f"photo larger than {self.max_bytes} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+
+thumbnail_pipeline = ThumbnailPipeline()
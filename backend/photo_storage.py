@@ -0,0 +1,100 @@
+"""
+Storage backends for generated photo variants
+
+The thumbnail pipeline only needs to write a file under a key and get its
+public URL back. LocalPhotoStorage (the default) writes under MEDIA_ROOT
+and the API serves it at /media. Without MEDIA_BASE_URL the photo rows
+record the path (/media/photos/...), which the feeds turn into a URL on
+the host the request came in on (galleries.media_url), so it works with no
+configuration and never records a localhost URL; set MEDIA_BASE_URL to
+serve the files from elsewhere (CDN in front of the mount). Variants lost
+with an ephemeral disk are rendered again by the backfill.
+Another backend (S3, Supabase Storage...) is a PhotoStorage subclass
+registered in STORAGE_BACKENDS and selected with PHOTO_STORAGE_BACKEND.
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from config import settings
+
+# Where the API serves LocalPhotoStorage files
+MEDIA_MOUNT_PATH = "/media"
+
+
+class PhotoStorage(ABC):
+    @abstractmethod
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        """Store data under key, return its public URL"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether a file is stored under key"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL of key"""
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        """Key of a URL served by this storage (originals can then be read directly)"""
+        return None
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        """Content stored under key"""
+
+
+class LocalPhotoStorage(PhotoStorage):
+    def __init__(self, root: str, base_url: str = MEDIA_MOUNT_PATH):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a reader never sees a partial file
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        await asyncio.to_thread(self._write, self._path(key), data)
+        return self.url(key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).is_file)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = self.base_url + "/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    async def read(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._path(key).read_bytes)
+
+
+def local_storage_enabled() -> bool:
+    return settings.photo_storage_backend == "local"
+
+
+STORAGE_BACKENDS: Dict[str, Callable[[], PhotoStorage]] = {
+    "local": lambda: LocalPhotoStorage(settings.media_root, settings.media_base_url or MEDIA_MOUNT_PATH),
+}
+
+
+def get_photo_storage() -> PhotoStorage:
+    factory = STORAGE_BACKENDS.get(settings.photo_storage_backend)
+    if factory is None:
+        raise ValueError(f"Unknown PHOTO_STORAGE_BACKEND: {settings.photo_storage_backend}")
+    return factory()
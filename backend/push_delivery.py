@@ -0,0 +1,243 @@
+"""
+Expo push delivery
+
+One shared, connection-pooled HTTP client for every push the API sends
+(outbox workers and broadcasts):
+
+- messages are chunked by 100 (Expo's limit per request) and chunks are
+  posted concurrently, bounded by a semaphore and a messages/second budget
+- 429 and 5xx responses are retried with backoff (Retry-After honoured)
+- ticket ids are kept and their receipts fetched once Expo has them; tokens
+  reported as DeviceNotRegistered (in a ticket or a receipt) are cleared
+  from users.push_token, so later broadcasts skip them
+
+settings.expo_push_base_url can point at a local stub (expo_push_stub.py).
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import update
+
+from config import settings
+from database_supabase import AsyncSessionLocal
+from models_supabase import User
+
+logger = logging.getLogger(__name__)
+
+EXPO_BATCH_SIZE = 100
+EXPO_RECEIPT_BATCH_SIZE = 1000
+
+
+class PushReport:
+    """Outcome of a send: per-message tickets, aligned with the messages"""
+
+    def __init__(self):
+        self.tickets: List[dict] = []
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for ticket in self.tickets if ticket.get("status") == "ok")
+
+    @property
+    def failed(self) -> int:
+        return len(self.tickets) - self.sent
+
+
+def ticket_error(ticket: dict) -> Optional[str]:
+    """None for an accepted message, else Expo's error code (or message)"""
+    if ticket.get("status") == "ok":
+        return None
+    return (ticket.get("details") or {}).get("error") or ticket.get("message") or "Unknown"
+
+
+class ExpoPushClient:
+    def __init__(
+        self,
+        base_url: str = None,
+        concurrency: int = None,
+        rate_per_second: int = None,
+        receipt_delay: float = None,
+        max_retries: int = 3
+    ):
+        self.base_url = (base_url or settings.expo_push_base_url).rstrip("/")
+        self.concurrency = concurrency or settings.expo_push_concurrency
+        self.rate_per_second = rate_per_second or settings.expo_push_rate_per_second
+        self.receipt_delay = settings.expo_receipt_delay_seconds if receipt_delay is None else receipt_delay
+        self.max_retries = max_retries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._next_slot = 0.0
+        # ticket id -> (push token, time sent)
+        self._pending_receipts: Dict[str, Tuple[str, float]] = {}
+        self._dead_tokens: Set[str] = set()
+        self._receipt_task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+                headers={"Content-Type": "application/json", "Accept": "application/json"}
+            )
+        return self._client
+
+    def start(self):
+        if self._receipt_task is None:
+            self._receipt_task = asyncio.create_task(self._receipt_loop())
+
+    async def close(self):
+        if self._receipt_task is not None:
+            self._receipt_task.cancel()
+            try:
+                await self._receipt_task
+            except asyncio.CancelledError:
+                pass
+            self._receipt_task = None
+        await self.clear_dead_tokens()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---- sending ----
+
+    async def _throttle(self, count: int):
+        """Reserve send capacity for `count` messages under the per-second budget"""
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + count / self.rate_per_second
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _post_chunk(self, chunk: List[dict]) -> List[dict]:
+        error = "Unknown"
+        for attempt in range(self.max_retries + 1):
+            await self._throttle(len(chunk))
+            delay = 2 ** attempt
+            try:
+                async with self._semaphore:
+                    response = await self.client.post("/push/send", json=chunk)
+                if response.status_code == 200:
+                    tickets = response.json().get("data") or []
+                    # Expo answers one ticket per message, in order
+                    tickets += [{"status": "error", "message": "Missing ticket"}] * (len(chunk) - len(tickets))
+                    return tickets[:len(chunk)]
+                error = f"HTTP {response.status_code}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = int(retry_after)
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+        logger.warning(f"Expo push chunk of {len(chunk)} failed: {error}")
+        return [{"status": "error", "message": error}] * len(chunk)
+
+    def _track(self, chunk: List[dict], tickets: List[dict]):
+        sent_at = time.monotonic()
+        for message, ticket in zip(chunk, tickets):
+            if ticket.get("status") == "ok" and ticket.get("id"):
+                self._pending_receipts[ticket["id"]] = (message["to"], sent_at)
+            elif ticket_error(ticket) == "DeviceNotRegistered":
+                self._dead_tokens.add(message["to"])
+
+    async def send(self, messages: List[dict]) -> PushReport:
+        """Send messages (any number) and return their tickets in order"""
+        chunks = [messages[i:i + EXPO_BATCH_SIZE] for i in range(0, len(messages), EXPO_BATCH_SIZE)]
+        results = await asyncio.gather(*[self._post_chunk(chunk) for chunk in chunks])
+        report = PushReport()
+        for chunk, tickets in zip(chunks, results):
+            self._track(chunk, tickets)
+            report.tickets.extend(tickets)
+        return report
+
+    async def send_batches(self, batches: AsyncIterator[List[dict]]) -> PushReport:
+        """
+        Send batches as they are produced (e.g. from a streamed audience query)
+        with at most `concurrency` batches in flight
+        """
+        report = PushReport()
+        in_flight: Set[asyncio.Task] = set()
+
+        async def drain(return_when):
+            nonlocal in_flight
+            done, in_flight = await asyncio.wait(in_flight, return_when=return_when)
+            for task in done:
+                report.tickets.extend(task.result().tickets)
+
+        async for batch in batches:
+            in_flight.add(asyncio.create_task(self.send(batch)))
+            if len(in_flight) >= self.concurrency:
+                await drain(asyncio.FIRST_COMPLETED)
+        if in_flight:
+            await drain(asyncio.ALL_COMPLETED)
+        return report
+
+    # ---- receipts and dead tokens ----
+
+    async def check_receipts(self, force: bool = False):
+        """Fetch receipts of tickets old enough to have one"""
+        now = time.monotonic()
+        due = [
+            ticket_id for ticket_id, (_, sent_at) in self._pending_receipts.items()
+            if force or now - sent_at >= self.receipt_delay
+        ]
+        for i in range(0, len(due), EXPO_RECEIPT_BATCH_SIZE):
+            ids = due[i:i + EXPO_RECEIPT_BATCH_SIZE]
+            try:
+                async with self._semaphore:
+                    response = await self.client.post("/push/getReceipts", json={"ids": ids})
+                if response.status_code != 200:
+                    logger.warning(f"Expo receipts request failed: HTTP {response.status_code}")
+                    continue
+                receipts = response.json().get("data") or {}
+            except httpx.HTTPError as e:
+                logger.warning(f"Expo receipts request failed: {e}")
+                continue
+
+            for ticket_id in ids:
+                token, _ = self._pending_receipts.pop(ticket_id)
+                receipt = receipts.get(ticket_id)
+                if receipt and ticket_error(receipt) == "DeviceNotRegistered":
+                    self._dead_tokens.add(token)
+
+    async def clear_dead_tokens(self) -> int:
+        """Remove tokens Expo reported as DeviceNotRegistered from users"""
+        if not self._dead_tokens:
+            return 0
+        tokens, self._dead_tokens = list(self._dead_tokens), set()
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(User)
+                    .where(User.push_token.in_(tokens))
+                    .values(push_token=None)
+                )
+                await db.commit()
+            logger.info(f"🧹 Cleared {result.rowcount} unregistered push tokens")
+            return result.rowcount
+        except Exception as e:
+            self._dead_tokens.update(tokens)
+            logger.error(f"Failed to clear unregistered push tokens: {e}")
+            return 0
+
+    async def _receipt_loop(self, interval: float = 60.0):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check_receipts()
+                await self.clear_dead_tokens()
+            except Exception as e:
+                logger.error(f"Expo receipt processing failed: {e}")
+
+
+expo_push = ExpoPushClient()
@@ -0,0 +1,226 @@
+"""
+Push notification outbox
+
+Request handlers no longer call Expo themselves: they insert rows into
+push_outbox (one per recipient, token resolved at enqueue time) and return.
+A small pool of background workers drains the table in batches:
+
+- a batch is claimed with FOR UPDATE SKIP LOCKED and leased by pushing
+  next_attempt_at forward, so several workers (or processes) never send the
+  same row and a crash mid-send only delays it until the lease expires
+- batches go through the shared Expo client (push_delivery.py); tickets are
+  checked per message: ok -> sent, DeviceNotRegistered / MessageTooBig ->
+  failed, anything else -> retried with exponential backoff
+- pending rows survive restarts; sent/failed rows are purged after a week
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, func, literal, bindparam, cast, String, JSON
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database_supabase import AsyncSessionLocal
+from models_supabase import PushOutbox, User
+from push_delivery import EXPO_BATCH_SIZE, expo_push, ticket_error
+
+logger = logging.getLogger(__name__)
+
+# Ticket errors that will not succeed on retry
+PERMANENT_ERRORS = {"DeviceNotRegistered", "MessageTooBig", "InvalidCredentials"}
+
+
+async def enqueue_push(db: AsyncSession, recipients, title: str, body: str, data: dict = None) -> int:
+    """
+    Queue one push per user matching the `recipients` filter (a where clause
+    on User) that has an Expo push token. Single INSERT ... SELECT; the caller
+    commits and then wakes the workers. Returns the number of queued pushes.
+    """
+    source = (
+        select(
+            cast(func.gen_random_uuid(), String),
+            User.id,
+            User.push_token,
+            literal(title),
+            literal(body),
+            literal(data or {}, JSON),
+            literal("pending"),
+            literal(0)
+        )
+        .where(recipients)
+        .where(User.push_token.like("ExponentPushToken%"))
+    )
+    result = await db.execute(
+        PushOutbox.__table__.insert()
+        .from_select(
+            ["id", "user_id", "push_token", "title", "body", "data", "status", "attempts"],
+            source
+        )
+        .returning(PushOutbox.id)
+    )
+    return len(result.all())
+
+
+class PushOutboxWorker:
+    """Background workers delivering queued pushes to Expo"""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        batch_size: int = EXPO_BATCH_SIZE,
+        poll_interval: float = 5.0,
+        lease_seconds: int = 60,
+        max_attempts: int = 8,
+        retention_days: int = 7
+    ):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_days = retention_days
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._last_purge: Optional[datetime] = None
+
+    def wake(self):
+        """Called after enqueue_push has been committed"""
+        self._wake.set()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run(n)) for n in range(self.concurrency)]
+        logger.info(f"📨 Push outbox started with {self.concurrency} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before the next attempt: 30s, 1m, 2m... capped at 1h, with jitter"""
+        return min(3600, 30 * 2 ** max(0, attempts - 1)) * random.uniform(0.8, 1.2)
+
+    async def _run(self, worker_id: int):
+        while True:
+            try:
+                delivered = await self.process_batch()
+                if delivered:
+                    continue
+                if worker_id == 0:
+                    await self._purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Push outbox worker {worker_id} error: {e}")
+
+            # Nothing due: sleep until woken by an enqueue or the next poll
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def claim(self) -> list:
+        """Lease up to batch_size due rows"""
+        due = (
+            select(PushOutbox.id)
+            .where(PushOutbox.status == "pending")
+            .where(PushOutbox.next_attempt_at <= func.now())
+            .order_by(PushOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(PushOutbox)
+                .where(PushOutbox.id.in_(due))
+                .values(
+                    attempts=PushOutbox.attempts + 1,
+                    next_attempt_at=func.now() + timedelta(seconds=self.lease_seconds)
+                )
+                .returning(
+                    PushOutbox.id, PushOutbox.push_token, PushOutbox.title,
+                    PushOutbox.body, PushOutbox.data, PushOutbox.attempts
+                )
+            )
+            rows = result.all()
+            await db.commit()
+        return rows
+
+    async def process_batch(self) -> int:
+        """Claim and deliver one batch. Returns the number of rows handled"""
+        rows = await self.claim()
+        if not rows:
+            return 0
+
+        messages = [
+            {"to": row.push_token, "sound": "default", "title": row.title, "body": row.body, "data": row.data or {}}
+            for row in rows
+        ]
+        report = await expo_push.send(messages)
+        errors = [ticket_error(ticket) for ticket in report.tickets]
+
+        sent, failed, retry = [], [], []
+        for row, error in zip(rows, errors):
+            if error is None:
+                sent.append({"row_id": row.id})
+            elif error in PERMANENT_ERRORS or row.attempts >= self.max_attempts:
+                failed.append({"row_id": row.id, "error": error})
+            else:
+                retry.append({
+                    "row_id": row.id,
+                    "error": error,
+                    "retry_at": datetime.now(timezone.utc) + timedelta(seconds=self.backoff(row.attempts))
+                })
+
+        table = PushOutbox.__table__
+        async with AsyncSessionLocal() as db:
+            if sent:
+                await db.execute(
+                    update(table).where(table.c.id == bindparam("row_id"))
+                    .values(status="sent", sent_at=func.now(), last_error=None),
+                    sent
+                )
+            if failed:
+                await db.execute(
+                    update(table).where(table.c.id == bindparam("row_id"))
+                    .values(status="failed", last_error=bindparam("error")),
+                    failed
+                )
+            if retry:
+                await db.execute(
+                    update(table).where(table.c.id == bindparam("row_id"))
+                    .values(next_attempt_at=bindparam("retry_at"), last_error=bindparam("error")),
+                    retry
+                )
+            await db.commit()
+
+        logger.info(f"📨 Push batch: {len(sent)} sent, {len(failed)} failed, {len(retry)} to retry")
+        return len(rows)
+
+    async def _purge(self):
+        """Drop delivered/failed rows older than the retention period (at most hourly)"""
+        now = datetime.now(timezone.utc)
+        if self._last_purge and now - self._last_purge < timedelta(hours=1):
+            return
+        self._last_purge = now
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(PushOutbox)
+                .where(PushOutbox.status.in_(["sent", "failed"]))
+                .where(PushOutbox.created_at < now - timedelta(days=self.retention_days))
+            )
+            await db.commit()
+
+
+push_worker = PushOutboxWorker()
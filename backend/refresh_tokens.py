@@ -0,0 +1,164 @@
+"""
+Short-lived access tokens renewed with rotating refresh tokens
+
+Logins used to return a single 30-day JWT that could not be taken back.
+They now return an access token valid ACCESS_TOKEN_EXPIRE_MINUTES and an
+opaque refresh token (REFRESH_TOKEN_EXPIRE_DAYS), stored server-side as a
+sha256 hash in refresh_tokens.
+
+POST /api/auth/refresh exchanges a refresh token for a new pair and
+revokes the old one (rotation). All tokens issued from one login share a
+family_id: presenting a refresh token that was already rotated means it
+was copied, so the whole family is revoked and the user has to log in
+again.
+
+Only clients that send the X-Session-Refresh: 1 header on login get that
+pair. App builds released before /api/auth/refresh do not know about it:
+they still get a single access token valid LEGACY_ACCESS_TOKEN_EXPIRE_DAYS
+(revocable by jti and token_version like the others) until the new app
+version is required.
+
+Revocation never costs a query on authenticated requests:
+
+- logout revokes the refresh token's family and the access token's jti
+  (token_revocation.py, checked in memory by every worker)
+- revoke_user_sessions bumps the user's token_version (the "ver" claim of
+  every access token already issued) and revokes all their refresh tokens
+"""
+
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import create_access_token, user_claims
+from config import settings
+from models_supabase import RefreshToken, User
+from token_revocation import revocation_filter
+
+
+REFRESH_HEADER = "x-session-refresh"
+
+
+def wants_refresh_token(request: Request) -> bool:
+    """Whether the client renews its access token with /api/auth/refresh"""
+    return request.headers.get(REFRESH_HEADER) == "1"
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _add_refresh_token(db: AsyncSession, user_id: str, family_id: str) -> Tuple[RefreshToken, str]:
+    token = secrets.token_urlsafe(32)
+    row = RefreshToken(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    )
+    db.add(row)
+    return row, token
+
+
+def _token_pair(user: User, refresh_token: str) -> dict:
+    return {
+        "access_token": create_access_token(data=user_claims(user)),
+        "refresh_token": refresh_token,
+        "expires_in": settings.access_token_expire_minutes * 60
+    }
+
+
+async def issue_session(db: AsyncSession, user: User, with_refresh_token: bool = True) -> dict:
+    """access_token / refresh_token / expires_in of a new login (commits)"""
+    if not with_refresh_token:
+        await db.commit()
+        lifetime = timedelta(days=settings.legacy_access_token_expire_days)
+        return {
+            "access_token": create_access_token(data=user_claims(user), expires_delta=lifetime),
+            "refresh_token": None,
+            "expires_in": int(lifetime.total_seconds())
+        }
+    _, token = _add_refresh_token(db, user.id, str(uuid.uuid4()))
+    await db.commit()
+    return _token_pair(user, token)
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> dict:
+    """New token pair for a valid refresh token, which is revoked (401 otherwise)"""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token)).with_for_update()
+    )
+    current = result.scalar_one_or_none()
+    if current is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if current.revoked_at is not None:
+        # Already rotated (or logged out): whoever holds the family's live token is not trusted either
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == current.family_id)
+            .where(RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        await db.commit()
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+    if current.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Refresh token has expired")
+
+    user = await db.get(User, current.user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    replacement, new_token = _add_refresh_token(db, user.id, current.family_id)
+    current.revoked_at = now
+    current.replaced_by = replacement.id
+    await db.commit()
+    return _token_pair(user, new_token)
+
+
+async def revoke_session(db: AsyncSession, refresh_token: Optional[str], access_payload: Optional[dict]):
+    """Logout: revoke the refresh token's family and the access token (commits)"""
+    if refresh_token:
+        result = await db.execute(
+            select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(refresh_token))
+        )
+        family_id = result.scalar_one_or_none()
+        if family_id:
+            await db.execute(
+                update(RefreshToken)
+                .where(RefreshToken.family_id == family_id)
+                .where(RefreshToken.revoked_at.is_(None))
+                .values(revoked_at=datetime.now(timezone.utc))
+            )
+
+    revoked = None
+    if access_payload and access_payload.get("jti") and access_payload.get("exp"):
+        revoked = (access_payload["jti"], datetime.fromtimestamp(access_payload["exp"], timezone.utc))
+        await revocation_filter.revoke(db, *revoked)
+
+    await db.commit()
+    if revoked:
+        revocation_filter.apply(*revoked)
+
+
+async def revoke_user_sessions(db: AsyncSession, user: User):
+    """Sign the user out everywhere: every access and refresh token (commits)"""
+    now = datetime.now(timezone.utc)
+    user.token_version = (user.token_version or 0) + 1
+    user.sessions_revoked_at = now
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user.id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    await revocation_filter.revoke_user(db, user.id)
+    await db.commit()
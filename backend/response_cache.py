@@ -0,0 +1,83 @@
+"""
+In-process read-through cache for public endpoint payloads
+
+Each cache has a version: write paths call invalidate() after commit, which
+bumps the version and drops every entry (a load that was running during the
+invalidation is not stored). An entry also expires at its own time boundary
+(e.g. the date of the first event in a "date >= now" listing, when that
+event drops out) and after max_ttl at the latest.
+
+Concurrent misses on the same key share one load. Counters are exposed on
+GET /api/admin/cache/stats.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Loader result: (payload, datetime after which it is stale, or None)
+Loader = Callable[[], Awaitable[Tuple[Any, Optional[datetime]]]]
+
+caches: Dict[str, "ResponseCache"] = {}
+
+
+class ResponseCache:
+    def __init__(self, name: str, max_ttl: float = 300.0):
+        self.name = name
+        self.max_ttl = max_ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: Dict[Hashable, Tuple[int, float, Any]] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        caches[name] = self
+
+    def _fresh(self, key: Hashable, now: float):
+        entry = self._entries.get(key)
+        if entry and entry[0] == self.version and entry[1] > now:
+            return entry
+        return None
+
+    async def get_or_load(self, key: Hashable, loader: Loader) -> Any:
+        entry = self._fresh(key, time.time())
+        if entry:
+            self.hits += 1
+            return entry[2]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._fresh(key, time.time())
+            if entry:
+                self.hits += 1
+                return entry[2]
+
+            self.misses += 1
+            version = self.version
+            payload, stale_at = await loader()
+            expires_at = time.time() + self.max_ttl
+            if stale_at is not None:
+                expires_at = min(expires_at, stale_at.timestamp())
+            if version == self.version:
+                self._entries[key] = (version, expires_at, payload)
+            return payload
+
+    def invalidate(self):
+        self.version += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+event_cache = ResponseCache("events")
@@ -0,0 +1,157 @@
+"""
+Event payload serializers
+
+Each endpoint returns a fixed projection of the events table. A Projection
+lists its (key, column, transform) fields once; the query selects only
+those columns and rows are turned into dicts by a function compiled for
+that projection (one dict literal per row, no getattr fallbacks, no
+Pydantic validation).
+
+    rows = (await db.execute(select(*EVENT_UPCOMING.columns)...)).all()
+    payload = EVENT_UPCOMING.serialize_all(rows)
+
+See benchmark_serializers.py for the cost per 1,000 events.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from models_supabase import Event
+
+
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def iso_z(value):
+    """isoformat with UTC written as Z, like the EventResponse model /api/events used"""
+    if value is None:
+        return None
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def or_list(value):
+    return value or []
+
+
+def or_default(default) -> Callable:
+    return lambda value: default if value is None else value
+
+
+class Projection:
+    def __init__(self, name: str, fields: Sequence[Tuple[str, Any, Callable]]):
+        """fields: (payload key, Event column, transform or None)"""
+        self.name = name
+        self.keys = [key for key, _, _ in fields]
+        self.columns = [column for _, column, _ in fields]
+        self._serialize_row = self._compile(fields)
+
+    def _compile(self, fields) -> Callable:
+        namespace: Dict[str, Callable] = {}
+        items = []
+        for index, (key, _, transform) in enumerate(fields):
+            if transform is None:
+                items.append(f"{key!r}: row[{index}]")
+            else:
+                namespace[f"t{index}"] = transform
+                items.append(f"{key!r}: t{index}(row[{index}])")
+        source = f"def serialize_{self.name}(row):\n    return {{{', '.join(items)}}}\n"
+        exec(compile(source, f"<projection {self.name}>", "exec"), namespace)
+        return namespace[f"serialize_{self.name}"]
+
+    def serialize(self, row: Sequence) -> dict:
+        return self._serialize_row(row)
+
+    def serialize_all(self, rows: Iterable[Sequence]) -> List[dict]:
+        serialize_row = self._serialize_row
+        return [serialize_row(row) for row in rows]
+
+    def serialize_object(self, event: Event) -> dict:
+        """Same payload from an ORM instance (e.g. right after an insert)"""
+        return self._serialize_row([getattr(event, column.key) for column in self.columns])
+
+
+# GET /api/events, /api/events/{id}, POST /api/events
+EVENT_FULL = Projection("event_full", [
+    ("id", Event.id, None),
+    ("name", Event.name, None),
+    ("description", Event.description, None),
+    ("event_date", Event.event_date, iso_z),
+    ("venue_name", Event.venue_name, None),
+    ("venue_address", Event.venue_address, None),
+    ("lineup", Event.lineup, or_list),
+    ("ticket_categories", Event.ticket_categories, or_list),
+    ("xceed_ticket_url", Event.xceed_ticket_url, None),
+    ("banner_image", Event.banner_image, None),
+    ("gallery_visible", Event.gallery_visible, or_default(False)),
+    ("aftermovie_visible", Event.aftermovie_visible, or_default(False)),
+    ("gallery_url", Event.gallery_url, None),
+    ("aftermovie_url", Event.aftermovie_url, None),
+    ("visible_in_tickets", Event.visible_in_tickets, or_default(True)),
+    ("is_featured", Event.is_featured, or_default(False)),
+    ("event_type", Event.event_type, or_default("regular")),
+    ("status", Event.status, None),
+])
+
+# GET /api/events/next
+EVENT_NEXT = Projection("event_next", [
+    ("id", Event.id, None),
+    ("name", Event.name, None),
+    ("description", Event.description, None),
+    ("event_date", Event.event_date, iso),
+    ("venue_name", Event.venue_name, None),
+    ("venue_address", Event.venue_address, None),
+    ("lineup", Event.lineup, or_list),
+    ("ticket_categories", Event.ticket_categories, or_list),
+    ("xceed_ticket_url", Event.xceed_ticket_url, None),
+    ("selected_djs", Event.selected_djs, or_list),
+    ("status", Event.status, None),
+])
+
+# GET /api/events/upcoming
+EVENT_UPCOMING = Projection("event_upcoming", [
+    ("id", Event.id, None),
+    ("name", Event.name, None),
+    ("description", Event.description, None),
+    ("event_date", Event.event_date, iso),
+    ("venue_name", Event.venue_name, None),
+    ("venue_address", Event.venue_address, None),
+    ("lineup", Event.lineup, or_list),
+    ("ticket_categories", Event.ticket_categories, or_list),
+    ("xceed_ticket_url", Event.xceed_ticket_url, None),
+    ("selected_djs", Event.selected_djs, or_list),
+    ("banner_image", Event.banner_image, None),
+    ("gallery_url", Event.gallery_url, None),
+    ("aftermovie_url", Event.aftermovie_url, None),
+    ("visible_in_tickets", Event.visible_in_tickets, or_default(True)),
+    ("is_featured", Event.is_featured, or_default(False)),
+    ("event_type", Event.event_type, or_default("regular")),
+    ("status", Event.status, None),
+])
+
+# GET /api/events/for-tickets
+EVENT_TICKETS = Projection("event_tickets", [
+    ("id", Event.id, None),
+    ("name", Event.name, None),
+    ("description", Event.description, None),
+    ("event_date", Event.event_date, iso),
+    ("venue_name", Event.venue_name, None),
+    ("venue_address", Event.venue_address, None),
+    ("banner_image", Event.banner_image, None),
+    ("xceed_ticket_url", Event.xceed_ticket_url, None),
+    ("ticket_categories", Event.ticket_categories, or_list),
+    ("is_featured", Event.is_featured, or_default(False)),
+    ("event_type", Event.event_type, or_default("regular")),
+    ("status", Event.status, None),
+])
+
+# GET /api/events/for-booking
+EVENT_BOOKING = Projection("event_booking", [
+    ("id", Event.id, None),
+    ("name", Event.name, None),
+    ("event_date", Event.event_date, iso),
+    ("venue_name", Event.venue_name, None),
+    ("banner_image", Event.banner_image, None),
+    ("is_featured", Event.is_featured, or_default(False)),
+    ("event_type", Event.event_type, or_default("regular")),
+])
@@ -9,17 +9,21 @@ When ready to switch, rename this file to server.py
 ⚠️  IMPORTANT: This uses MOCK Firebase and Stripe services
 """
 
+import asyncio
 import os
 import secrets
 from fastapi import FastAPI, HTTPException, Depends, Query, Body, File, UploadFile, Request
-from fastapi.responses import Response
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, update, delete, func, or_, and_
+from sqlalchemy import select, update, delete, func, or_, and_, literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import logging
 import json
 import uuid
@@ -32,7 +36,7 @@ from slowapi.errors import RateLimitExceeded
 # Import Supabase modules
 from database_supabase import get_db, init_db, close_db, AsyncSessionLocal
 from models_supabase import (
-    User, Event, Ticket, Product, Order, VIPBooking, SongRequest,
+    User, Event, Ticket, Product, Order, VIPBooking, SongRequest, SongRequestVote, SongRequestQuota,
     FreeEntryVoucher, AppSettings, DJ, Photo, Aftermovie,
     LoyaltyCheckin, LoyaltyReward, LoyaltyTransaction,
     NotificationPreference, ConsentLog, EventQRCode, EventQRScan,
@@ -44,13 +48,29 @@ from config import settings, is_using_mock_keys
 from models import UserCreate, UserLogin, UserBase
 from pydantic import BaseModel, Field
 from auth import (
-    hash_password, verify_password, create_access_token,
+    security, decode_token,
     get_current_user_supabase, get_current_admin_supabase
 )
+from password_hashing import password_hasher
+from accounts import create_user, upsert_social_user
+from refresh_tokens import issue_session, rotate_refresh_token, revoke_session, revoke_user_sessions, wants_refresh_token
+from token_revocation import revocation_filter
 from firebase_service import firebase_service
 from stripe_service import stripe_service
 from utils import generate_ticket_code, generate_qr_data
-import httpx
+from live_feed import song_request_feed
+from song_queue import song_queue
+from push_outbox import enqueue_push, push_worker
+from push_delivery import expo_push
+from response_cache import caches, event_cache
+from settings_cache import app_settings_cache
+from serializers import EVENT_FULL, EVENT_NEXT, EVENT_UPCOMING, EVENT_TICKETS, EVENT_BOOKING
+from conditional_get import ConditionalGetMiddleware, content_versions
+from broadcasts import broadcast_runner, serialize_broadcast
+from photo_pipeline import thumbnail_pipeline
+from photo_storage import MEDIA_MOUNT_PATH, local_storage_enabled
+from galleries import gallery_listing_query, serialize_gallery_rows, photo_page_query, serialize_photo_page, insert_photos, media_url, CLOUDINARY_UPLOAD_SEGMENT
+from pagination import decode_cursor, encode_cursor, escape_like, estimated_row_count
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -58,153 +78,39 @@ limiter = Limiter(key_func=get_remote_address)
 # ============ PUSH NOTIFICATION HELPER ============
 
 async def send_push_notification_to_user(user_id: str, title: str, body: str, data: dict = None, db: AsyncSession = None):
-    """Send push notification to a specific user"""
+    """Queue a push notification for a specific user (delivered by the outbox workers)"""
     if not db:
         return
     
     try:
-        # Get user's push token
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        
-        if not user or not user.push_token:
-            logger.info(f"No push token for user {user_id}")
-            return
+        queued = await enqueue_push(db, User.id == user_id, title, body, data)
+        await db.commit()
         
-        push_token = user.push_token
-        if not push_token.startswith("ExponentPushToken"):
-            logger.warning(f"Invalid push token format for user {user_id}")
+        if not queued:
+            logger.info(f"No valid push token for user {user_id}")
             return
-        
-        message = {
-            "to": push_token,
-            "sound": "default",
-            "title": title,
-            "body": body,
-            "data": data or {}
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://exp.host/--/api/v2/push/send",
-                json=[message],
-                headers={"Content-Type": "application/json"}
-            )
-            logger.info(f"Push notification sent to user {user_id}: {response.status_code}")
+        push_worker.wake()
+        logger.info(f"Push notification queued for user {user_id}")
     except Exception as e:
-        logger.error(f"Error sending push notification to user {user_id}: {e}")
+        logger.error(f"Error queuing push notification for user {user_id}: {e}")
 
 async def send_push_notification_to_admins(title: str, body: str, data: dict = None, db: AsyncSession = None):
-    """Send push notification to all admin users (info@ and seba@)"""
+    """Queue a push notification for all admin users (info@ and seba@)"""
     if not db:
         return 0
 
     try:
-        # Get all admin users with push tokens
-        result = await db.execute(
-            select(User).where(
-                User.role == "admin",
-                User.push_token != None,
-                User.push_token != ""
-            )
-        )
-        admins = result.scalars().all()
-
-        messages = []
-        for admin in admins:
-            if admin.push_token and admin.push_token.startswith("ExponentPushToken"):
-                messages.append({
-                    "to": admin.push_token,
-                    "sound": "default",
-                    "title": title,
-                    "body": body,
-                    "data": data or {}
-                })
-
-        if not messages:
-            logger.info("No admin users with valid push tokens")
-            return 0
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://exp.host/--/api/v2/push/send",
-                json=messages,
-                headers={"Content-Type": "application/json"}
-            )
-            logger.info(f"Push notification sent to {len(messages)} admins: {response.status_code}")
-
-        return len(messages)
-    except Exception as e:
-        logger.error(f"Error sending push notification to admins: {e}")
-        return 0
+        queued = await enqueue_push(db, User.role == "admin", title, body, data)
+        await db.commit()
 
-async def send_push_notification_to_all(title: str, body: str, data: dict = None, db: AsyncSession = None, notification_type: str = None):
-    """Send push notification to all users with valid push tokens"""
-    if not db:
-        return 0
-    
-    try:
-        # Get all users with push tokens
-        result = await db.execute(
-            select(User).where(User.push_token != None).where(User.push_token != "")
-        )
-        users = result.scalars().all()
-        
-        # Filter users with valid push tokens
-        valid_users = []
-        for user in users:
-            if not user.push_token or not user.push_token.startswith("ExponentPushToken"):
-                continue
-
-            # Check notification preferences from NotificationPreference table
-            if notification_type:
-                try:
-                    pref_result = await db.execute(
-                        select(NotificationPreference).where(NotificationPreference.user_id == user.id)
-                    )
-                    prefs = pref_result.scalar_one_or_none()
-                    if prefs:
-                        if notification_type == "new_events" and not prefs.events:
-                            continue
-                        if notification_type == "promotions" and not prefs.promotions:
-                            continue
-                except Exception:
-                    pass  # If preferences check fails, still send
-
-            valid_users.append(user)
-        
-        if not valid_users:
-            logger.info("No users with valid push tokens to notify")
+        if not queued:
+            logger.info("No admin users with valid push tokens")
             return 0
-        
-        # Prepare messages (batch of 100 max per request to Expo)
-        messages = []
-        for user in valid_users:
-            messages.append({
-                "to": user.push_token,
-                "sound": "default",
-                "title": title,
-                "body": body,
-                "data": data or {}
-            })
-        
-        # Send in batches of 100
-        sent_count = 0
-        async with httpx.AsyncClient() as client:
-            for i in range(0, len(messages), 100):
-                batch = messages[i:i+100]
-                response = await client.post(
-                    "https://exp.host/--/api/v2/push/send",
-                    json=batch,
-                    headers={"Content-Type": "application/json"}
-                )
-                if response.status_code == 200:
-                    sent_count += len(batch)
-                logger.info(f"Push notification batch sent: {len(batch)} messages, status: {response.status_code}")
-        
-        return sent_count
+        push_worker.wake()
+        logger.info(f"Push notification queued for {queued} admins")
+        return queued
     except Exception as e:
-        logger.error(f"Error sending push notifications to all: {e}")
+        logger.error(f"Error queuing push notification for admins: {e}")
         return 0
 
 # ============ RESPONSE MODELS ============
@@ -220,26 +126,8 @@ class UserResponse(BaseModel):
     language: str = "en"
     auth_provider: Optional[str] = None
     access_token: Optional[str] = None
-
-class EventResponse(BaseModel):
-    id: str
-    name: str
-    description: Optional[str] = None
-    event_date: datetime
-    venue_name: str
-    venue_address: str
-    lineup: List[Dict[str, str]] = []
-    ticket_categories: List[Dict[str, Any]] = []
-    xceed_ticket_url: Optional[str] = None
-    banner_image: Optional[str] = None
-    gallery_visible: bool = False
-    aftermovie_visible: bool = False
-    gallery_url: Optional[str] = None
-    aftermovie_url: Optional[str] = None
-    visible_in_tickets: bool = True
-    is_featured: bool = False
-    event_type: str = "regular"
-    status: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # access token lifetime, seconds
 
 class TicketResponse(BaseModel):
     id: str
@@ -255,6 +143,12 @@ class TicketResponse(BaseModel):
 class FirebaseTokenData(BaseModel):
     firebase_token: str
 
+class RefreshTokenData(BaseModel):
+    refresh_token: str = Field(..., min_length=20, max_length=200)
+
+class LogoutData(BaseModel):
+    refresh_token: Optional[str] = Field(None, max_length=200)
+
 # 1.7 - Validation Pydantic améliorée
 class TicketPurchase(BaseModel):
     event_id: str
@@ -308,15 +202,44 @@ async def lifespan(app: FastAPI):
     # Create sample products
     await create_sample_products()
     
-    # Initialize app settings
+    # Initialize app settings and keep them cached (updates via LISTEN/NOTIFY)
     await init_app_settings()
+    await app_settings_cache.start()
+    
+    # Catalog ETags also change on writes made by the other workers (LISTEN/NOTIFY)
+    await content_versions.start()
     
     # Create default DJs
     await create_default_djs()
     
+    # The live event's song queue, kept in sync with the other workers (LISTEN/NOTIFY)
+    await song_queue.start()
+    
+    # Deliver queued push notifications (including those left from a previous run)
+    push_worker.start()
+    expo_push.start()
+    
+    # Revoked access tokens, kept in memory (updates via LISTEN/NOTIFY)
+    await revocation_filter.start()
+    
+    # Resume broadcasts interrupted by a restart (each job is claimed by one worker)
+    broadcast_runner.start_resumer()
+    
+    # Gallery thumbnails (resized in a process pool)
+    thumbnail_pipeline.start()
+    
     yield
     
     logger.info("👋 Shutting down Invasion Latina API...")
+    await broadcast_runner.stop()
+    await thumbnail_pipeline.stop()
+    await push_worker.stop()
+    await app_settings_cache.stop()
+    await content_versions.stop()
+    await revocation_filter.stop()
+    await expo_push.close()
+    await song_queue.stop()
+    password_hasher.shutdown()
     await close_db()
 
 # ============ FASTAPI APP INITIALIZATION ============
@@ -325,24 +248,37 @@ app = FastAPI(
     title="Invasion Latina API (Supabase)",
     description="Backend API for Invasion Latina Mobile App - PostgreSQL Version",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Generated photo variants, when they are stored locally (see photo_storage.py)
+if local_storage_enabled():
+    app.mount(MEDIA_MOUNT_PATH, StaticFiles(directory=settings.media_root, check_dir=False), name="media")
+
 # Rate limiter setup
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # CORS Configuration
+# ETag / 304 handling for the public catalog (inside CORS so 304s get CORS headers)
+app.add_middleware(ConditionalGetMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins.split(","),
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "Accept"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "X-Session-Refresh"],
 )
 
 # ============ HELPER FUNCTIONS ============
 
+def mark_events_changed():
+    """Call after committing an event write: drops cached listings and changes catalog ETags"""
+    event_cache.invalidate()
+    content_versions.bump("events", "galleries", "aftermovies")
+
 async def create_master_admin():
     """Create master admin account for testing"""
     async with AsyncSessionLocal() as db:
@@ -356,7 +292,7 @@ async def create_master_admin():
             admin_user = User(
                 email=admin_email,
                 name="Master Admin",
-                hashed_password=hash_password(admin_password),
+                hashed_password=await password_hasher.hash(admin_password),
                 role="admin",
                 loyalty_points=0,
                 badges=["admin"],
@@ -561,7 +497,7 @@ async def setup_admin_account(request: Request, data: AdminSetupRequest, db: Asy
     
     if existing_admin:
         # Update password and ensure admin role
-        existing_admin.hashed_password = hash_password(admin_password)
+        existing_admin.hashed_password = await password_hasher.hash(admin_password)
         existing_admin.role = "admin"
         await db.commit()
         return {"success": True, "message": "Admin account updated", "email": admin_email}
@@ -570,7 +506,7 @@ async def setup_admin_account(request: Request, data: AdminSetupRequest, db: Asy
         new_admin = User(
             email=admin_email,
             name="Admin Invasion",
-            hashed_password=hash_password(admin_password),
+            hashed_password=await password_hasher.hash(admin_password),
             role="admin",
             loyalty_points=0,
             badges=[],
@@ -584,43 +520,20 @@ async def setup_admin_account(request: Request, data: AdminSetupRequest, db: Asy
 @app.post("/api/auth/register", response_model=UserResponse)
 @limiter.limit("3/minute")
 async def register(request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_db)):
-    """Register a new user"""
-    # Check if user already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    existing_user = result.scalar_one_or_none()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Create new user
-    new_user = User(
+    """Register a new user (one transaction, see accounts.py)"""
+    new_user = await create_user(
+        db,
         email=user_data.email,
         name=user_data.name,
-        hashed_password=hash_password(user_data.password),
-        role="user",
-        loyalty_points=0,
-        badges=[],
-        friends=[],
+        hashed_password=await password_hasher.hash(user_data.password),
         language=user_data.language
     )
+    if new_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-    
-    # Create notification preferences with all ON by default
-    notification_prefs = NotificationPreference(
-        user_id=new_user.id,
-        events=True,
-        promotions=True,
-        song_requests=True,
-        friends=True
-    )
-    db.add(notification_prefs)
-    await db.commit()
-    logger.info(f"✅ Created notification preferences for new user: {new_user.email}")
-    
-    # Create access token
-    access_token = create_access_token(data={"sub": new_user.id})
+    # Access + refresh tokens (commits the user and its notification preferences)
+    tokens = await issue_session(db, new_user, wants_refresh_token(request))
+    logger.info(f"✅ Created new user: {new_user.email}")
     
     return UserResponse(
         id=new_user.id,
@@ -631,7 +544,7 @@ async def register(request: Request, user_data: UserCreate, db: AsyncSession = D
         badges=[],
         friends=[],
         language=new_user.language,
-        access_token=access_token
+        **tokens
     )
 
 @app.post("/api/auth/login", response_model=UserResponse)
@@ -641,10 +554,10 @@ async def login(request: Request, credentials: UserLogin, db: AsyncSession = Dep
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await password_hasher.verify(credentials.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    access_token = create_access_token(data={"sub": user.id})
+    tokens = await issue_session(db, user, wants_refresh_token(request))
     
     return UserResponse(
         id=user.id,
@@ -655,7 +568,7 @@ async def login(request: Request, credentials: UserLogin, db: AsyncSession = Dep
         badges=user.badges or [],
         friends=user.friends or [],
         language=user.language or "en",
-        access_token=access_token
+        **tokens
     )
 
 @app.post("/api/auth/firebase-login", response_model=UserResponse)
@@ -683,7 +596,7 @@ async def firebase_login(request: Request, token_data: FirebaseTokenData, db: As
             await db.commit()
             await db.refresh(user)
         
-        access_token = create_access_token(data={"sub": user.id})
+        tokens = await issue_session(db, user, wants_refresh_token(request))
         
         return UserResponse(
             id=user.id,
@@ -694,7 +607,7 @@ async def firebase_login(request: Request, token_data: FirebaseTokenData, db: As
             badges=user.badges or [],
             friends=user.friends or [],
             language=user.language or "en",
-            access_token=access_token
+            **tokens
         )
         
     except Exception as e:
@@ -704,108 +617,37 @@ async def firebase_login(request: Request, token_data: FirebaseTokenData, db: As
 @app.post("/api/auth/social", response_model=UserResponse)
 @limiter.limit("10/minute")
 async def social_login(request: Request, auth_data: SocialAuthData, db: AsyncSession = Depends(get_db)):
-    """Login/Register with Apple or Google"""
+    """Login/Register with Apple or Google (one transaction, see accounts.py)"""
     try:
         email = auth_data.email
-        name = auth_data.name  # Don't use fallback here, check later
         provider_id = auth_data.user_id or (auth_data.id_token[:50] if auth_data.id_token else None)
         
         # For Apple Sign In, email might be null on subsequent logins
         if not email and auth_data.provider == 'apple' and provider_id:
-            result = await db.execute(select(User).where(User.apple_id == provider_id))
-            existing_user = result.scalar_one_or_none()
-            if existing_user:
-                email = existing_user.email
-                # Keep existing name if we don't have a new one
-                if not name or name.lower() == 'user':
-                    name = existing_user.name
+            result = await db.execute(select(User.email).where(User.apple_id == provider_id))
+            email = result.scalar_one_or_none()
         
         if not email:
             raise HTTPException(status_code=400, detail="Email is required. Please use email login or try Sign in with Apple again.")
         
-        # Check if user already exists
-        result = await db.execute(select(User).where(User.email == email))
-        user = result.scalar_one_or_none()
-        
-        if not user and auth_data.provider == 'apple' and provider_id:
-            result = await db.execute(select(User).where(User.apple_id == provider_id))
-            user = result.scalar_one_or_none()
+        user, created = await upsert_social_user(db, auth_data.provider, provider_id, email, auth_data.name)
+        tokens = await issue_session(db, user, wants_refresh_token(request))
         
-        if not user:
-            # Create new user from social login
-            # If no name provided, try to extract from email
-            if not name or name.lower() == 'user':
-                if email and '@' in email and not 'privaterelay' in email:
-                    # Extract name from email (e.g., john.doe@gmail.com -> John Doe)
-                    email_name = email.split('@')[0]
-                    name = ' '.join([part.capitalize() for part in email_name.replace('.', ' ').replace('_', ' ').split()])
-                else:
-                    name = "Nuevo Miembro"  # "New Member" in Spanish for the Latino app
-            
-            user = User(
-                email=email,
-                name=name,
-                auth_provider=auth_data.provider,
-                role="user",
-                loyalty_points=0,
-                badges=[],
-                friends=[],
-                language="fr"
-            )
-            if auth_data.provider == 'apple':
-                user.apple_id = provider_id
-            elif auth_data.provider == 'google':
-                user.google_id = provider_id
-            
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-            
-            # Create notification preferences with all ON by default
-            notification_prefs = NotificationPreference(
-                user_id=user.id,
-                events=True,
-                promotions=True,
-                song_requests=True,
-                friends=True
-            )
-            db.add(notification_prefs)
-            await db.commit()
-            
+        if created:
             logger.info(f"✅ Created new user via {auth_data.provider}: {email}")
         else:
-            # Update provider ID if not set
-            if auth_data.provider == 'apple' and not user.apple_id:
-                user.apple_id = provider_id
-                await db.commit()
-            elif auth_data.provider == 'google' and not user.google_id:
-                user.google_id = provider_id
-                await db.commit()
-            
-            # Update name if we received a better one from Apple (first login)
-            if name and name.lower() != 'user' and (not user.name or user.name.lower() == 'user' or user.name == 'Nuevo Miembro'):
-                user.name = name
-                await db.commit()
-                logger.info(f"✅ Updated user name to: {name}")
-            
-            # Use stored name if no new name provided
-            if not name or name.lower() == 'user':
-                name = user.name
-            
             logger.info(f"✅ Existing user logged in via {auth_data.provider}: {email}")
         
-        access_token = create_access_token(data={"sub": user.id})
-        
         return UserResponse(
             id=user.id,
             email=user.email,
-            name=user.name or name,
+            name=user.name,
             role=user.role or "user",
             loyalty_points=user.loyalty_points or 0,
             badges=user.badges or [],
             friends=user.friends or [],
             language=user.language or "fr",
-            access_token=access_token
+            **tokens
         )
         
     except HTTPException:
@@ -814,6 +656,28 @@ async def social_login(request: Request, auth_data: SocialAuthData, db: AsyncSes
         logger.error(f"Social login error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Social login failed: {str(e)}")
 
+@app.post("/api/auth/refresh")
+@limiter.limit("30/minute")
+async def refresh_access_token(request: Request, data: RefreshTokenData, db: AsyncSession = Depends(get_db)):
+    """New access token (and refresh token - the one sent is revoked) for an expired session"""
+    tokens = await rotate_refresh_token(db, data.refresh_token)
+    return {**tokens, "token_type": "bearer"}
+
+@app.post("/api/auth/logout")
+async def logout(
+    data: LogoutData = Body(LogoutData()),
+    db: AsyncSession = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Revoke the session: its refresh tokens and the access token used for this call"""
+    try:
+        payload = decode_token(credentials.credentials)
+    except HTTPException:
+        # Expired access token: nothing left to revoke, the refresh token still is
+        payload = None
+    await revoke_session(db, data.refresh_token, payload)
+    return {"success": True}
+
 @app.get("/api/auth/me", response_model=UserResponse)
 async def get_current_user_info(
     db: AsyncSession = Depends(get_db),
@@ -859,226 +723,133 @@ async def update_push_token(
 
 # ============ EVENT ENDPOINTS ============
 
-@app.get("/api/events", response_model=List[EventResponse])
+@app.get("/api/events")
 async def get_events(
     status: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db)
 ):
     """Get all events, optionally filtered by status"""
-    query = select(Event).order_by(Event.event_date)
+    query = select(*EVENT_FULL.columns).order_by(Event.event_date)
     if status:
         query = query.where(Event.status == status)
     
     result = await db.execute(query)
-    events = result.scalars().all()
-    
-    return [
-        EventResponse(
-            id=event.id,
-            name=event.name,
-            description=event.description,
-            event_date=event.event_date,
-            venue_name=event.venue_name,
-            venue_address=event.venue_address,
-            lineup=event.lineup or [],
-            ticket_categories=event.ticket_categories or [],
-            xceed_ticket_url=event.xceed_ticket_url,
-            banner_image=event.banner_image,
-            gallery_visible=event.gallery_visible,
-            aftermovie_visible=event.aftermovie_visible,
-            gallery_url=getattr(event, 'gallery_url', None),
-            aftermovie_url=getattr(event, 'aftermovie_url', None),
-            visible_in_tickets=getattr(event, 'visible_in_tickets', True),
-            is_featured=getattr(event, 'is_featured', False),
-            event_type=getattr(event, 'event_type', 'regular'),
-            status=event.status
+    return ORJSONResponse(EVENT_FULL.serialize_all(result.all()))
+
+async def load_next_event(db: AsyncSession) -> dict:
+    """Payload of GET /api/events/next (cached)"""
+    async def load():
+        result = await db.execute(
+            select(*EVENT_NEXT.columns)
+            .where(Event.event_date >= datetime.now(timezone.utc))
+            .where(Event.status.in_(["published", "upcoming"]))
+            .order_by(Event.event_date)
+            .limit(1)
         )
-        for event in events
-    ]
+        row = result.first()
+        # Stale once this event has started
+        stale_at = row.event_date if row else None
+        
+        if not row:
+            result = await db.execute(select(*EVENT_NEXT.columns).order_by(Event.event_date.desc()).limit(1))
+            row = result.first()
+        
+        if not row:
+            # Use dynamic future date for mock event
+            from datetime import timedelta
+            next_saturday = datetime.now() + timedelta(days=(5 - datetime.now().weekday()) % 7 + 7)
+            next_event_date = next_saturday.replace(hour=22, minute=0, second=0, microsecond=0)
+            return {
+                "event": {
+                    "id": "mock-event-001",
+                    "name": "Invasion Latina - Summer Edition",
+                    "description": "The biggest reggaeton party in Belgium!",
+                    "event_date": next_event_date.isoformat(),
+                    "venue_name": "Spirito Brussels",
+                    "venue_address": "Rue de Stassart 18, 1050 Bruxelles",
+                    "lineup": [
+                        {"name": "DJ Reggaeton King", "role": "Main Stage"},
+                        {"name": "MC Latino", "role": "Host"}
+                    ],
+                    "ticket_categories": [
+                        {"name": "Standard", "price": 20.0, "available": True},
+                        {"name": "VIP", "price": 40.0, "available": True}
+                    ],
+                    "xceed_ticket_url": "https://xceed.me/invasion-latina",
+                    "status": "published"
+                }
+            }, None
+        
+        return {"event": EVENT_NEXT.serialize(row)}, stale_at
+    
+    return await event_cache.get_or_load("next", load)
 
 @app.get("/api/events/next")
 async def get_next_event(db: AsyncSession = Depends(get_db)):
     """Get the next upcoming event"""
-    result = await db.execute(
-        select(Event)
-        .where(Event.event_date >= datetime.now(timezone.utc))
-        .where(Event.status.in_(["published", "upcoming"]))
-        .order_by(Event.event_date)
-        .limit(1)
-    )
-    next_event = result.scalar_one_or_none()
-    
-    if not next_event:
-        result = await db.execute(select(Event).order_by(Event.event_date.desc()).limit(1))
-        next_event = result.scalar_one_or_none()
-    
-    if not next_event:
-        # Use dynamic future date for mock event
-        from datetime import timedelta
-        next_saturday = datetime.now() + timedelta(days=(5 - datetime.now().weekday()) % 7 + 7)
-        next_event_date = next_saturday.replace(hour=22, minute=0, second=0, microsecond=0)
-        return {
-            "event": {
-                "id": "mock-event-001",
-                "name": "Invasion Latina - Summer Edition",
-                "description": "The biggest reggaeton party in Belgium!",
-                "event_date": next_event_date.isoformat(),
-                "venue_name": "Spirito Brussels",
-                "venue_address": "Rue de Stassart 18, 1050 Bruxelles",
-                "lineup": [
-                    {"name": "DJ Reggaeton King", "role": "Main Stage"},
-                    {"name": "MC Latino", "role": "Host"}
-                ],
-                "ticket_categories": [
-                    {"name": "Standard", "price": 20.0, "available": True},
-                    {"name": "VIP", "price": 40.0, "available": True}
-                ],
-                "xceed_ticket_url": "https://xceed.me/invasion-latina",
-                "status": "published"
-            }
-        }
+    return ORJSONResponse(await load_next_event(db))
+
+async def load_upcoming_events(db: AsyncSession, limit: int = 10) -> dict:
+    """Payload of GET /api/events/upcoming (cached)"""
+    async def load():
+        result = await db.execute(
+            select(*EVENT_UPCOMING.columns)
+            .where(Event.event_date >= datetime.now(timezone.utc))
+            .where(Event.status.in_(["published", "upcoming"]))
+            .order_by(Event.event_date)
+            .limit(limit)
+        )
+        rows = result.all()
+        return {"events": EVENT_UPCOMING.serialize_all(rows)}, rows[0].event_date if rows else None
     
-    return {
-        "event": {
-            "id": next_event.id,
-            "name": next_event.name,
-            "description": next_event.description,
-            "event_date": next_event.event_date.isoformat() if next_event.event_date else None,
-            "venue_name": next_event.venue_name,
-            "venue_address": next_event.venue_address,
-            "lineup": next_event.lineup or [],
-            "ticket_categories": next_event.ticket_categories or [],
-            "xceed_ticket_url": next_event.xceed_ticket_url,
-            "selected_djs": next_event.selected_djs or [],
-            "status": next_event.status
-        }
-    }
+    return await event_cache.get_or_load(("upcoming", limit), load)
 
 @app.get("/api/events/upcoming")
-async def get_upcoming_events(db: AsyncSession = Depends(get_db), limit: int = 10):
+async def get_upcoming_events(db: AsyncSession = Depends(get_db), limit: int = Query(10, ge=1, le=50)):
     """Get all upcoming events (for multiple countdowns on home page)"""
-    result = await db.execute(
-        select(Event)
-        .where(Event.event_date >= datetime.now(timezone.utc))
-        .where(Event.status.in_(["published", "upcoming"]))
-        .order_by(Event.event_date)
-        .limit(limit)
-    )
-    events = result.scalars().all()
-    
-    return {
-        "events": [
-            {
-                "id": event.id,
-                "name": event.name,
-                "description": event.description,
-                "event_date": event.event_date.isoformat() if event.event_date else None,
-                "venue_name": event.venue_name,
-                "venue_address": event.venue_address,
-                "lineup": event.lineup or [],
-                "ticket_categories": event.ticket_categories or [],
-                "xceed_ticket_url": event.xceed_ticket_url,
-                "selected_djs": event.selected_djs or [],
-                "banner_image": event.banner_image,
-                "gallery_url": getattr(event, 'gallery_url', None),
-                "aftermovie_url": getattr(event, 'aftermovie_url', None),
-                "visible_in_tickets": getattr(event, 'visible_in_tickets', True),
-                "is_featured": getattr(event, 'is_featured', False),
-                "event_type": getattr(event, 'event_type', 'regular'),
-                "status": event.status
-            }
-            for event in events
-        ]
-    }
+    return ORJSONResponse(await load_upcoming_events(db, limit))
 
 @app.get("/api/events/for-tickets")
 async def get_events_for_tickets(db: AsyncSession = Depends(get_db)):
     """Get events visible in tickets section - admin controls visibility via toggle"""
-    result = await db.execute(
-        select(Event)
-        .where(Event.status.in_(["published", "upcoming"]))
-        .where(Event.visible_in_tickets == True)
-        .order_by(Event.event_date)
-    )
-    events = result.scalars().all()
-
-    return {
-        "events": [
-            {
-                "id": event.id,
-                "name": event.name,
-                "description": event.description,
-                "event_date": event.event_date.isoformat() if event.event_date else None,
-                "venue_name": event.venue_name,
-                "venue_address": event.venue_address,
-                "banner_image": event.banner_image,
-                "xceed_ticket_url": event.xceed_ticket_url,
-                "ticket_categories": event.ticket_categories or [],
-                "is_featured": getattr(event, 'is_featured', False),
-                "event_type": getattr(event, 'event_type', 'regular'),
-                "status": event.status
-            }
-            for event in events
-        ]
-    }
+    async def load():
+        result = await db.execute(
+            select(*EVENT_TICKETS.columns)
+            .where(Event.status.in_(["published", "upcoming"]))
+            .where(Event.visible_in_tickets == True)
+            .order_by(Event.event_date)
+        )
+        return {"events": EVENT_TICKETS.serialize_all(result.all())}, None
+    
+    return ORJSONResponse(await event_cache.get_or_load("for-tickets", load))
 
 @app.get("/api/events/for-booking")
 async def get_events_for_booking(db: AsyncSession = Depends(get_db)):
     """Get upcoming events for table booking (VIP reservations)"""
-    result = await db.execute(
-        select(Event)
-        .where(Event.event_date >= datetime.now(timezone.utc))
-        .where(Event.status.in_(["published", "upcoming"]))
-        .order_by(Event.event_date)
-    )
-    events = result.scalars().all()
+    async def load():
+        result = await db.execute(
+            select(*EVENT_BOOKING.columns)
+            .where(Event.event_date >= datetime.now(timezone.utc))
+            .where(Event.status.in_(["published", "upcoming"]))
+            .order_by(Event.event_date)
+        )
+        rows = result.all()
+        return {"events": EVENT_BOOKING.serialize_all(rows)}, rows[0].event_date if rows else None
     
-    return {
-        "events": [
-            {
-                "id": event.id,
-                "name": event.name,
-                "event_date": event.event_date.isoformat() if event.event_date else None,
-                "venue_name": event.venue_name,
-                "banner_image": event.banner_image,
-                "is_featured": getattr(event, 'is_featured', False),
-                "event_type": getattr(event, 'event_type', 'regular'),
-            }
-            for event in events
-        ]
-    }
+    return ORJSONResponse(await event_cache.get_or_load("for-booking", load))
 
-@app.get("/api/events/{event_id}", response_model=EventResponse)
+@app.get("/api/events/{event_id}")
 async def get_event(event_id: str, db: AsyncSession = Depends(get_db)):
     """Get specific event by ID"""
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
+    result = await db.execute(select(*EVENT_FULL.columns).where(Event.id == event_id))
+    row = result.first()
     
-    if not event:
+    if not row:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    return EventResponse(
-        id=event.id,
-        name=event.name,
-        description=event.description,
-        event_date=event.event_date,
-        venue_name=event.venue_name,
-        venue_address=event.venue_address,
-        lineup=event.lineup or [],
-        ticket_categories=event.ticket_categories or [],
-        xceed_ticket_url=event.xceed_ticket_url,
-        banner_image=event.banner_image,
-        gallery_visible=event.gallery_visible,
-        aftermovie_visible=event.aftermovie_visible,
-        gallery_url=getattr(event, 'gallery_url', None),
-        aftermovie_url=getattr(event, 'aftermovie_url', None),
-        visible_in_tickets=getattr(event, 'visible_in_tickets', True),
-        is_featured=getattr(event, 'is_featured', False),
-        event_type=getattr(event, 'event_type', 'regular'),
-        status=event.status
-    )
-
-@app.post("/api/events", response_model=EventResponse)
+    return ORJSONResponse(EVENT_FULL.serialize(row))
+
+@app.post("/api/events")
 async def create_event(
     event_data: EventCreate,
     db: AsyncSession = Depends(get_db),
@@ -1099,23 +870,9 @@ async def create_event(
     db.add(new_event)
     await db.commit()
     await db.refresh(new_event)
+    mark_events_changed()
     
-    return EventResponse(
-        id=new_event.id,
-        name=new_event.name,
-        description=new_event.description,
-        event_date=new_event.event_date,
-        venue_name=new_event.venue_name,
-        venue_address=new_event.venue_address,
-        lineup=new_event.lineup or [],
-        ticket_categories=new_event.ticket_categories or [],
-        gallery_url=getattr(new_event, 'gallery_url', None),
-        aftermovie_url=getattr(new_event, 'aftermovie_url', None),
-        visible_in_tickets=getattr(new_event, 'visible_in_tickets', True),
-        is_featured=getattr(new_event, 'is_featured', False),
-        event_type=getattr(new_event, 'event_type', 'regular'),
-        status="upcoming"
-    )
+    return ORJSONResponse(EVENT_FULL.serialize_object(new_event))
 
 @app.put("/api/admin/events/{event_id}/djs")
 async def update_event_djs(
@@ -1133,12 +890,112 @@ async def update_event_djs(
     
     event.selected_djs = dj_data.selected_djs
     await db.commit()
+    mark_events_changed()
     
     logger.info(f"✅ Updated DJs for event {event_id}: {dj_data.selected_djs}")
     return {"message": "DJs selection updated successfully", "selected_djs": dj_data.selected_djs}
 
 # ============ SONG REQUEST ENDPOINTS ============
 
+MAX_SONGS_PER_USER = 3
+QUOTA_STATUSES = ("pending", "played")  # Requests that count against a user's quota
+
+async def claim_song_request_slot(db: AsyncSession, event_id: str, user_id: str) -> Optional[int]:
+    """Atomically take one request slot for a user on an event.
+
+    Returns the user's new request count, or None when the quota is already used up.
+    The increment joins the caller's transaction, so it is undone if the request fails.
+    """
+    stmt = pg_insert(SongRequestQuota).values(event_id=event_id, user_id=user_id, request_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SongRequestQuota.event_id, SongRequestQuota.user_id],
+        set_={"request_count": SongRequestQuota.request_count + 1, "updated_at": func.now()},
+        where=SongRequestQuota.request_count < MAX_SONGS_PER_USER
+    ).returning(SongRequestQuota.request_count)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+async def adjust_song_request_slots(db: AsyncSession, request: SongRequest, delta: int):
+    """Give back (delta < 0) or take again (delta > 0) one slot per requester, e.g. when a request is rejected or restored"""
+    if not request.event_id:
+        return
+    requesters = select(
+        literal(request.event_id), SongRequestVote.user_id, literal(max(delta, 0))
+    ).where(
+        SongRequestVote.request_id == request.id,
+        SongRequestVote.is_requester == True
+    )
+    stmt = pg_insert(SongRequestQuota).from_select(
+        ["event_id", "user_id", "request_count"], requesters
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SongRequestQuota.event_id, SongRequestQuota.user_id],
+        set_={
+            "request_count": func.greatest(SongRequestQuota.request_count + delta, 0),
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+
+async def add_song_request_vote(db: AsyncSession, request_id: str, user_id: str, as_requester: bool = False) -> Optional[bool]:
+    """Record a user's vote (and optionally their request) on a song request.
+
+    Returns True if this is a new voter, False if an existing voter just became
+    a requester, and None if nothing changed (already voted / already requested).
+    """
+    result = await db.execute(
+        pg_insert(SongRequestVote)
+        .values(id=str(uuid.uuid4()), request_id=request_id, user_id=user_id, is_requester=as_requester)
+        .on_conflict_do_nothing(index_elements=[SongRequestVote.request_id, SongRequestVote.user_id])
+        .returning(SongRequestVote.id)
+    )
+    if result.scalar_one_or_none():
+        return True
+    
+    if as_requester:
+        result = await db.execute(
+            update(SongRequestVote)
+            .where(SongRequestVote.request_id == request_id)
+            .where(SongRequestVote.user_id == user_id)
+            .where(SongRequestVote.is_requester == False)
+            .values(is_requester=True)
+            .returning(SongRequestVote.id)
+        )
+        if result.scalar_one_or_none():
+            return False
+    
+    return None
+
+def serialize_song_request(req: SongRequest) -> dict:
+    """Public fields of a song request (shared by the list endpoint and the live feed)"""
+    return {
+        "id": req.id,
+        "song_title": req.song_title,
+        "artist_name": req.artist_name,
+        "user_name": req.user_name,
+        "votes": req.votes,
+        "times_requested": req.times_requested or 1,
+        "requested_at": req.requested_at,
+        "status": req.status,
+        "rejection_reason": req.rejection_reason,
+        "rejection_label": req.rejection_label,
+        "event_id": req.event_id
+    }
+
+async def notify_song_quota_reached(user_id: str, event_id: str, db: AsyncSession):
+    """Tell a user they have used all their song requests for the night"""
+    try:
+        await send_push_notification_to_user(
+            user_id=user_id,
+            title="🎵 Quota atteint !",
+            body=f"Tu as fait tes {MAX_SONGS_PER_USER} demandes de musique pour cette soirée. Profite bien de la fête ! 🎉",
+            data={"type": "song_quota_reached", "event_id": event_id},
+            db=db
+        )
+        logger.info(f"✅ Sent quota notification to user {user_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to send quota notification: {e}")
+
 @app.post("/api/dj/request-song")
 async def request_song(
     song_data: Dict[str, str] = Body(...),
@@ -1150,8 +1007,7 @@ async def request_song(
     is_admin = current_user.role in ["admin", "dj"]
     
     # Check if song requests are enabled (admins bypass this)
-    result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
-    settings = result.scalar_one_or_none()
+    settings = await app_settings_cache.get()
     
     if not is_admin and (not settings or not settings.requests_enabled):
         raise HTTPException(
@@ -1208,39 +1064,31 @@ async def request_song(
     if not song_data.get("song_title") or not song_data.get("artist_name"):
         raise HTTPException(status_code=400, detail="Song title and artist name are required")
     
-    # Get current event
-    result = await db.execute(
-        select(Event)
-        .where(Event.status.in_(["live", "upcoming"]))
-        .order_by(Event.event_date.desc())
-        .limit(1)
-    )
-    current_event = result.scalar_one_or_none()
-    event_id = current_event.id if current_event else "default_event"
+    # Get current event: the one started by the admin, else the latest live/upcoming one
+    if settings and settings.current_event_id:
+        event_id = settings.current_event_id
+    else:
+        result = await db.execute(
+            select(Event)
+            .where(Event.status.in_(["live", "upcoming"]))
+            .order_by(Event.event_date.desc())
+            .limit(1)
+        )
+        current_event = result.scalar_one_or_none()
+        event_id = current_event.id if current_event else "default_event"
     
     # Normalize for comparison
     song_title_normalized = song_data["song_title"].strip().lower()
     artist_name_normalized = song_data["artist_name"].strip().lower()
     user_id = current_user.id
     
-    # Check how many songs this user has already requested for this event (limit: 3)
-    MAX_SONGS_PER_USER = 3
+    # Take one of the user's request slots for this event (limit: 3).
+    # Single upsert on song_request_quotas - rolled back with the rest of the
+    # transaction if the request is refused below.
+    user_request_count = None
     if not is_admin:
-        # Count requests where user_id is the original requester (user_id column)
-        # Also count requests where user is in the requesters JSON list
-        # Use a simpler approach: fetch all requests for this event and count in Python
-        all_event_requests = await db.execute(
-            select(SongRequest)
-            .where(SongRequest.event_id == event_id)
-            .where(SongRequest.status.in_(["pending", "played"]))
-        )
-        all_requests = all_event_requests.scalars().all()
-        user_total_requests = sum(
-            1 for req in all_requests
-            if user_id in (req.requesters or []) or req.user_id == user_id
-        )
-
-        if user_total_requests >= MAX_SONGS_PER_USER:
+        user_request_count = await claim_song_request_slot(db, event_id, user_id)
+        if user_request_count is None:
             raise HTTPException(
                 status_code=400,
                 detail=f"Vous avez déjà demandé {MAX_SONGS_PER_USER} chansons pour cette soirée. Limite atteinte!"
@@ -1257,47 +1105,42 @@ async def request_song(
     existing = result.scalar_one_or_none()
 
     if existing:
+        new_voter = await add_song_request_vote(db, existing.id, user_id, as_requester=True)
+        
         # Admins can bypass the duplicate check
-        if not is_admin and user_id in (existing.requesters or []):
+        if new_voter is None and not is_admin:
             raise HTTPException(status_code=400, detail="Vous avez déjà demandé cette chanson")
         
-        existing.times_requested = (existing.times_requested or 1) + 1
-        existing.votes = (existing.votes or 1) + 1
-        existing.requesters = (existing.requesters or []) + [user_id]
-        existing.voters = (existing.voters or []) + [user_id]
+        result = await db.execute(
+            update(SongRequest)
+            .where(SongRequest.id == existing.id)
+            .values(
+                times_requested=func.coalesce(SongRequest.times_requested, 1) + 1,
+                votes=func.coalesce(SongRequest.votes, 1) + (1 if new_voter else 0)
+            )
+            .returning(SongRequest.times_requested, SongRequest.votes)
+        )
+        times_requested, votes = result.one()
+        await song_queue.notify_changed(db, [existing.id])
         await db.commit()
         
-        # Check if user has reached their quota (3 songs) and send notification
-        if not is_admin:
-            all_event_requests_check = await db.execute(
-                select(SongRequest)
-                .where(SongRequest.event_id == event_id)
-                .where(SongRequest.status.in_(["pending", "played"]))
-            )
-            all_requests_check = all_event_requests_check.scalars().all()
-            user_requests_check = sum(
-                1 for req in all_requests_check
-                if user_id in (req.requesters or []) or req.user_id == user_id
-            )
-            
-            if user_requests_check >= MAX_SONGS_PER_USER:
-                try:
-                    await send_push_notification_to_user(
-                        user_id=user_id,
-                        title="🎵 Quota atteint !",
-                        body=f"Tu as fait tes {MAX_SONGS_PER_USER} demandes de musique pour cette soirée. Profite bien de la fête ! 🎉",
-                        data={"type": "song_quota_reached", "event_id": event_id},
-                        db=db
-                    )
-                    logger.info(f"✅ Sent quota notification to user {user_id}")
-                except Exception as e:
-                    logger.error(f"❌ Failed to send quota notification: {e}")
+        song_queue.apply_joined_request(existing.id, user_id, times_requested)
+        live_record = song_queue.get(existing.id)
+        song_request_feed.publish(event_id, "request_updated", {
+            "id": existing.id,
+            "votes": live_record.votes if live_record else votes,
+            "times_requested": times_requested
+        })
+        
+        # Notify the user once they have used their last slot
+        if user_request_count == MAX_SONGS_PER_USER:
+            await notify_song_quota_reached(user_id, event_id, db)
         
         return {
-            "message": f"Demande ajoutée! '{existing.song_title}' a maintenant {existing.times_requested} demandes! 🔥",
+            "message": f"Demande ajoutée! '{existing.song_title}' a maintenant {times_requested} demandes! 🔥",
             "request_id": existing.id,
             "song": f"{existing.song_title} by {existing.artist_name}",
-            "times_requested": existing.times_requested
+            "times_requested": times_requested
         }
     
     # Create new song request
@@ -1310,43 +1153,25 @@ async def request_song(
         song_title_normalized=song_title_normalized,
         artist_name_normalized=artist_name_normalized,
         votes=1,
-        voters=[user_id],
-        requesters=[user_id],
+        voters=[],
+        requesters=[],
         times_requested=1,
         status="pending"
     )
     
     db.add(new_request)
+    await db.flush()
+    db.add(SongRequestVote(request_id=new_request.id, user_id=user_id, is_requester=True))
+    await song_queue.notify_changed(db, [new_request.id])
     await db.commit()
     await db.refresh(new_request)
     
-    # Check if user has reached their quota (3 songs) and send notification
-    if not is_admin:
-        # Recount after adding this request
-        all_event_requests_after = await db.execute(
-            select(SongRequest)
-            .where(SongRequest.event_id == event_id)
-            .where(SongRequest.status.in_(["pending", "played"]))
-        )
-        all_requests_after = all_event_requests_after.scalars().all()
-        user_requests_after = sum(
-            1 for req in all_requests_after
-            if user_id in (req.requesters or []) or req.user_id == user_id
-        )
-        
-        if user_requests_after >= MAX_SONGS_PER_USER:
-            # Send push notification to inform user they've reached their quota
-            try:
-                await send_push_notification_to_user(
-                    user_id=user_id,
-                    title="🎵 Quota atteint !",
-                    body=f"Tu as fait tes {MAX_SONGS_PER_USER} demandes de musique pour cette soirée. Profite bien de la fête ! 🎉",
-                    data={"type": "song_quota_reached", "event_id": event_id},
-                    db=db
-                )
-                logger.info(f"✅ Sent quota notification to user {user_id}")
-            except Exception as e:
-                logger.error(f"❌ Failed to send quota notification: {e}")
+    song_queue.apply_new_request(new_request)
+    song_request_feed.publish(event_id, "request_created", serialize_song_request(new_request))
+    
+    # Notify the user once they have used their last slot
+    if user_request_count == MAX_SONGS_PER_USER:
+        await notify_song_quota_reached(user_id, event_id, db)
     
     return {
         "message": "Demande envoyée!",
@@ -1363,6 +1188,10 @@ async def get_song_requests(
     current_user: User = Depends(get_current_user_supabase)
 ):
     """Get song requests with optional filters"""
+    # The live event's queue is served from memory
+    if song_queue.is_live(event_id):
+        return song_queue.live.listing(current_user.id, status=status)
+    
     # Build query with filters FIRST, then order and limit
     query = select(SongRequest)
     
@@ -1377,26 +1206,43 @@ async def get_song_requests(
     result = await db.execute(query)
     requests = result.scalars().all()
     
+    # The current user's votes/requests among the returned songs, in one indexed lookup
     user_id = current_user.id
+    my_votes = {}
+    if requests:
+        votes_result = await db.execute(
+            select(SongRequestVote.request_id, SongRequestVote.is_requester)
+            .where(SongRequestVote.user_id == user_id)
+            .where(SongRequestVote.request_id.in_([req.id for req in requests]))
+        )
+        my_votes = dict(votes_result.all())
+    
     return [
         {
-            "id": req.id,
-            "song_title": req.song_title,
-            "artist_name": req.artist_name,
-            "user_name": req.user_name,
-            "votes": req.votes,
-            "times_requested": req.times_requested or 1,
-            "requested_at": req.requested_at,
-            "status": req.status,
-            "rejection_reason": req.rejection_reason,
-            "rejection_label": req.rejection_label,
-            "event_id": req.event_id,
-            "can_vote": user_id not in (req.voters or []),
-            "can_request": user_id not in (req.requesters or [])
+            **serialize_song_request(req),
+            "can_vote": req.id not in my_votes,
+            "can_request": not my_votes.get(req.id, False)
         }
         for req in requests
     ]
 
+@app.get("/api/dj/requests/stream")
+async def stream_song_requests(
+    event_id: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user_supabase)
+):
+    """Live feed of song request changes (Server-Sent Events).
+
+    Events: request_created, request_updated (votes), status_changed,
+    request_deleted, cleared, and resync when the client fell behind and
+    should reload GET /api/dj/requests.
+    """
+    return StreamingResponse(
+        song_request_feed.stream(event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.delete("/api/dj/requests/clear-all")
 async def clear_all_song_requests(
     db: AsyncSession = Depends(get_db),
@@ -1404,7 +1250,11 @@ async def clear_all_song_requests(
 ):
     """Delete all song requests (Admin only)"""
     result = await db.execute(delete(SongRequest))
+    await db.execute(delete(SongRequestQuota))
+    await song_queue.notify_reload(db)
     await db.commit()
+    song_queue.apply_clear()
+    song_request_feed.publish(None, "cleared", {})
     logger.info(f"✅ Cleared all song requests")
     return {"message": "Toutes les demandes ont été supprimées"}
 
@@ -1415,23 +1265,49 @@ async def vote_for_song(
     current_user: User = Depends(get_current_user_supabase)
 ):
     """Vote for a song request"""
-    result = await db.execute(select(SongRequest).where(SongRequest.id == request_id))
-    request = result.scalar_one_or_none()
+    # Live event: checked and counted in memory, written back by the queue flusher
+    if song_queue.get(request_id):
+        try:
+            record = song_queue.vote(request_id, current_user.id)
+        except ValueError as e:
+            if str(e) == "already_voted":
+                raise HTTPException(status_code=400, detail="You have already voted for this song")
+            if str(e) == "not_pending":
+                raise HTTPException(status_code=400, detail="Cannot vote on this request")
+            raise HTTPException(status_code=404, detail="Song request not found")
+        
+        song_request_feed.publish(record.event_id, "request_updated", {
+            "id": request_id, "votes": record.votes, "times_requested": record.times_requested
+        })
+        return {"message": "Vote added successfully"}
     
-    if not request:
+    result = await db.execute(select(SongRequest.status).where(SongRequest.id == request_id))
+    request_status = result.scalar_one_or_none()
+    
+    if not request_status:
         raise HTTPException(status_code=404, detail="Song request not found")
     
-    if request.status != "pending":
+    if request_status != "pending":
         raise HTTPException(status_code=400, detail="Cannot vote on this request")
     
-    user_id = current_user.id
-    if user_id in (request.voters or []):
+    # Unique (request_id, user_id) makes concurrent double votes impossible
+    if not await add_song_request_vote(db, request_id, current_user.id):
         raise HTTPException(status_code=400, detail="You have already voted for this song")
     
-    request.votes = (request.votes or 0) + 1
-    request.voters = (request.voters or []) + [user_id]
+    result = await db.execute(
+        update(SongRequest)
+        .where(SongRequest.id == request_id)
+        .values(votes=func.coalesce(SongRequest.votes, 0) + 1)
+        .returning(SongRequest.event_id, SongRequest.votes, SongRequest.times_requested)
+    )
+    event_id, votes, times_requested = result.one()
+    await song_queue.notify_changed(db, [request_id])
     await db.commit()
     
+    song_request_feed.publish(event_id, "request_updated", {
+        "id": request_id, "votes": votes, "times_requested": times_requested or 1
+    })
+    
     return {"message": "Vote added successfully"}
 
 @app.post("/api/dj/admin/update-request/{request_id}")
@@ -1449,16 +1325,33 @@ async def update_song_request(
         raise HTTPException(status_code=404, detail="Song request not found")
     
     status = update_data.get("status")
+    previous_status = request.status
     request.status = status
     
+    # Rejecting a request gives its requesters their slot back (and restoring takes it again)
+    was_counted = previous_status in QUOTA_STATUSES
+    is_counted = status in QUOTA_STATUSES
+    if was_counted != is_counted:
+        await adjust_song_request_slots(db, request, 1 if is_counted else -1)
+    
     if status == "played":
         request.played_at = datetime.now(timezone.utc)
     elif status == "rejected":
         request.rejection_reason = update_data.get("rejection_reason")
         request.rejection_label = update_data.get("rejection_label")
     
+    await song_queue.notify_changed(db, [request.id])
     await db.commit()
     
+    song_queue.apply_status(request)
+    song_request_feed.publish(request.event_id, "status_changed", {
+        "id": request.id,
+        "status": request.status,
+        "played_at": request.played_at,
+        "rejection_reason": request.rejection_reason,
+        "rejection_label": request.rejection_label
+    })
+    
     # Send notification after commit (non-blocking)
     if request.user_id:
         try:
@@ -1533,7 +1426,9 @@ async def toggle_song_requests(
         )
         db.add(settings)
     
+    await app_settings_cache.notify(db, settings)
     await db.commit()
+    app_settings_cache.apply(settings)
     
     return {
         "success": True,
@@ -1541,55 +1436,84 @@ async def toggle_song_requests(
         "message": f"Les demandes de chansons sont maintenant {'ACTIVÉES' if new_status else 'DÉSACTIVÉES'}"
     }
 
-@app.get("/api/settings/requests-status")
-async def get_requests_status(db: AsyncSession = Depends(get_db)):
-    """Public endpoint to check if song requests are enabled"""
-    result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
-    settings = result.scalar_one_or_none()
+async def load_requests_status() -> dict:
+    """Payload of GET /api/settings/requests-status (served from the settings cache)"""
+    settings = await app_settings_cache.get()
     
     return {
-        "requests_enabled": settings.requests_enabled if settings else False
+        "requests_enabled": settings.requests_enabled if settings else False,
+        "current_event_id": settings.current_event_id if settings else None
     }
 
+@app.get("/api/settings/requests-status")
+async def get_requests_status():
+    """Public endpoint to check if song requests are enabled"""
+    return await load_requests_status()
+
 # ============ ADMIN USER LIST ============
 
+# Unfiltered totals below this estimate are counted exactly (cheap on a small table)
+USER_COUNT_EXACT_BELOW = 10000
+# Search totals are counted up to this many matches, then reported as estimated
+USER_SEARCH_COUNT_CAP = 1000
+
 @app.get("/api/admin/users")
 async def get_admin_users(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin_supabase)
 ):
-    """Get list of all users (admin only)"""
-    query = select(User)
-    
-    if search:
-        query = query.where(
-            or_(
-                User.email.ilike(f"%{search}%"),
-                User.name.ilike(f"%{search}%")
-            )
+    """
+    Get list of all users (admin only), newest first
+
+    Paged by cursor on (created_at, id) (ix_users_created_at_id) and searched
+    with ILIKE on email / name, served by the pg_trgm indexes for terms of 3
+    characters or more. total is the planner's estimate without search and
+    a count capped at USER_SEARCH_COUNT_CAP with one (total_estimated tells).
+    """
+    search_filter = None
+    if search and search.strip():
+        pattern = f"%{escape_like(search.strip())}%"
+        search_filter = or_(
+            User.email.ilike(pattern, escape="\\"),
+            User.name.ilike(pattern, escape="\\")
         )
     
-    # Count total (with search filter applied)
-    count_query = select(func.count()).select_from(User)
-    if search:
-        count_query = count_query.where(
-            or_(
-                User.email.ilike(f"%{search}%"),
-                User.name.ilike(f"%{search}%")
-            )
-        )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
+    query = select(User)
+    if search_filter is not None:
+        query = query.where(search_filter)
+    if cursor:
+        try:
+            created_at, user_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(User.created_at, User.id) < tuple_(created_at, user_id))
     
-    # Get paginated results
-    offset = (page - 1) * limit
-    query = query.order_by(User.created_at.desc()).offset(offset).limit(limit)
+    query = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
     result = await db.execute(query)
     users = result.scalars().all()
     
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+    
+    total_estimated = False
+    if search_filter is None:
+        total = await estimated_row_count(db, "users")
+        if total is not None and total >= USER_COUNT_EXACT_BELOW:
+            total_estimated = True
+        else:
+            total = (await db.execute(select(func.count()).select_from(User))).scalar()
+    else:
+        matches = select(User.id).where(search_filter).limit(USER_SEARCH_COUNT_CAP + 1).subquery()
+        total = (await db.execute(select(func.count()).select_from(matches))).scalar()
+        if total > USER_SEARCH_COUNT_CAP:
+            total = USER_SEARCH_COUNT_CAP
+            total_estimated = True
+    
     return {
         "users": [
             {
@@ -1604,12 +1528,27 @@ async def get_admin_users(
             }
             for user in users
         ],
+        "next_cursor": next_cursor,
         "total": total,
-        "page": page,
-        "limit": limit,
-        "pages": (total + limit - 1) // limit
+        "total_estimated": total_estimated,
+        "limit": limit
     }
 
+@app.post("/api/admin/users/{user_id}/revoke-sessions")
+async def revoke_sessions_of_user(
+    user_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Sign a user out of every device: all access and refresh tokens (Admin only)"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    await revoke_user_sessions(db, user)
+    logger.info(f"🔐 Sessions of {user.email} revoked by {current_user.email}")
+    return {"success": True, "message": "Toutes les sessions de cet utilisateur ont été fermées"}
+
 # ============ EVENT QR CODE ENDPOINTS ============
 
 class CreateEventQRCode(BaseModel):
@@ -1864,9 +1803,8 @@ async def get_products(
 
 # ============ DJS ENDPOINTS ============
 
-@app.get("/api/djs")
-async def get_djs(db: AsyncSession = Depends(get_db)):
-    """Get all DJs"""
+async def load_djs(db: AsyncSession) -> list:
+    """Payload of GET /api/djs"""
     result = await db.execute(select(DJ).order_by(DJ.order))
     djs = result.scalars().all()
     
@@ -1885,6 +1823,11 @@ async def get_djs(db: AsyncSession = Depends(get_db)):
         for dj in djs
     ]
 
+@app.get("/api/djs")
+async def get_djs(db: AsyncSession = Depends(get_db)):
+    """Get all DJs"""
+    return await load_djs(db)
+
 # ============ LOYALTY ENDPOINTS ============
 
 @app.get("/api/loyalty/my-points")
@@ -2222,51 +2165,37 @@ async def apply_referral_code(
 # ============ GALLERY ENDPOINTS ============
 
 @app.get("/api/gallery/events")
-async def get_gallery_events(db: AsyncSession = Depends(get_db)):
-    """Get events with visible galleries"""
-    result = await db.execute(
-        select(Event)
-        .where(Event.gallery_visible == True)
-        .order_by(Event.event_date.desc())
-    )
-    events = result.scalars().all()
-    
-    gallery_events = []
-    for event in events:
-        photo_count = (await db.execute(
-            select(func.count()).select_from(Photo).where(Photo.event_id == event.id)
-        )).scalar()
-        
-        cover_result = await db.execute(
-            select(Photo).where(Photo.event_id == event.id).limit(1)
-        )
-        cover_photo = cover_result.scalar_one_or_none()
-        
-        gallery_events.append({
-            "id": event.id,
-            "name": event.name,
-            "event_date": event.event_date.isoformat() if event.event_date else None,
-            "photo_count": photo_count,
-            "cover_image": cover_photo.url if cover_photo else None
-        })
-    
-    return gallery_events
-
-@app.get("/api/gallery/{event_id}")
-async def get_event_gallery(event_id: str, db: AsyncSession = Depends(get_db)):
-    """Get photos for an event"""
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
+async def get_gallery_events(
+    before: Optional[datetime] = Query(None, description="event_date of the last gallery of the previous page"),
+    before_id: Optional[str] = Query(None, description="id of the last gallery of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get events with visible galleries, newest first (one query, see galleries.py)"""
+    result = await db.execute(gallery_listing_query(True, before, before_id, limit))
+    return ORJSONResponse(serialize_gallery_rows(result.all(), prefer_banner=False))
+
+def public_base_url(request: Request) -> str:
+    """This API's public URL, as the client reached it (behind the platform's TLS proxy)"""
+    base_url = str(request.base_url)
+    if request.headers.get("x-forwarded-proto") == "https" and base_url.startswith("http://"):
+        base_url = "https://" + base_url[len("http://"):]
+    return base_url
+
+async def load_photo_page(db: AsyncSession, event_id: str, cursor: Optional[str], limit: int, base_url: str) -> dict:
+    """Payload of the per-event photo feeds (see galleries.py)"""
+    result = await db.execute(select(Event.id, Event.name, Event.event_date).where(Event.id == event_id))
+    event = result.one_or_none()
     
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    result = await db.execute(
-        select(Photo)
-        .where(Photo.event_id == event_id)
-        .order_by(Photo.uploaded_at.desc())
-    )
-    photos = result.scalars().all()
+    try:
+        query = photo_page_query(event_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    photos, next_cursor = serialize_photo_page((await db.execute(query)).all(), limit, base_url)
     
     return {
         "event": {
@@ -2274,17 +2203,21 @@ async def get_event_gallery(event_id: str, db: AsyncSession = Depends(get_db)):
             "name": event.name,
             "event_date": event.event_date.isoformat() if event.event_date else None
         },
-        "photos": [
-            {
-                "id": photo.id,
-                "url": photo.url,
-                "thumbnail_url": photo.thumbnail_url,
-                "likes": photo.likes or 0
-            }
-            for photo in photos
-        ]
+        "photos": photos,
+        "next_cursor": next_cursor
     }
 
+@app.get("/api/gallery/{event_id}")
+async def get_event_gallery(
+    request: Request,
+    event_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(60, ge=1, le=200),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get photos for an event, newest first, one page at a time"""
+    return ORJSONResponse(await load_photo_page(db, event_id, cursor, limit, public_base_url(request)))
+
 # ============ AFTERMOVIES ============
 
 @app.get("/api/aftermovies")
@@ -2309,9 +2242,8 @@ async def get_aftermovies(db: AsyncSession = Depends(get_db)):
 
 # ============ WELCOME CONTENT ============
 
-@app.get("/api/welcome-content")
-async def get_welcome_content(db: AsyncSession = Depends(get_db)):
-    """Get welcome screen content"""
+async def load_welcome_content(db: AsyncSession) -> dict:
+    """Payload of GET /api/welcome-content"""
     # First check for custom welcome content
     result = await db.execute(
         select(AppSettings).where(AppSettings.id == "welcome")
@@ -2344,7 +2276,36 @@ async def get_welcome_content(db: AsyncSession = Depends(get_db)):
         }
     }
 
+@app.get("/api/welcome-content")
+async def get_welcome_content(db: AsyncSession = Depends(get_db)):
+    """Get welcome screen content"""
+    return await load_welcome_content(db)
 
+# ============ HOME SCREEN ============
+
+async def with_session(loader, *args):
+    """Run a payload loader on its own pooled session (for concurrent loads)"""
+    async with AsyncSessionLocal() as db:
+        return await loader(db, *args)
+
+@app.get("/api/home")
+async def get_home(upcoming_limit: int = Query(10, ge=1, le=50)):
+    """Everything the home tab needs on open, in one round trip (queries run concurrently)"""
+    next_event, upcoming, welcome, requests_status, djs = await asyncio.gather(
+        with_session(load_next_event),
+        with_session(load_upcoming_events, upcoming_limit),
+        with_session(load_welcome_content),
+        load_requests_status(),
+        with_session(load_djs)
+    )
+    
+    return ORJSONResponse({
+        "next_event": next_event["event"],
+        "upcoming_events": upcoming["events"],
+        "welcome": welcome,
+        "requests_status": requests_status,
+        "djs": djs
+    })
 
 # ============ ADMIN CONTENT MANAGEMENT ============
 
@@ -2384,6 +2345,7 @@ async def update_welcome_content(
         db.add(settings)
     
     await db.commit()
+    content_versions.bump("welcome")
     
     return {"success": True, "message": "Welcome content updated"}
 
@@ -2420,23 +2382,21 @@ async def add_photo(
 ):
     """Add a photo to an event gallery (Admin only)"""
     # Verify event exists
-    result = await db.execute(select(Event).where(Event.id == data.event_id))
-    event = result.scalar_one_or_none()
-    if not event:
+    result = await db.execute(select(Event.id).where(Event.id == data.event_id))
+    if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Event not found")
     
-    photo = Photo(
-        event_id=data.event_id,
-        url=data.url,
-        thumbnail_url=data.thumbnail_url or data.url,
-        uploaded_by=current_user.id
-    )
-    
-    db.add(photo)
+    # ON CONFLICT DO NOTHING: a concurrent add of the same URL gets the 409, not a unique violation
+    inserted_ids = await insert_photos(db, data.event_id, [data.url], current_user.id, data.thumbnail_url)
+    if not inserted_ids:
+        raise HTTPException(status_code=409, detail="Cette photo est déjà dans la galerie")
     await db.commit()
-    await db.refresh(photo)
+    content_versions.bump("galleries")
     
-    return {"success": True, "photo_id": photo.id}
+    photo_id = inserted_ids[0]
+    job = thumbnail_pipeline.submit([photo_id], data.event_id)
+    
+    return {"success": True, "photo_id": photo_id, "thumbnail_job_id": job.id}
 
 class AftermovieCreate(BaseModel):
     title: str
@@ -2465,6 +2425,7 @@ async def add_aftermovie(
     
     db.add(aftermovie)
     await db.commit()
+    content_versions.bump("aftermovies")
     await db.refresh(aftermovie)
     
     return {"success": True, "aftermovie_id": aftermovie.id}
@@ -2528,6 +2489,7 @@ async def admin_create_event(
     db.add(event)
     await db.commit()
     await db.refresh(event)
+    mark_events_changed()
     
     return {"success": True, "event_id": event.id, "message": "Event created successfully"}
 
@@ -2601,6 +2563,7 @@ async def admin_update_event(
             ]
     
     await db.commit()
+    mark_events_changed()
     
     return {"success": True, "message": "Event updated successfully"}
 
@@ -2643,6 +2606,7 @@ async def update_event_visibility(
         event.event_type = data.event_type
     
     await db.commit()
+    mark_events_changed()
     
     return {"success": True, "message": "Visibility updated"}
 
@@ -2661,6 +2625,7 @@ async def admin_delete_event(
     
     await db.delete(event)
     await db.commit()
+    mark_events_changed()
     
     return {"success": True, "message": "Event deleted successfully"}
 
@@ -3173,8 +3138,16 @@ async def delete_user_account(
     
     try:
         # Delete all user's data in order (respecting foreign key constraints)
-        # 1. Delete song requests
+        # 1. Delete song requests (co-requesters get their slot back) and request quotas
+        result = await db.execute(
+            select(SongRequest)
+            .where(SongRequest.user_id == user_id)
+            .where(SongRequest.status.in_(QUOTA_STATUSES))
+        )
+        for request in result.scalars().all():
+            await adjust_song_request_slots(db, request, -1)
         await db.execute(delete(SongRequest).where(SongRequest.user_id == user_id))
+        await db.execute(delete(SongRequestQuota).where(SongRequestQuota.user_id == user_id))
 
         # 2. Delete VIP bookings
         await db.execute(delete(VIPBooking).where(VIPBooking.user_id == user_id))
@@ -3213,7 +3186,9 @@ async def delete_user_account(
         # 13. Finally delete the user (cascade will handle remaining relationships)
         await db.execute(delete(User).where(User.id == user_id))
         
+        await song_queue.notify_user_removed(db, user_id)
         await db.commit()
+        song_queue.remove_user(user_id)
         logger.info(f"✅ Successfully deleted account for user: {current_user.email}")
         
         return {"success": True, "message": "Account deleted successfully"}
@@ -3225,76 +3200,27 @@ async def delete_user_account(
 # ============ MEDIA GALLERIES ============
 
 @app.get("/api/media/galleries")
-async def get_media_galleries(db: AsyncSession = Depends(get_db)):
-    """Get all event galleries (shows all events that have photos or gallery_visible)"""
-    # Get all events ordered by date
-    result = await db.execute(
-        select(Event)
-        .order_by(Event.event_date.desc())
-    )
-    events = result.scalars().all()
-    
-    galleries = []
-    for event in events:
-        photo_count = (await db.execute(
-            select(func.count()).select_from(Photo).where(Photo.event_id == event.id)
-        )).scalar() or 0
-        
-        # Show event if gallery_visible OR if it has photos
-        if not event.gallery_visible and photo_count == 0:
-            continue
-        
-        # Use banner_image as cover, fallback to first photo if available
-        cover_image = event.banner_image
-        if not cover_image:
-            cover_result = await db.execute(
-                select(Photo).where(Photo.event_id == event.id).limit(1)
-            )
-            cover_photo = cover_result.scalar_one_or_none()
-            cover_image = cover_photo.url if cover_photo else None
-        
-        galleries.append({
-            "id": event.id,
-            "name": event.name,
-            "event_date": event.event_date.isoformat() if event.event_date else None,
-            "photo_count": photo_count,
-            "cover_image": cover_image
-        })
-    
-    return galleries
+async def get_media_galleries(
+    before: Optional[datetime] = Query(None, description="event_date of the last gallery of the previous page"),
+    before_id: Optional[str] = Query(None, description="id of the last gallery of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all event galleries (events that have photos or gallery_visible), newest first"""
+    result = await db.execute(gallery_listing_query(False, before, before_id, limit))
+    # Use banner_image as cover, fallback to first photo if available
+    return ORJSONResponse(serialize_gallery_rows(result.all(), prefer_banner=True))
 
 @app.get("/api/media/gallery/{event_id}")
-async def get_media_gallery(event_id: str, db: AsyncSession = Depends(get_db)):
-    """Get photos for an event gallery"""
-    result = await db.execute(select(Event).where(Event.id == event_id))
-    event = result.scalar_one_or_none()
-    
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    result = await db.execute(
-        select(Photo)
-        .where(Photo.event_id == event_id)
-        .order_by(Photo.uploaded_at.desc())
-    )
-    photos = result.scalars().all()
-    
-    return {
-        "event": {
-            "id": event.id,
-            "name": event.name,
-            "event_date": event.event_date.isoformat() if event.event_date else None
-        },
-        "photos": [
-            {
-                "id": photo.id,
-                "url": photo.url,
-                "thumbnail_url": photo.thumbnail_url or photo.url,
-                "likes": photo.likes or 0
-            }
-            for photo in photos
-        ]
-    }
+async def get_media_gallery(
+    request: Request,
+    event_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(60, ge=1, le=200),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get photos for an event gallery, newest first, one page at a time"""
+    return ORJSONResponse(await load_photo_page(db, event_id, cursor, limit, public_base_url(request)))
 
 # ============ LOYALTY ADDITIONAL ENDPOINTS ============
 
@@ -3452,8 +3378,7 @@ async def admin_scan_checkin(
         raise HTTPException(status_code=400, detail="No active event")
     
     # Get app settings for QR version
-    result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
-    settings = result.scalar_one_or_none()
+    settings = await app_settings_cache.get()
     qr_version = settings.loyalty_qr_version if settings else 1
     
     user_id = data.user_id
@@ -3506,80 +3431,78 @@ async def admin_scan_checkin(
 
 @app.get("/api/dj/admin/all-requests")
 async def get_all_dj_requests(
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin_supabase)
 ):
     """Get events with their song request stats for DJ dashboard"""
-    # Get all events
-    events_result = await db.execute(select(Event).order_by(Event.event_date.desc()))
-    events = events_result.scalars().all()
-    
-    event_stats = []
-    for event in events:
-        # Count requests by status for this event
-        pending_count = (await db.execute(
-            select(func.count()).select_from(SongRequest)
-            .where(SongRequest.event_id == event.id)
-            .where(SongRequest.status == 'pending')
-        )).scalar() or 0
-        
-        played_count = (await db.execute(
-            select(func.count()).select_from(SongRequest)
-            .where(SongRequest.event_id == event.id)
-            .where(SongRequest.status == 'played')
-        )).scalar() or 0
-        
-        rejected_count = (await db.execute(
-            select(func.count()).select_from(SongRequest)
-            .where(SongRequest.event_id == event.id)
-            .where(SongRequest.status == 'rejected')
-        )).scalar() or 0
-        
-        total = pending_count + played_count + rejected_count
-        
-        event_stats.append({
-            "id": event.id,
-            "name": event.name,
-            "date": event.event_date.isoformat() if event.event_date else None,
-            "pending": pending_count,
-            "played": played_count,
-            "rejected": rejected_count,
-            "total": total
-        })
-    
-    # Also add a "default_event" for requests without event_id
-    default_pending = (await db.execute(
-        select(func.count()).select_from(SongRequest)
-        .where(SongRequest.event_id == "default_event")
-        .where(SongRequest.status == 'pending')
-    )).scalar() or 0
-    
-    default_played = (await db.execute(
-        select(func.count()).select_from(SongRequest)
-        .where(SongRequest.event_id == "default_event")
-        .where(SongRequest.status == 'played')
-    )).scalar() or 0
-    
-    default_rejected = (await db.execute(
-        select(func.count()).select_from(SongRequest)
-        .where(SongRequest.event_id == "default_event")
-        .where(SongRequest.status == 'rejected')
-    )).scalar() or 0
-    
-    default_total = default_pending + default_played + default_rejected
-    
-    if default_total > 0:
-        event_stats.insert(0, {
-            "id": "default_event",
-            "name": "Événement actuel",
-            "date": None,
-            "pending": default_pending,
-            "played": default_played,
-            "rejected": default_rejected,
-            "total": default_total
-        })
+    # One grouped pass over song_requests, full-joined to events so that events
+    # without requests and the "default_event" bucket both show up
+    stats = (
+        select(
+            SongRequest.event_id.label("event_id"),
+            func.count().filter(SongRequest.status == "pending").label("pending"),
+            func.count().filter(SongRequest.status == "played").label("played"),
+            func.count().filter(SongRequest.status == "rejected").label("rejected")
+        )
+        .group_by(SongRequest.event_id)
+    )
+    if from_date or to_date:
+        # Only count the requests of events in the window (ix_song_requests_event_status)
+        window = select(Event.id)
+        if from_date:
+            window = window.where(Event.event_date >= from_date)
+        if to_date:
+            window = window.where(Event.event_date <= to_date)
+        stats = stats.where(or_(SongRequest.event_id == "default_event", SongRequest.event_id.in_(window)))
+    stats = stats.subquery()
+    pending = func.coalesce(stats.c.pending, 0)
+    played = func.coalesce(stats.c.played, 0)
+    rejected = func.coalesce(stats.c.rejected, 0)
+    
+    query = (
+        select(
+            func.coalesce(Event.id, stats.c.event_id).label("id"),
+            Event.name,
+            Event.event_date,
+            pending.label("pending"),
+            played.label("played"),
+            rejected.label("rejected")
+        )
+        .select_from(Event.__table__.join(stats, Event.id == stats.c.event_id, full=True))
+        .where(or_(
+            Event.id != None,
+            and_(stats.c.event_id == "default_event", pending + played + rejected > 0)
+        ))
+    )
+    if from_date:
+        query = query.where(or_(Event.id == None, Event.event_date >= from_date))
+    if to_date:
+        query = query.where(or_(Event.id == None, Event.event_date <= to_date))
+    
+    # "default_event" (no date) sorts first, like before; id keeps pages stable on equal dates
+    query = (
+        query.order_by(Event.event_date.desc().nulls_first(), func.coalesce(Event.id, stats.c.event_id))
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
+    result = await db.execute(query)
     
-    return event_stats
+    return [
+        {
+            "id": row.id,
+            "name": row.name if row.name is not None else "Événement actuel",
+            "date": row.event_date.isoformat() if row.event_date else None,
+            "pending": row.pending,
+            "played": row.played,
+            "rejected": row.rejected,
+            "total": row.pending + row.played + row.rejected
+        }
+        for row in result.all()
+    ]
 
 @app.delete("/api/dj/requests/{request_id}")
 async def delete_song_request(
@@ -3594,9 +3517,16 @@ async def delete_song_request(
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
+    if request.status in QUOTA_STATUSES:
+        await adjust_song_request_slots(db, request, -1)
+    
     await db.delete(request)
+    await song_queue.notify_changed(db, [request_id])
     await db.commit()
     
+    song_queue.apply_delete(request_id)
+    song_request_feed.publish(request.event_id, "request_deleted", {"id": request_id})
+    
     return {"success": True, "message": "Request deleted"}
 
 # ============ ADMIN NOTIFICATIONS ============
@@ -3612,21 +3542,52 @@ async def broadcast_notification(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin_supabase)
 ):
-    """Send a push notification to all users"""
-    sent_count = await send_push_notification_to_all(
+    """Start sending a push notification to all users (runs in the background)"""
+    job = await broadcast_runner.create_job(
+        db,
         title=data.title,
         body=data.body,
+        notification_type=data.notification_type,
         data={"type": "broadcast", "notification_type": data.notification_type},
-        db=db,
-        notification_type=data.notification_type
+        sent_by=current_user.id
     )
+    broadcast_runner.start(job.id)
     
     return {
         "success": True,
-        "message": f"Notification envoyée à {sent_count} utilisateurs",
-        "sent_count": sent_count
+        "message": f"Notification en cours d'envoi à {job.total_count} utilisateurs",
+        "job_id": job.id,
+        "status": job.status,
+        "total_count": job.total_count
     }
 
+@app.get("/api/admin/notifications/broadcasts")
+async def get_broadcasts(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Recent broadcasts with their progress"""
+    result = await db.execute(
+        select(NotificationSent)
+        .where(NotificationSent.target == "all")
+        .order_by(NotificationSent.sent_at.desc())
+        .limit(limit)
+    )
+    return [serialize_broadcast(job) for job in result.scalars().all()]
+
+@app.get("/api/admin/notifications/broadcasts/{job_id}")
+async def get_broadcast_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Progress of a broadcast job"""
+    job = await db.get(NotificationSent, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return serialize_broadcast(job)
+
 @app.get("/api/admin/notifications/stats")
 async def get_notification_stats(
     db: AsyncSession = Depends(get_db),
@@ -3686,7 +3647,14 @@ async def start_event(
         if next_event:
             next_event.status = "live"
     
+    await app_settings_cache.notify(db, settings)
+    await song_queue.notify_reload(db)
     await db.commit()
+    app_settings_cache.apply(settings)
+    mark_events_changed()
+    
+    if settings.current_event_id:
+        await song_queue.load(settings.current_event_id)
     
     return {
         "success": True,
@@ -3716,7 +3684,16 @@ async def end_event(
         settings.loyalty_qr_version = (settings.loyalty_qr_version or 1) + 1
         settings.updated_by = current_user.email
     
+    if settings:
+        await app_settings_cache.notify(db, settings)
+    await song_queue.notify_reload(db)
     await db.commit()
+    if settings:
+        app_settings_cache.apply(settings)
+    mark_events_changed()
+    
+    # Write the live queue's buffered votes (kept for a retry if that fails) and drop it
+    await song_queue.unload()
     
     return {
         "success": True,
@@ -3724,6 +3701,21 @@ async def end_event(
         "requests_enabled": False
     }
 
+@app.get("/api/admin/auth/hashing-stats")
+async def get_password_hashing_stats(current_user: User = Depends(get_current_admin_supabase)):
+    """bcrypt pool load: running / waiting calls and timings (Admin only)"""
+    return password_hasher.stats()
+
+@app.get("/api/admin/auth/revocation-stats")
+async def get_token_revocation_stats(current_user: User = Depends(get_current_admin_supabase)):
+    """Size of this worker's revoked token set (Admin only)"""
+    return revocation_filter.stats()
+
+@app.get("/api/admin/cache/stats")
+async def get_cache_stats(current_user: User = Depends(get_current_admin_supabase)):
+    """Hit/miss counters of the in-process response caches"""
+    return {name: cache.stats() for name, cache in caches.items()}
+
 # ============ CALENDAR ICS DOWNLOAD ============
 
 @app.get("/api/calendar/{event_id}")
@@ -3782,6 +3774,7 @@ async def update_event_flyer(
     
     event.banner_image = data.banner_image
     await db.commit()
+    mark_events_changed()
     
     return {"success": True, "message": "Flyer updated"}
 
@@ -3816,8 +3809,7 @@ async def validate_free_entry(
     voucher.validated_by = current_user.id
     
     # Get current event
-    result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
-    settings = result.scalar_one_or_none()
+    settings = await app_settings_cache.get()
     if settings and settings.current_event_id:
         voucher.event_id = settings.current_event_id
     
@@ -3848,6 +3840,7 @@ async def delete_photo(
     
     await db.delete(photo)
     await db.commit()
+    content_versions.bump("galleries")
     
     return {"success": True, "message": "Photo supprimée"}
 
@@ -3860,9 +3853,57 @@ async def clear_event_gallery(
     """Delete all photos from an event gallery (Admin only)"""
     result = await db.execute(delete(Photo).where(Photo.event_id == event_id))
     await db.commit()
+    content_versions.bump("galleries")
     
     return {"success": True, "message": "Galerie vidée"}
 
+@app.get("/api/admin/gallery/{event_id}/duplicates")
+async def get_gallery_duplicates(
+    request: Request,
+    event_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Photos flagged as near-duplicates, with the photo they duplicate (Admin only)"""
+    original = aliased(Photo)
+    result = await db.execute(
+        select(Photo.id, Photo.url, Photo.thumbnail_url, original.id, original.url, original.thumbnail_url)
+        .join(original, original.id == Photo.duplicate_of)
+        .where(Photo.event_id == event_id)
+        .order_by(Photo.uploaded_at.desc())
+    )
+    base_url = public_base_url(request)
+    
+    return [
+        {
+            "photo": {"id": photo_id, "url": url, "thumbnail_url": media_url(thumbnail_url, base_url) or url},
+            "duplicate_of": {
+                "id": original_id,
+                "url": original_url,
+                "thumbnail_url": media_url(original_thumbnail, base_url) or original_url
+            }
+        }
+        for photo_id, url, thumbnail_url, original_id, original_url, original_thumbnail in result.all()
+    ]
+
+@app.post("/api/admin/photos/{photo_id}/keep")
+async def keep_duplicate_photo(
+    photo_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Clear the near-duplicate flag of a photo so it shows in the gallery again (Admin only)"""
+    result = await db.execute(
+        update(Photo).where(Photo.id == photo_id).values(duplicate_of=None).returning(Photo.id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(status_code=404, detail="Photo not found")
+    
+    await db.commit()
+    content_versions.bump("galleries")
+    
+    return {"success": True, "message": "Photo conservée"}
+
 @app.delete("/api/admin/aftermovies/{aftermovie_id}")
 async def delete_aftermovie(
     aftermovie_id: str,
@@ -3878,6 +3919,7 @@ async def delete_aftermovie(
     
     await db.delete(aftermovie)
     await db.commit()
+    content_versions.bump("aftermovies")
     
     return {"success": True, "message": "Aftermovie supprimé"}
 
@@ -3889,6 +3931,7 @@ async def clear_all_aftermovies(
     """Delete all aftermovies (Admin only)"""
     await db.execute(delete(Aftermovie))
     await db.commit()
+    content_versions.bump("aftermovies")
     
     return {"success": True, "message": "Tous les aftermovies supprimés"}
 
@@ -3927,6 +3970,7 @@ async def create_dj(
     
     db.add(dj)
     await db.commit()
+    content_versions.bump("djs")
     await db.refresh(dj)
     
     return {"success": True, "dj_id": dj.id, "message": f"DJ {data.name} ajouté"}
@@ -3954,6 +3998,7 @@ async def update_dj(
     dj.is_resident = data.is_resident
     
     await db.commit()
+    content_versions.bump("djs")
     
     return {"success": True, "message": f"DJ {data.name} mis à jour"}
 
@@ -3972,6 +4017,7 @@ async def delete_dj(
     
     await db.delete(dj)
     await db.commit()
+    content_versions.bump("djs")
     
     return {"success": True, "message": "DJ supprimé"}
 
@@ -3987,28 +4033,73 @@ async def bulk_upload_photos(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin_supabase)
 ):
-    """Upload multiple photos at once (Admin only)"""
+    """Upload multiple photos at once, skipping photos already in the gallery (Admin only)"""
     # Verify event exists
-    result = await db.execute(select(Event).where(Event.id == data.event_id))
-    event = result.scalar_one_or_none()
-    if not event:
+    result = await db.execute(select(Event.id).where(Event.id == data.event_id))
+    if not result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Event not found")
     
-    photos_added = []
-    for url in data.photo_urls:
-        photo = Photo(
-            event_id=data.event_id,
-            url=url,
-            thumbnail_url=url,
-            uploaded_by=current_user.id
-        )
-        db.add(photo)
-        photos_added.append(photo)
-    
+    inserted_ids = await insert_photos(db, data.event_id, data.photo_urls, current_user.id)
     await db.commit()
+    skipped = len(data.photo_urls) - len(inserted_ids)
+    
+    job = None
+    if inserted_ids:
+        content_versions.bump("galleries")
+        # Same uploaded_at for the whole album: id order decides which copy of a duplicate is kept
+        job = thumbnail_pipeline.submit(sorted(inserted_ids), data.event_id)
+    
+    message = f"{len(inserted_ids)} photos ajoutées"
+    if skipped:
+        message += f" ({skipped} déjà présentes)"
+    
+    return {
+        "success": True,
+        "message": message,
+        "count": len(inserted_ids),
+        "inserted": len(inserted_ids),
+        "skipped": skipped,
+        "thumbnail_job_id": job.id if job else None
+    }
+
+@app.get("/api/admin/media/thumbnails")
+async def list_thumbnail_jobs(current_user: User = Depends(get_current_admin_supabase)):
+    """Progress of recent thumbnail jobs (Admin only)"""
+    return [job.to_dict() for job in thumbnail_pipeline.list_jobs()]
+
+@app.get("/api/admin/media/thumbnails/{job_id}")
+async def get_thumbnail_job(job_id: str, current_user: User = Depends(get_current_admin_supabase)):
+    """Progress of a thumbnail job (Admin only)"""
+    job = thumbnail_pipeline.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Thumbnail job not found")
+    return job.to_dict()
+
+@app.post("/api/admin/media/thumbnails/backfill")
+async def backfill_thumbnails(
+    event_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_admin_supabase)
+):
+    """Generate the variants and hash of every photo that lacks them (Admin only)"""
+    # Cloudinary photos never get stored variants (see photo_pipeline.py)
+    missing = or_(
+        Photo.phash.is_(None),
+        and_(Photo.variants.is_(None), ~Photo.url.contains(CLOUDINARY_UPLOAD_SEGMENT))
+    )
+    query = select(Photo.id).where(missing).order_by(Photo.uploaded_at.asc(), Photo.id.asc())
+    if event_id:
+        query = query.where(Photo.event_id == event_id)
+    photo_ids = (await db.execute(query)).scalars().all()
+    
+    if not photo_ids:
+        return {"success": True, "message": "Toutes les photos ont déjà leurs miniatures", "count": 0}
+    
+    job = thumbnail_pipeline.submit(list(photo_ids), event_id)
     
     return {
         "success": True,
-        "message": f"{len(photos_added)} photos ajoutées",
-        "count": len(photos_added)
+        "message": f"{len(photo_ids)} photos en cours de traitement",
+        "count": len(photo_ids),
+        "thumbnail_job_id": job.id
     }
@@ -0,0 +1,92 @@
+"""
+Process-wide cache of the global AppSettings row
+
+Reads (request_song, requests-status polling, check-in, free entry) use an
+in-memory snapshot instead of selecting the row each time.
+
+Writers (toggle_song_requests, start_event, end_event) call notify() before
+their commit: pg_notify is transactional, so every worker is told about the
+change exactly when it becomes visible, then apply() updates the local
+snapshot right after the commit.
+
+Each worker LISTENs for them (pg_listener.py), or re-reads the row every
+few seconds without DATABASE_DIRECT_URL.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database_supabase import AsyncSessionLocal
+from models_supabase import AppSettings
+from pg_listener import PgListener
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "app_settings_changed"
+
+
+class SettingsSnapshot:
+    """Read-only copy of the AppSettings fields the API reads"""
+
+    __slots__ = ("requests_enabled", "current_event_id", "loyalty_qr_version", "updated_by")
+
+    def __init__(self, requests_enabled=False, current_event_id=None, loyalty_qr_version=1, updated_by=None):
+        self.requests_enabled = bool(requests_enabled)
+        self.current_event_id = current_event_id
+        self.loyalty_qr_version = loyalty_qr_version or 1
+        self.updated_by = updated_by
+
+    @classmethod
+    def from_row(cls, row: AppSettings) -> "SettingsSnapshot":
+        return cls(row.requests_enabled, row.current_event_id, row.loyalty_qr_version, row.updated_by)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class AppSettingsCache(PgListener):
+    channel = CHANNEL
+    label = "app settings"
+
+    def __init__(self, poll_interval: float = 5.0, reconnect_delay: float = 5.0):
+        super().__init__(poll_interval, reconnect_delay)
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._loaded = False
+
+    async def get(self) -> Optional[SettingsSnapshot]:
+        """Current settings, or None if the row does not exist"""
+        if not self._loaded:
+            await self.refresh()
+        return self._snapshot
+
+    async def refresh(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(AppSettings).where(AppSettings.id == "global"))
+            row = result.scalar_one_or_none()
+        self._snapshot = SettingsSnapshot.from_row(row) if row else None
+        self._loaded = True
+
+    async def notify(self, db: AsyncSession, row: AppSettings):
+        """Queue the change notification in the writer's transaction (sent on commit)"""
+        payload = json.dumps(SettingsSnapshot.from_row(row).to_dict())
+        await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+    def apply(self, row: AppSettings):
+        """Update this worker's snapshot after the writer committed"""
+        self._snapshot = SettingsSnapshot.from_row(row)
+        self._loaded = True
+
+    def on_notification(self, payload: str):
+        try:
+            self._snapshot = SettingsSnapshot(**json.loads(payload))
+            self._loaded = True
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid app settings notification: {e}")
+            self._loaded = False
+
+
+app_settings_cache = AppSettingsCache()
@@ -0,0 +1,532 @@
+"""
+In-memory song request queue for the live event
+
+While an event is live (AppSettings.current_event_id, set by start_event)
+its requests are held in process as compact records, ranked the same way
+as GET /api/dj/requests (votes desc, requested_at desc). Reads and votes
+are served from memory; vote counters and vote rows are written back to
+Postgres in batches by a background flusher, and on end_event/shutdown. A
+flush inserts the buffered vote rows and adds to each request's counter only
+the votes actually inserted (votes = votes + delta), so votes counted by
+Postgres in the meantime - the database path of vote_for_song, another
+worker - are never overwritten. A batch that fails to write is kept and
+retried (also after end_event has unloaded the queue) instead of failing
+the request.
+
+New requests and status changes still go to Postgres first (they carry the
+quota and uniqueness guarantees) and are applied here after commit.
+
+Every worker holds the queue. Writers notify the ids of the requests they
+changed in their transaction (notify_changed; start_event, end_event and
+clear-all ask for a full reload) and the other workers re-read those rows,
+keeping their own unwritten votes on top. Like settings_cache.py, workers
+LISTEN on the channel (pg_listener.py), or reload the whole queue every few
+seconds without DATABASE_DIRECT_URL.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, bindparam, func, literal, text, values, column, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database_supabase import AsyncSessionLocal
+from models_supabase import AppSettings, SongRequest, SongRequestVote, User
+from pg_listener import PgListener
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "song_queue_changed"
+# pg_notify payloads are limited to 8000 bytes: past this many ids, ask for a full reload
+MAX_NOTIFIED_IDS = 150
+
+
+class QueuedRequest:
+    """Compact copy of a song_requests row"""
+
+    __slots__ = (
+        "id", "event_id", "user_id", "user_name", "song_title", "artist_name",
+        "votes", "times_requested", "status", "rejection_reason", "rejection_label",
+        "requested_at", "played_at"
+    )
+
+    def __init__(self, row: SongRequest):
+        self.id = row.id
+        self.event_id = row.event_id
+        self.user_id = row.user_id
+        self.user_name = row.user_name
+        self.song_title = row.song_title
+        self.artist_name = row.artist_name
+        self.votes = row.votes or 0
+        self.times_requested = row.times_requested or 1
+        self.status = row.status
+        self.rejection_reason = row.rejection_reason
+        self.rejection_label = row.rejection_label
+        self.requested_at = row.requested_at
+        self.played_at = row.played_at
+
+    @property
+    def rank_key(self) -> Tuple[int, float, str]:
+        requested_ts = self.requested_at.timestamp() if self.requested_at else 0.0
+        return (-self.votes, -requested_ts, self.id)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "song_title": self.song_title,
+            "artist_name": self.artist_name,
+            "user_name": self.user_name,
+            "votes": self.votes,
+            "times_requested": self.times_requested,
+            "requested_at": self.requested_at,
+            "status": self.status,
+            "rejection_reason": self.rejection_reason,
+            "rejection_label": self.rejection_label,
+            "event_id": self.event_id
+        }
+
+
+class LiveSongQueue:
+    """Ranked requests of one event plus per-user vote/request sets"""
+
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        self.records: Dict[str, QueuedRequest] = {}
+        self.ranking: List[Tuple[int, float, str]] = []
+        self.votes_by_user: Dict[str, Set[str]] = {}
+        self.requests_by_user: Dict[str, Set[str]] = {}
+        # Write-back state: (request_id, user_id) -> id of the vote row not yet in Postgres
+        self.pending_vote_rows: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record: QueuedRequest):
+        if record.id in self.records:
+            self.remove(record.id)
+        self.records[record.id] = record
+        bisect.insort(self.ranking, record.rank_key)
+
+    def remove(self, request_id: str):
+        record = self.records.pop(request_id, None)
+        if record is None:
+            return
+        index = bisect.bisect_left(self.ranking, record.rank_key)
+        if index < len(self.ranking) and self.ranking[index] == record.rank_key:
+            del self.ranking[index]
+        for user_sets in (self.votes_by_user, self.requests_by_user):
+            for request_ids in user_sets.values():
+                request_ids.discard(request_id)
+        for key in [k for k in self.pending_vote_rows if k[0] == request_id]:
+            del self.pending_vote_rows[key]
+
+    def remove_user(self, user_id: str):
+        """Forget a deleted account: its requests, and its votes still waiting to be written"""
+        for request_id in [rid for rid, record in self.records.items() if record.user_id == user_id]:
+            self.remove(request_id)
+        self.votes_by_user.pop(user_id, None)
+        self.requests_by_user.pop(user_id, None)
+        for key in [k for k in self.pending_vote_rows if k[1] == user_id]:
+            del self.pending_vote_rows[key]
+
+    @property
+    def has_pending_writes(self) -> bool:
+        return bool(self.pending_vote_rows)
+
+    def sync_request(self, record: QueuedRequest, voters: List[Tuple[str, bool]]):
+        """Replace a request with its stored copy, keeping the votes not written yet on top"""
+        stored_voters = {user_id for user_id, _ in voters}
+        # Votes already in Postgres (cast through another worker) are not counted twice
+        pending = {
+            key: row_id for key, row_id in self.pending_vote_rows.items()
+            if key[0] == record.id and key[1] not in stored_voters
+        }
+        record.votes += len(pending)
+        self.add(record)
+        for user_id, is_requester in voters:
+            self.mark_voter(record.id, user_id, requester=is_requester)
+        for key, row_id in pending.items():
+            self.mark_voter(record.id, key[1])
+            self.pending_vote_rows[key] = row_id
+
+    def add_pending_vote(self, record: QueuedRequest, user_id: str, row_id: str):
+        self.mark_voter(record.id, user_id)
+        self.pending_vote_rows[(record.id, user_id)] = row_id
+        self.set_votes(record, record.votes + 1)
+
+    def set_votes(self, record: QueuedRequest, votes: int):
+        index = bisect.bisect_left(self.ranking, record.rank_key)
+        if index < len(self.ranking) and self.ranking[index] == record.rank_key:
+            del self.ranking[index]
+        record.votes = votes
+        bisect.insort(self.ranking, record.rank_key)
+
+    def mark_voter(self, request_id: str, user_id: str, requester: bool = False):
+        self.votes_by_user.setdefault(user_id, set()).add(request_id)
+        if requester:
+            self.requests_by_user.setdefault(user_id, set()).add(request_id)
+
+    def has_voted(self, request_id: str, user_id: str) -> bool:
+        return request_id in self.votes_by_user.get(user_id, ())
+
+    def has_requested(self, request_id: str, user_id: str) -> bool:
+        return request_id in self.requests_by_user.get(user_id, ())
+
+    def listing(self, user_id: str, status: Optional[str] = None, limit: int = 100) -> List[dict]:
+        voted = self.votes_by_user.get(user_id, set())
+        requested = self.requests_by_user.get(user_id, set())
+        items = []
+        for _, _, request_id in self.ranking:
+            record = self.records[request_id]
+            if status and record.status != status:
+                continue
+            item = record.to_dict()
+            item["can_vote"] = request_id not in voted
+            item["can_request"] = request_id not in requested
+            items.append(item)
+            if len(items) >= limit:
+                break
+        return items
+
+
+
+
+class SongQueueEngine(PgListener):
+    """Holds the live event's queue, writes votes back in batches and follows the other workers"""
+
+    channel = CHANNEL
+    label = "song queue"
+
+    def __init__(self, flush_interval: float = 2.0, poll_interval: float = 5.0, reconnect_delay: float = 5.0):
+        super().__init__(poll_interval, reconnect_delay)
+        self.flush_interval = flush_interval
+        self.live: Optional[LiveSongQueue] = None
+        # Unloaded queues whose last flush failed, retried by the flusher
+        self._retired: List[LiveSongQueue] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._syncer: Optional[asyncio.Task] = None
+        # Loads, flushes and syncs run one at a time
+        self._lock = asyncio.Lock()
+        # Tells this worker's own notifications apart
+        self._origin = uuid.uuid4().hex
+        # Changes notified by other workers, applied by the syncer
+        self._stale_ids: Set[str] = set()
+        self._reload_wanted = False
+        self._sync_wanted = asyncio.Event()
+
+    def is_live(self, event_id: Optional[str]) -> bool:
+        return self.live is not None and event_id is not None and self.live.event_id == event_id
+
+    def get(self, request_id: str) -> Optional[QueuedRequest]:
+        return self.live.records.get(request_id) if self.live else None
+
+    # ---- lifecycle ----
+
+    async def load(self, event_id: str):
+        """Load every request and vote of the event into memory"""
+        async with self._lock:
+            await self._load(event_id)
+
+    async def unload(self):
+        """Flush pending writes and drop the live queue (writes that fail are retried later)"""
+        async with self._lock:
+            await self._unload()
+
+    async def _load(self, event_id: str):
+        if self.live is not None and self.live.event_id != event_id:
+            await self._unload()
+        # Votes of this event must be in Postgres before it is read back
+        await self._flush_all()
+
+        queue = LiveSongQueue(event_id)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(SongRequest).where(SongRequest.event_id == event_id))
+            for row in result.scalars():
+                queue.add(QueuedRequest(row))
+
+            result = await db.execute(
+                select(SongRequestVote.request_id, SongRequestVote.user_id, SongRequestVote.is_requester)
+                .join(SongRequest, SongRequest.id == SongRequestVote.request_id)
+                .where(SongRequest.event_id == event_id)
+            )
+            for request_id, user_id, is_requester in result.all():
+                queue.mark_voter(request_id, user_id, requester=is_requester)
+
+        # Votes of this event still unwritten (failed flush, or cast during the read) move over
+        previous = [q for q in self._queues() if q.event_id == event_id]
+        self._retired = [q for q in self._retired if q.event_id != event_id]
+        for old_queue in previous:
+            for (request_id, user_id), row_id in old_queue.pending_vote_rows.items():
+                record = queue.records.get(request_id)
+                if record is not None and not queue.has_voted(request_id, user_id):
+                    queue.add_pending_vote(record, user_id, row_id)
+
+        reloaded = self.live is not None
+        self.live = queue
+        if not reloaded:
+            logger.info(f"🎛️ Live song queue loaded for event {event_id}: {len(queue)} requests")
+
+    async def _unload(self):
+        if self.live is None:
+            return
+        await self._flush_queue(self.live)
+        queue, self.live = self.live, None
+        if queue.has_pending_writes:
+            self._retired.append(queue)
+        logger.info(f"🎛️ Live song queue unloaded for event {queue.event_id}")
+
+    async def start(self):
+        # Loads the live event's queue (e.g. after a restart during an event)
+        await super().start()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if self._syncer is None:
+            self._syncer = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        await super().stop()
+        for task in (self._flusher, self._syncer):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flusher = self._syncer = None
+        await self.flush()
+        for queue in self._queues():
+            if queue.has_pending_writes:
+                logger.error(
+                    f"❌ Song queue of event {queue.event_id}: "
+                    f"{len(queue.pending_vote_rows)} votes not written at shutdown"
+                )
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _queues(self) -> List[LiveSongQueue]:
+        """The live queue and the retired ones still holding unwritten votes"""
+        return [queue for queue in [self.live, *self._retired] if queue is not None]
+
+    async def flush(self):
+        """Write buffered votes to Postgres (failures are logged and kept for a retry)"""
+        async with self._lock:
+            await self._flush_all()
+
+    async def _flush_all(self):
+        for queue in self._queues():
+            await self._flush_queue(queue)
+        self._retired = [queue for queue in self._retired if queue.has_pending_writes]
+
+    async def _flush_queue(self, queue: LiveSongQueue):
+        vote_rows = dict(queue.pending_vote_rows)
+        if not vote_rows:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                # Rows whose request or user was deleted meanwhile are skipped by the joins
+                rows = values(
+                    column("id", String), column("request_id", String), column("user_id", String),
+                    name="pending_votes"
+                ).data([(row_id, request_id, user_id) for (request_id, user_id), row_id in vote_rows.items()])
+                source = (
+                    select(rows.c.id, rows.c.request_id, rows.c.user_id, literal(False))
+                    .join(SongRequest, SongRequest.id == rows.c.request_id)
+                    .join(User, User.id == rows.c.user_id)
+                )
+                result = await db.execute(
+                    pg_insert(SongRequestVote)
+                    .from_select(["id", "request_id", "user_id", "is_requester"], source)
+                    .on_conflict_do_nothing(index_elements=[SongRequestVote.request_id, SongRequestVote.user_id])
+                    .returning(SongRequestVote.request_id, SongRequestVote.user_id)
+                )
+                inserted = set(result.all())
+                # Only the votes inserted now are added to the stored counters
+                deltas = Counter(request_id for request_id, _ in inserted)
+                if deltas:
+                    table = SongRequest.__table__
+                    await db.execute(
+                        update(table)
+                        .where(table.c.id == bindparam("request_id"))
+                        .values(votes=func.coalesce(table.c.votes, 0) + bindparam("delta")),
+                        [{"request_id": request_id, "delta": delta} for request_id, delta in deltas.items()]
+                    )
+                    await self.notify_changed(db, deltas)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Song queue flush failed for event {queue.event_id}: {e}")
+            return
+
+        # Written: forget the batch (votes cast during the flush stay pending)
+        for key, row_id in vote_rows.items():
+            if queue.pending_vote_rows.get(key) == row_id:
+                del queue.pending_vote_rows[key]
+        # Votes Postgres already had (cast through another worker) were counted twice here
+        skipped = {request_id for request_id, user_id in vote_rows if (request_id, user_id) not in inserted}
+        if skipped and queue is self.live:
+            self._stale_ids.update(skipped)
+            self._sync_wanted.set()
+
+    # ---- other workers ----
+
+    async def _notify(self, db: AsyncSession, message: dict):
+        message["origin"] = self._origin
+        await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": json.dumps(message)})
+
+    async def notify_changed(self, db: AsyncSession, request_ids: Iterable[str]):
+        """Have the other workers re-read these requests (in the writer's transaction)"""
+        request_ids = list(request_ids)
+        if len(request_ids) > MAX_NOTIFIED_IDS:
+            await self.notify_reload(db)
+        elif request_ids:
+            await self._notify(db, {"ids": request_ids})
+
+    async def notify_reload(self, db: AsyncSession):
+        """Have the other workers reload the live event (start/end of event, clear-all)"""
+        await self._notify(db, {"reload": True})
+
+    async def notify_user_removed(self, db: AsyncSession, user_id: str):
+        await self._notify(db, {"user_id": user_id})
+
+    async def refresh(self):
+        async with self._lock:
+            await self._reload()
+
+    async def _reload(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(AppSettings.current_event_id).where(AppSettings.id == "global"))
+            event_id = result.scalar_one_or_none()
+        if event_id:
+            await self._load(event_id)
+        else:
+            await self._unload()
+
+    def on_notification(self, payload: str):
+        try:
+            message = json.loads(payload)
+            if message.get("origin") == self._origin:
+                return
+            if "user_id" in message:
+                self.remove_user(message["user_id"])
+            if message.get("reload"):
+                self._reload_wanted = True
+            self._stale_ids.update(message.get("ids", ()))
+            self._sync_wanted.set()
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Invalid song queue notification: {e}")
+
+    async def _sync_loop(self):
+        while True:
+            await self._sync_wanted.wait()
+            self._sync_wanted.clear()
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.error(f"Song queue sync failed: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+                self._sync_wanted.set()
+
+    async def _sync(self):
+        async with self._lock:
+            reload, self._reload_wanted = self._reload_wanted, False
+            stale_ids, self._stale_ids = self._stale_ids, set()
+            try:
+                if reload:
+                    await self._reload()
+                elif stale_ids and self.live is not None:
+                    await self._reread(self.live, stale_ids)
+            except Exception:
+                self._reload_wanted = self._reload_wanted or reload
+                self._stale_ids |= stale_ids
+                raise
+
+    async def _reread(self, queue: LiveSongQueue, request_ids: Set[str]):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(SongRequest).where(SongRequest.id.in_(request_ids)))
+            rows = {row.id: row for row in result.scalars()}
+            result = await db.execute(
+                select(SongRequestVote.request_id, SongRequestVote.user_id, SongRequestVote.is_requester)
+                .where(SongRequestVote.request_id.in_(request_ids))
+            )
+            voters: Dict[str, List[Tuple[str, bool]]] = {}
+            for request_id, user_id, is_requester in result.all():
+                voters.setdefault(request_id, []).append((user_id, is_requester))
+
+        if queue is not self.live:
+            # Cleared meanwhile
+            return
+        for request_id in request_ids:
+            row = rows.get(request_id)
+            if row is None or row.event_id != queue.event_id:
+                queue.remove(request_id)
+            else:
+                queue.sync_request(QueuedRequest(row), voters.get(request_id, []))
+
+    # ---- write paths ----
+
+    def vote(self, request_id: str, user_id: str) -> QueuedRequest:
+        """Record a vote in memory. Raises ValueError('not_found'|'not_pending'|'already_voted')"""
+        queue = self.live
+        record = queue.records.get(request_id) if queue else None
+        if record is None:
+            raise ValueError("not_found")
+        if record.status != "pending":
+            raise ValueError("not_pending")
+        if queue.has_voted(request_id, user_id):
+            raise ValueError("already_voted")
+
+        queue.add_pending_vote(record, user_id, str(uuid.uuid4()))
+        return record
+
+    def apply_new_request(self, row: SongRequest):
+        if not self.is_live(row.event_id):
+            return
+        self.live.add(QueuedRequest(row))
+        self.live.mark_voter(row.id, row.user_id, requester=True)
+
+    def apply_joined_request(self, request_id: str, user_id: str, times_requested: int):
+        """A user requested a song already in the queue (duplicate path of request_song)"""
+        queue = self.live
+        record = queue.records.get(request_id) if queue else None
+        if record is None:
+            return
+        record.times_requested = times_requested
+        if not queue.has_voted(request_id, user_id):
+            queue.set_votes(record, record.votes + 1)
+        # request_song stored (and counted) the vote with the request
+        queue.pending_vote_rows.pop((request_id, user_id), None)
+        queue.mark_voter(request_id, user_id, requester=True)
+
+    def apply_status(self, row: SongRequest):
+        record = self.get(row.id)
+        if record is None:
+            return
+        record.status = row.status
+        record.played_at = row.played_at
+        record.rejection_reason = row.rejection_reason
+        record.rejection_label = row.rejection_label
+
+    def apply_delete(self, request_id: str):
+        if self.live:
+            self.live.remove(request_id)
+
+    def remove_user(self, user_id: str):
+        """After delete_user_account committed"""
+        for queue in self._queues():
+            queue.remove_user(user_id)
+
+    def apply_clear(self):
+        if self.live:
+            self.live = LiveSongQueue(self.live.event_id)
+
+
+song_queue = SongQueueEngine()
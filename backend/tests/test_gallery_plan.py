@@ -0,0 +1,58 @@
+"""
+The gallery listings and the photo feed must be served by
+ix_photos_event_uploaded (see check_gallery_plan.py). Needs a migrated
+database in TEST_DATABASE_URL (postgresql://...).
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from check_gallery_plan import explain, plan_problems
+from galleries import gallery_listing_query, photo_page_query
+from pagination import encode_cursor
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+CURSOR = datetime(2026, 1, 3, 22, 0, tzinfo=timezone.utc)
+EVENT_ID = "ffffffff"
+
+CASES = {
+    "gallery-events": lambda: gallery_listing_query(True),
+    "gallery-events-page": lambda: gallery_listing_query(True, CURSOR, EVENT_ID, 20),
+    "media-galleries": lambda: gallery_listing_query(False),
+    "media-galleries-page": lambda: gallery_listing_query(False, CURSOR, EVENT_ID, 20),
+    "photo-page": lambda: photo_page_query(EVENT_ID, None, 60),
+    "photo-page-cursor": lambda: photo_page_query(EVENT_ID, encode_cursor(CURSOR, EVENT_ID), 60),
+}
+
+
+async def explain_with_indexes(query) -> dict:
+    engine = create_async_engine(
+        TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": 0}
+    )
+    try:
+        async with engine.connect() as connection:
+            # An empty test database would be sequentially scanned anyway:
+            # check that the indexes can serve the query
+            await connection.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = await explain(connection, query)
+            await connection.rollback()
+            return plan
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_gallery_query_uses_indexes(name):
+    plan = asyncio.run(explain_with_indexes(CASES[name]()))
+    assert plan_problems(plan) == []
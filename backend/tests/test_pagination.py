@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, escape_like
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 3, 14, 23, 5, 9, 123456, tzinfo=timezone(timedelta(hours=1)))
+    row_id = "4f1c2a9e-0000-4000-8000-000000000001"
+
+    cursor = encode_cursor(timestamp, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, row_id)
+
+
+def test_cursor_keeps_separator_in_row_id():
+    timestamp = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(timestamp, "a|b")) == (timestamp, "a|b")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm8tc2VwYXJhdG9y", "//79"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("maria", "maria"),
+    ("100%", "100\\%"),
+    ("jean_luc", "jean\\_luc"),
+    ("a\\b", "a\\\\b"),
+    ("\\%_", "\\\\\\%\\_"),
+])
+def test_escape_like(term, expected):
+    assert escape_like(term) == expected
@@ -0,0 +1,91 @@
+import random
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw
+
+from image_variants import compute_dhash
+from photo_dedup import BKTree, hamming, to_signed, to_unsigned
+
+
+def photo(seed: int, size=(640, 480)) -> Image.Image:
+    """A shot made of random shapes (different seeds -> unrelated pictures)"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        box = [x, y, x + rng.randrange(40, 300), y + rng.randrange(40, 300)]
+        draw.ellipse(box, fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image
+
+
+def encode(image: Image.Image, format: str = "JPEG", **options) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format, **options)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("value", [0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1])
+def test_signed_round_trip(value):
+    signed = to_signed(value)
+    assert -(1 << 63) <= signed < (1 << 63)
+    assert to_unsigned(signed) == value
+
+
+def test_hamming_ignores_sign():
+    assert hamming(0, (1 << 64) - 1) == 64
+    assert hamming(to_signed(1 << 63), 1 << 63) == 0
+    assert hamming(0b1011, 0b0001) == 2
+
+
+def test_dhash_survives_reexport():
+    original = photo(1)
+    value = compute_dhash(encode(original, quality=95))
+
+    assert hamming(value, compute_dhash(encode(original.resize((320, 240)), quality=60))) <= 6
+    assert hamming(value, compute_dhash(encode(original, "PNG"))) <= 6
+
+
+def test_dhash_follows_exif_orientation():
+    original = photo(2)
+    value = compute_dhash(encode(original, quality=95))
+
+    # Stored rotated, displayed upright through the EXIF Orientation tag
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    stored = encode(original.transpose(Image.Transpose.ROTATE_90), quality=95, exif=exif)
+
+    assert hamming(value, compute_dhash(stored)) <= 6
+
+
+def test_dhash_separates_different_shots():
+    hashes = [compute_dhash(encode(photo(seed))) for seed in range(10, 20)]
+    for index, value in enumerate(hashes):
+        for other in hashes[index + 1:]:
+            assert hamming(value, other) > 10
+
+
+def test_bktree_matches_linear_scan():
+    rng = random.Random(7)
+    items = [(to_signed(rng.getrandbits(64)), f"photo-{n}") for n in range(500)]
+    # Near copies of a few photos
+    for n in range(0, 500, 50):
+        value = to_unsigned(items[n][0]) ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+        items.append((to_signed(value), f"copy-{n}"))
+    tree = BKTree(items)
+
+    assert tree.size == len(items)
+    for value, _ in items[::25]:
+        for max_distance in (0, 4, 10):
+            expected = sorted((hamming(value, other), photo_id) for other, photo_id in items if hamming(value, other) <= max_distance)
+            assert tree.search(value, max_distance) == expected
+
+
+def test_bktree_finds_near_copy():
+    tree = BKTree([(0x0F0F0F0F0F0F0F0F, "a"), (to_signed(0xFFFF0000FFFF0000), "b")])
+
+    assert tree.search(0x0F0F0F0F0F0F0F0E, 3) == [(1, "a")]
+    assert tree.search(0xFFFF0000FFFF0001, 3) == [(1, "b")]
+    assert tree.search(0x5555555555555555, 3) == []
+    assert BKTree().search(0, 64) == []
@@ -0,0 +1,23 @@
+import pytest
+
+from push_delivery import PushReport, ticket_error
+
+
+@pytest.mark.parametrize("ticket, expected", [
+    ({"status": "ok", "id": "XXXX-1"}, None),
+    ({"status": "error", "message": "not registered", "details": {"error": "DeviceNotRegistered"}}, "DeviceNotRegistered"),
+    ({"status": "error", "message": "Message too big", "details": {}}, "Message too big"),
+    ({"status": "error", "message": "Rate exceeded", "details": None}, "Rate exceeded"),
+    ({"status": "error"}, "Unknown"),
+    ({}, "Unknown"),
+])
+def test_ticket_error(ticket, expected):
+    assert ticket_error(ticket) == expected
+
+
+def test_report_counts():
+    report = PushReport()
+    report.tickets = [{"status": "ok"}, {"status": "error", "details": {"error": "MessageTooBig"}}, {"status": "ok"}]
+
+    assert report.sent == 2
+    assert report.failed == 1
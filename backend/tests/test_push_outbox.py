@@ -0,0 +1,20 @@
+import pytest
+
+from push_outbox import PushOutboxWorker
+
+
+@pytest.mark.parametrize("attempts, base", [(0, 30), (1, 30), (2, 60), (3, 120), (7, 1920), (8, 3600), (30, 3600)])
+def test_backoff_doubles_up_to_an_hour(attempts, base):
+    worker = PushOutboxWorker()
+    for _ in range(50):
+        assert base * 0.8 <= worker.backoff(attempts) <= base * 1.2
+
+
+def test_backoff_is_jittered(monkeypatch):
+    worker = PushOutboxWorker()
+
+    monkeypatch.setattr("push_outbox.random.uniform", lambda low, high: low)
+    assert worker.backoff(3) == pytest.approx(96)
+
+    monkeypatch.setattr("push_outbox.random.uniform", lambda low, high: high)
+    assert worker.backoff(3) == pytest.approx(144)
@@ -0,0 +1,110 @@
+"""The projections must return the payloads the endpoints built by hand before"""
+
+import json
+
+import pytest
+
+from benchmark_serializers import after_full, after_upcoming, before_full, before_upcoming, make_events, to_rows
+from models_supabase import Event
+from serializers import EVENT_BOOKING, EVENT_FULL, EVENT_NEXT, EVENT_TICKETS, EVENT_UPCOMING
+
+
+def iso(value):
+    return value.isoformat() if value else None
+
+
+def before_next(event: Event) -> dict:
+    return {
+        "id": event.id,
+        "name": event.name,
+        "description": event.description,
+        "event_date": iso(event.event_date),
+        "venue_name": event.venue_name,
+        "venue_address": event.venue_address,
+        "lineup": event.lineup or [],
+        "ticket_categories": event.ticket_categories or [],
+        "xceed_ticket_url": event.xceed_ticket_url,
+        "selected_djs": event.selected_djs or [],
+        "status": event.status
+    }
+
+
+def before_tickets(event: Event) -> dict:
+    return {
+        "id": event.id,
+        "name": event.name,
+        "description": event.description,
+        "event_date": iso(event.event_date),
+        "venue_name": event.venue_name,
+        "venue_address": event.venue_address,
+        "banner_image": event.banner_image,
+        "xceed_ticket_url": event.xceed_ticket_url,
+        "ticket_categories": event.ticket_categories or [],
+        "is_featured": getattr(event, 'is_featured', False),
+        "event_type": getattr(event, 'event_type', 'regular'),
+        "status": event.status
+    }
+
+
+def before_booking(event: Event) -> dict:
+    return {
+        "id": event.id,
+        "name": event.name,
+        "event_date": iso(event.event_date),
+        "venue_name": event.venue_name,
+        "banner_image": event.banner_image,
+        "is_featured": getattr(event, 'is_featured', False),
+        "event_type": getattr(event, 'event_type', 'regular'),
+    }
+
+
+@pytest.fixture
+def events():
+    events = make_events(12)
+    events[1].lineup = None
+    events[2].ticket_categories = None
+    events[3].selected_djs = None
+    events[4].description = None
+    events[5].banner_image = None
+    events[6].xceed_ticket_url = None
+    return events
+
+
+def test_full_matches_event_response(events):
+    assert json.loads(after_full(to_rows(events, EVENT_FULL))) == json.loads(before_full(events))
+
+
+def test_upcoming_matches_previous_payload(events):
+    assert json.loads(after_upcoming(to_rows(events, EVENT_UPCOMING))) == json.loads(before_upcoming(events))
+
+
+@pytest.mark.parametrize("projection, before", [
+    (EVENT_NEXT, before_next),
+    (EVENT_TICKETS, before_tickets),
+    (EVENT_BOOKING, before_booking),
+])
+def test_projection_matches_previous_dict(events, projection, before):
+    assert projection.serialize_all(to_rows(events, projection)) == [before(event) for event in events]
+
+
+def test_key_order_is_kept(events):
+    rows = to_rows(events, EVENT_UPCOMING)
+    assert list(EVENT_UPCOMING.serialize(rows[0])) == EVENT_UPCOMING.keys
+
+
+def test_serialize_object_matches_rows(events):
+    for event, row in zip(events, to_rows(events, EVENT_FULL)):
+        assert EVENT_FULL.serialize_object(event) == EVENT_FULL.serialize(row)
+
+
+def test_null_flags_get_column_defaults():
+    event = make_events(1)[0]
+    event.is_featured = None
+    event.event_type = None
+    event.visible_in_tickets = None
+
+    payload = EVENT_UPCOMING.serialize_object(event)
+
+    assert payload["is_featured"] is False
+    assert payload["event_type"] == "regular"
+    assert payload["visible_in_tickets"] is True
@@ -0,0 +1,129 @@
+"""
+Revoked access tokens, checked in memory
+
+Access tokens are short-lived (ACCESS_TOKEN_EXPIRE_MINUTES) and carry a
+unique "jti". Revoking one before it expires (logout) inserts its jti in
+revoked_tokens and, in the same transaction, pg_notifies every worker;
+get_current_user_supabase then only has to look the jti up in this
+worker's set - no query per request. Entries are dropped once the token
+would have expired anyway, so the set stays as small as the number of
+revocations in the last few minutes (an exact set, no Bloom filter false
+positives to deal with).
+
+The same channel carries user-wide revocations (revoke_user): the other
+workers drop the user from their user cache at once, so a bumped
+token_version is seen immediately instead of after the cache TTL.
+
+Like settings_cache.py, workers LISTEN on the channel (pg_listener.py),
+or re-read the table every few seconds without DATABASE_DIRECT_URL. The
+re-read also picks up the users whose sessions were revoked lately
+(users.sessions_revoked_at, indexed), so polling workers drop them from
+their user cache too.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database_supabase import AsyncSessionLocal, DATABASE_DIRECT_URL
+from models_supabase import RevokedToken, User
+from pg_listener import PgListener
+from user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tokens_revoked"
+# Revoked sessions re-checked by every re-read: longer than the user cache TTL, and than
+# any gap between a revocation's timestamp and its commit
+USER_REVOCATION_WINDOW = timedelta(seconds=120)
+
+
+class RevocationFilter(PgListener):
+    channel = CHANNEL
+    label = "token revocations"
+
+    def __init__(self, poll_interval: float = 5.0, reconnect_delay: float = 5.0):
+        super().__init__(poll_interval, reconnect_delay)
+        # jti -> expiry (epoch seconds)
+        self._revoked: Dict[str, float] = {}
+        # user_id -> sessions_revoked_at, already applied to the user cache
+        self._user_revocations: Dict[str, datetime] = {}
+
+    def is_revoked(self, jti: str) -> bool:
+        expires = self._revoked.get(jti)
+        if expires is None:
+            return False
+        if expires <= time.time():
+            del self._revoked[jti]
+            return False
+        return True
+
+    async def revoke(self, db: AsyncSession, jti: str, expires_at: datetime):
+        """Record the revocation in the caller's transaction (other workers told on commit)"""
+        await db.execute(
+            pg_insert(RevokedToken).values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        await self._notify(db, {"jti": jti, "exp": expires_at.timestamp()})
+
+    async def revoke_user(self, db: AsyncSession, user_id: str):
+        """Have every worker reload the user (after its token_version was bumped)"""
+        await self._notify(db, {"user_id": user_id})
+
+    async def _notify(self, db: AsyncSession, message: dict):
+        await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": json.dumps(message)})
+
+    def apply(self, jti: str, expires_at: datetime):
+        """Update this worker's set after the revoker committed"""
+        self._revoked[jti] = expires_at.timestamp()
+
+    async def refresh(self):
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now))
+            self._revoked = {jti: expires_at.timestamp() for jti, expires_at in result.all()}
+            # revoke_user notifications are missed when polling (or while reconnecting)
+            result = await db.execute(
+                select(User.id, User.sessions_revoked_at).where(User.sessions_revoked_at > now - USER_REVOCATION_WINDOW)
+            )
+            recent = dict(result.all())
+        for user_id, revoked_at in recent.items():
+            if self._user_revocations.get(user_id) != revoked_at:
+                user_cache.invalidate(user_id)
+        self._user_revocations = recent
+
+    def on_notification(self, payload: str):
+        try:
+            message = json.loads(payload)
+            if "jti" in message:
+                self._revoked[message["jti"]] = float(message["exp"])
+            elif "user_id" in message:
+                user_cache.invalidate(message["user_id"])
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error(f"Invalid token revocation notification: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._revoked),
+            "notifications_received": self.notifications_received,
+            "listening": bool(DATABASE_DIRECT_URL)
+        }
+
+    # ---- lifecycle ----
+
+    async def start(self):
+        # Rows of expired tokens are no longer needed
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+            await db.commit()
+        await super().start()
+        logger.info(f"🔐 Token revocation filter loaded ({len(self._revoked)} revoked)")
+
+
+revocation_filter = RevocationFilter()
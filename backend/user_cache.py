@@ -0,0 +1,164 @@
+"""
+In-process cache of authenticated users
+
+get_current_user_supabase used to open its own session and select the user
+on every authenticated request. It now reads a snapshot of the user's
+columns from this bounded LRU cache (entries expire after a short TTL) and
+hands each request its own detached User built from it, as before.
+
+Invalidation is automatic, through SQLAlchemy session events, so no write
+path has to remember it:
+
+- a flush that updates or deletes User instances drops their entries
+  (again after commit, in case a request re-cached the old row meanwhile)
+- an ORM-enabled UPDATE / DELETE on User (update(User)..., delete(User)...)
+  clears the whole cache, since the affected ids are not known
+
+Upserts that may update an existing user (accounts.py) are not seen by
+these events and call invalidate_on_commit() themselves.
+
+The TTL bounds staleness for writes made outside this process (SQL
+console, another worker).
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from database_supabase import AsyncSessionLocal
+from models_supabase import User
+from response_cache import caches
+
+_PENDING_KEY = "user_cache_invalidate"
+_CLEAR_ALL = "*"
+
+
+class UserCache:
+    def __init__(self, name: str = "users", max_size: int = 10000, ttl: float = 60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._columns = [column.key for column in User.__mapper__.column_attrs]
+        caches[name] = self
+
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """Detached User for user_id (cached), or None if it does not exist"""
+        values = self._get(user_id)
+        if values is None:
+            self.misses += 1
+            generation = self._generation
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(User).where(User.id == user_id))
+                user = result.scalar_one_or_none()
+                if user is None:
+                    return None
+                values = {key: getattr(user, key) for key in self._columns}
+            # Not stored if the user (or everyone) was invalidated during the load
+            if generation == self._generation:
+                self._put(user_id, values)
+        else:
+            self.hits += 1
+        return self._build(values)
+
+    def _get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    def _put(self, user_id: str, values: Dict[str, Any]):
+        self._entries[user_id] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _build(values: Dict[str, Any]) -> User:
+        # A fresh instance per request: handlers never share (or mutate) the cached copy,
+        # including its JSON lists (badges, friends) - an in-place append stays in the request
+        user = User(**copy.deepcopy(values))
+        make_transient_to_detached(user)
+        return user
+
+    def invalidate(self, user_id: str):
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+user_cache = UserCache()
+
+
+# ============ INVALIDATION (session events) ============
+
+def _apply(pending: Set[str]):
+    if _CLEAR_ALL in pending:
+        user_cache.clear()
+    else:
+        for user_id in pending:
+            user_cache.invalidate(user_id)
+
+
+def invalidate_on_commit(session, user_id: str):
+    """Drop a user changed by a Core statement, now and when the session commits"""
+    user_cache.invalidate(user_id)
+    session.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _users_flushed(session, flush_context):
+    changed = {
+        instance.id for instance in list(session.dirty) + list(session.deleted)
+        if isinstance(instance, User) and instance.id
+    }
+    if changed:
+        _apply(changed)
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _users_bulk_changed(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is User.__mapper__:
+        user_cache.clear()
+        orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).add(_CLEAR_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _users_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _apply(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _users_rolled_back(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -837,8 +837,17 @@ export default function ContentManagerScreen() {
     if (!eventId) return;
     try {
       setLoadingPhotos(true);
-      const response = await api.get(`/media/gallery/${eventId}`);
-      setGalleryPhotos(response.data.photos || []);
+      // The feed is paginated: follow next_cursor to list every photo
+      const photos: any[] = [];
+      let cursor: string | null = null;
+      do {
+        const response: any = await api.get(`/media/gallery/${eventId}`, {
+          params: { limit: 200, ...(cursor ? { cursor } : {}) },
+        });
+        photos.push(...(response.data.photos || []));
+        cursor = response.data.next_cursor || null;
+      } while (cursor);
+      setGalleryPhotos(photos);
     } catch (error) {
       console.error('Failed to load gallery photos:', error);
       setGalleryPhotos([]);
@@ -1030,7 +1039,7 @@ export default function ContentManagerScreen() {
               {galleryPhotos.map((photo) => (
                 <View key={photo.id} style={{ width: '30%', aspectRatio: 1, position: 'relative' }}>
                   <Image
-                    source={{ uri: photo.url }}
+                    source={{ uri: photo.variants?.thumb || photo.url }}
                     style={{ width: '100%', height: '100%', borderRadius: 8 }}
                     resizeMode="cover"
                   />
@@ -45,8 +45,12 @@ export default function AdminUsersScreen() {
   const [isLoading, setIsLoading] = useState(true);
   const [isRefreshing, setIsRefreshing] = useState(false);
   const [searchQuery, setSearchQuery] = useState('');
-  const [page, setPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  // Cursor of each page visited so far (the API pages by cursor, not by number)
+  const [pageCursors, setPageCursors] = useState<(string | null)[]>([null]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState(0);
+  const [totalEstimated, setTotalEstimated] = useState(false);
+  const page = pageCursors.length;
 
   // Admin check
   useEffect(() => {
@@ -64,34 +68,36 @@ export default function AdminUsersScreen() {
 
   useEffect(() => {
     const timer = setTimeout(() => {
-      setPage(1);
-      loadUsers();
+      setPageCursors([null]);
+      loadUsers(null);
     }, 500);
     return () => clearTimeout(timer);
   }, [searchQuery]);
 
   useEffect(() => {
     if (page > 1) {
-      loadUsers();
+      loadUsers(pageCursors[page - 1]);
     }
-  }, [page]);
+  }, [pageCursors]);
 
   const loadData = async () => {
     try {
       setIsLoading(true);
-      await Promise.all([loadUsers(), loadStats()]);
+      await Promise.all([loadUsers(pageCursors[page - 1]), loadStats()]);
     } finally {
       setIsLoading(false);
     }
   };
 
-  const loadUsers = async () => {
+  const loadUsers = async (cursor: string | null) => {
     try {
       const response = await api.get('/admin/users', {
-        params: { search: searchQuery, page, limit: 50 }
+        params: { search: searchQuery, cursor: cursor || undefined, limit: 50 }
       });
       setUsers(response.data.users);
-      setTotalPages(response.data.pages);
+      setNextCursor(response.data.next_cursor);
+      setTotal(response.data.total);
+      setTotalEstimated(response.data.total_estimated);
     } catch (error) {
       console.error('Error loading users:', error);
     }
@@ -243,20 +249,22 @@ export default function AdminUsersScreen() {
         ))}
 
         {/* Pagination */}
-        {totalPages > 1 && (
+        {(page > 1 || nextCursor) && (
           <View style={styles.pagination}>
             <TouchableOpacity 
               style={[styles.pageButton, page === 1 && styles.pageButtonDisabled]}
-              onPress={() => setPage(p => Math.max(1, p - 1))}
+              onPress={() => setPageCursors(cursors => cursors.slice(0, -1))}
               disabled={page === 1}
             >
               <Ionicons name="chevron-back" size={20} color="white" />
             </TouchableOpacity>
-            <Text style={styles.pageText}>Page {page} / {totalPages}</Text>
+            <Text style={styles.pageText}>
+              Page {page} • {totalEstimated ? '~' : ''}{total} utilisateurs
+            </Text>
             <TouchableOpacity 
-              style={[styles.pageButton, page === totalPages && styles.pageButtonDisabled]}
-              onPress={() => setPage(p => Math.min(totalPages, p + 1))}
-              disabled={page === totalPages}
+              style={[styles.pageButton, !nextCursor && styles.pageButtonDisabled]}
+              onPress={() => nextCursor && setPageCursors(cursors => [...cursors, nextCursor])}
+              disabled={!nextCursor}
             >
               <Ionicons name="chevron-forward" size={20} color="white" />
             </TouchableOpacity>
@@ -22,7 +22,7 @@ import { theme } from '../../src/config/theme';
 import { useAuth } from '../../src/context/AuthContext';
 import { useLanguage } from '../../src/context/LanguageContext';
 import { Button } from '../../src/components/Button';
-import api from '../../src/config/api';
+import api, { storeSessionTokens } from '../../src/config/api';
 import { registerForPushNotifications } from '../../src/config/notifications';
 import logger from '../../src/config/logger';
 
@@ -130,7 +130,7 @@ export default function LoginScreen() {
       
       if (result.data.access_token) {
         // BUG 3 FIX: Save auth_version after Google login
-        await AsyncStorage.setItem('auth_token', result.data.access_token);
+        await storeSessionTokens(result.data);
         await AsyncStorage.setItem('auth_version', 'supabase_v3');
         setToken(result.data.access_token);
         setUser(result.data);
@@ -201,7 +201,7 @@ export default function LoginScreen() {
         }, { timeout: 15000 });
         
         if (result.data.access_token) {
-          await AsyncStorage.setItem('auth_token', result.data.access_token);
+          await storeSessionTokens(result.data);
           await AsyncStorage.setItem('auth_version', 'supabase_v3');
           setToken(result.data.access_token);
           setUser(result.data);
@@ -29,10 +29,13 @@ interface Photo {
   id: string;
   url: string;
   thumbnail_url?: string;
+  variants?: { thumb: string; medium: string; full: string };
   tags: string[];
   uploaded_at: string;
 }
 
+const PAGE_SIZE = 60;
+
 export default function EventGalleryScreen() {
   const { eventId } = useLocalSearchParams();
   const router = useRouter();
@@ -40,6 +43,8 @@ export default function EventGalleryScreen() {
   
   const [photos, setPhotos] = useState<Photo[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [eventName, setEventName] = useState('');
   const [selectedPhoto, setSelectedPhoto] = useState<Photo | null>(null);
   const [downloading, setDownloading] = useState(false);
@@ -51,9 +56,10 @@ export default function EventGalleryScreen() {
   const loadGallery = async () => {
     try {
       setLoading(true);
-      const response = await api.get(`/media/gallery/${eventId}`);
+      const response = await api.get(`/media/gallery/${eventId}`, { params: { limit: PAGE_SIZE } });
       setPhotos(response.data.photos || []);
-      setEventName(response.data.event_name || 'Galerie');
+      setNextCursor(response.data.next_cursor || null);
+      setEventName(response.data.event?.name || 'Galerie');
     } catch (error) {
       console.error('Failed to load gallery:', error);
       // Use mock data if API fails
@@ -63,6 +69,22 @@ export default function EventGalleryScreen() {
     }
   };
 
+  const loadMorePhotos = async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get(`/media/gallery/${eventId}`, {
+        params: { cursor: nextCursor, limit: PAGE_SIZE },
+      });
+      setPhotos((current) => [...current, ...(response.data.photos || [])]);
+      setNextCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Failed to load more photos:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDownloadPhoto = async (photoUrl: string) => {
     try {
       setDownloading(true);
@@ -114,7 +136,7 @@ export default function EventGalleryScreen() {
       onPress={() => setSelectedPhoto(item)}
     >
       <Image
-        source={{ uri: item.thumbnail_url || item.url }}
+        source={{ uri: item.variants?.thumb || item.thumbnail_url || item.url }}
         style={styles.photoImage}
         resizeMode="cover"
       />
@@ -130,7 +152,7 @@ export default function EventGalleryScreen() {
         </TouchableOpacity>
         <View style={styles.headerText}>
           <Text style={styles.title}>{eventName}</Text>
-          <Text style={styles.subtitle}>{photos.length} photos</Text>
+          <Text style={styles.subtitle}>{photos.length}{nextCursor ? '+' : ''} photos</Text>
         </View>
       </View>
 
@@ -153,6 +175,11 @@ export default function EventGalleryScreen() {
           numColumns={3}
           contentContainerStyle={styles.photoGrid}
           columnWrapperStyle={styles.photoRow}
+          onEndReached={loadMorePhotos}
+          onEndReachedThreshold={0.5}
+          ListFooterComponent={
+            loadingMore ? <ActivityIndicator size="small" color={theme.colors.primary} /> : null
+          }
         />
       )}
 
@@ -169,7 +196,7 @@ export default function EventGalleryScreen() {
           {selectedPhoto && (
             <>
               <Image
-                source={{ uri: selectedPhoto.url }}
+                source={{ uri: selectedPhoto.variants?.medium || selectedPhoto.url }}
                 style={styles.fullImage}
                 resizeMode="contain"
               />
@@ -30,6 +30,8 @@ export const api = axios.create({
   timeout: 30000, // 30 secondes
   headers: {
     'Content-Type': 'application/json',
+    // Demande un access token court + refresh token (sinon jeton legacy de 30 jours)
+    'X-Session-Refresh': '1',
   },
 });
 
@@ -80,10 +82,90 @@ api.interceptors.request.use(
   }
 );
 
+// ============ SESSION TOKENS ============
+// Access tokens expire after ~15 minutes; the refresh token gets a new pair
+// (and is replaced by it - each refresh token works once)
+const REFRESH_TOKEN_KEY = 'refresh_token';
+
+export const storeSessionTokens = async (data: { access_token?: string; refresh_token?: string }) => {
+  if (data.access_token) {
+    await AsyncStorage.setItem('auth_token', data.access_token);
+  }
+  if (data.refresh_token) {
+    await AsyncStorage.setItem(REFRESH_TOKEN_KEY, data.refresh_token);
+  }
+};
+
+export const clearSessionTokens = async () => {
+  await AsyncStorage.multiRemove(['auth_token', REFRESH_TOKEN_KEY]);
+};
+
+// Revoke the session server-side (best effort, the app logs out anyway)
+export const revokeSession = async () => {
+  try {
+    const refreshToken = await AsyncStorage.getItem(REFRESH_TOKEN_KEY);
+    const token = await AsyncStorage.getItem('auth_token');
+    if (token) {
+      await axios.post(
+        `${BACKEND_URL}/api/auth/logout`,
+        { refresh_token: refreshToken },
+        { headers: { Authorization: `Bearer ${token}` }, timeout: 5000 }
+      );
+    }
+  } catch (error: any) {
+    console.log('API: Logout request failed -', error.message);
+  }
+};
+
+// Credentials are wrong there, not expired
+const NO_REFRESH_URLS = /^\/auth\/(login|register|social|firebase-login|refresh|logout)/;
+
+// One refresh at a time: requests failing together share it
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshPromise) {
+    refreshPromise = (async () => {
+      const refreshToken = await AsyncStorage.getItem(REFRESH_TOKEN_KEY);
+      if (!refreshToken) {
+        return null;
+      }
+      try {
+        const response = await axios.post(
+          `${BACKEND_URL}/api/auth/refresh`,
+          { refresh_token: refreshToken },
+          { timeout: 20000 }
+        );
+        await storeSessionTokens(response.data);
+        return response.data.access_token as string;
+      } catch (error: any) {
+        if (error.response?.status === 401) {
+          // Expired or revoked - only a new login helps
+          await AsyncStorage.removeItem(REFRESH_TOKEN_KEY);
+        }
+        return null;
+      }
+    })().finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
 // Handle response errors - DO NOT remove token here, let AuthContext handle it
 api.interceptors.response.use(
   (response) => response,
   async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried && !NO_REFRESH_URLS.test(original.url || '')) {
+      // Access token expired: renew it and replay the request once
+      original._retried = true;
+      const newToken = await refreshAccessToken();
+      if (newToken) {
+        original.headers.Authorization = `Bearer ${newToken}`;
+        return api(original);
+      }
+    }
     if (error.response?.status === 401) {
       console.log('API: Received 401 - token may be invalid');
       // Do NOT remove token here - let AuthContext.loadUser() handle it
@@ -1,6 +1,6 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import AsyncStorage from '@react-native-async-storage/async-storage';
-import api, { warmupBackend } from '../config/api';
+import api, { warmupBackend, storeSessionTokens, clearSessionTokens, revokeSession } from '../config/api';
 import { registerForPushNotifications } from '../config/notifications';
 import logger from '../config/logger';
 
@@ -52,7 +52,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
         throw new Error('Invalid response from server');
       }
       
-      await AsyncStorage.setItem('auth_token', access_token);
+      await storeSessionTokens(response.data);
       await AsyncStorage.setItem('auth_version', 'supabase_v3');
       
       setTokenState(access_token);
@@ -100,7 +100,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       });
       
       const { access_token, user_id } = response.data;
-      await AsyncStorage.setItem('auth_token', access_token);
+      await storeSessionTokens(response.data);
       await AsyncStorage.setItem('auth_version', 'supabase_v3'); // BUG 3 FIX
       
       setTokenState(access_token);
@@ -120,8 +120,9 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = async () => {
+    await revokeSession();
     try {
-      await AsyncStorage.removeItem('auth_token');
+      await clearSessionTokens();
       await AsyncStorage.removeItem('cached_user_data');
     } catch (error) {
       logger.error('Error clearing auth storage:', error);
@@ -182,7 +183,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
         // Both should keep the token for retry
         if (error.response?.status === 401) {
           console.log('loadUser: Token invalid (401) - clearing auth data');
-          await AsyncStorage.removeItem('auth_token');
+          await clearSessionTokens();
           await AsyncStorage.removeItem('cached_user_data');
           setUserState(null);
           setTokenState(null);
@@ -230,7 +231,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
     if (newToken) {
       await AsyncStorage.setItem('auth_token', newToken);
     } else {
-      await AsyncStorage.removeItem('auth_token');
+      await clearSessionTokens();
     }
   };
 